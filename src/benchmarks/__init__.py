@@ -0,0 +1,5 @@
+"""
+Microbenchmarks for the voice pipeline.
+
+Run from the `src` directory, e.g. `python -m benchmarks.bench_codec`.
+"""
@@ -0,0 +1,76 @@
+"""
+Stream fan-in: queue/pump merge_streams vs. the previous task-per-item amerge.
+
+Usage (from src/):
+    python -m benchmarks.bench_amerge [--items 100000] [--sources 3]
+
+Reports merged events/sec, asyncio tasks created and peak traced memory.
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from langchain_openai_voice.utils import merge_streams
+
+
+# The implementation amerge used before: one task per item per stream, and
+# asyncio.wait over the whole set for every item.
+async def amerge_tasks(**streams):
+    nexts = {asyncio.create_task(anext(stream)): key for key, stream in streams.items()}
+    while nexts:
+        done, _ = await asyncio.wait(nexts, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            key = nexts.pop(task)
+            stream = streams[key]
+            try:
+                yield key, task.result()
+                nexts[asyncio.create_task(anext(stream))] = key
+            except StopAsyncIteration:
+                pass
+
+
+async def source(n: int, payload: bytes):
+    for _ in range(n):
+        yield payload
+
+
+async def run(name: str, make_merged, sources: int, items: int) -> None:
+    loop = asyncio.get_running_loop()
+    created = 0
+
+    def factory(loop, coro, **kwargs):
+        nonlocal created
+        created += 1
+        return asyncio.Task(coro, loop=loop, **kwargs)
+
+    loop.set_task_factory(factory)
+    streams = {f"s{i}": source(items // sources, b"x" * 1280) for i in range(sources)}
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = 0
+    async for _ in make_merged(streams):
+        count += 1
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    loop.set_task_factory(None)
+    print(
+        f"  {name:<20} {count / elapsed:>10,.0f} events/s   "
+        f"{created:>8,} tasks created   peak {peak / 1024:8.1f} KiB"
+    )
+
+
+async def main(args) -> None:
+    print(f"{args.items:,} items from {args.sources} sources")
+    await run("task-per-item amerge", lambda s: amerge_tasks(**s), args.sources, args.items)
+    await run("merge_streams", lambda s: merge_streams(s, maxsize=args.maxsize), args.sources, args.items)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--sources", type=int, default=3)
+    parser.add_argument("--maxsize", type=int, default=32)
+    asyncio.run(main(parser.parse_args()))
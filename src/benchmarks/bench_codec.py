@@ -0,0 +1,78 @@
+"""
+μ-law codec microbenchmark: LUT codec vs. the g711 package path.
+
+Usage (from src/):
+    python -m benchmarks.bench_codec [--frames 50000]
+
+Each frame is 20 ms of 8 kHz audio (160 μ-law bytes). Everything runs on one
+thread, so the reported rates are frames/sec per core.
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from langchain_openai_voice.codec import MuLawCodec, TWILIO_FRAME_SAMPLES
+
+
+def _rate(fn, payloads) -> float:
+    start = time.perf_counter()
+    for p in payloads:
+        fn(p)
+    return len(payloads) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=50_000)
+    args = parser.parse_args()
+
+    frames = [os.urandom(TWILIO_FRAME_SAMPLES) for _ in range(256)]
+    ulaw_payloads = [frames[i % len(frames)] for i in range(args.frames)]
+    rng = np.random.default_rng(0)
+    pcm_frames = [
+        rng.integers(-32768, 32767, TWILIO_FRAME_SAMPLES, dtype=np.int16)
+        for _ in range(256)
+    ]
+    pcm_payloads = [pcm_frames[i % len(pcm_frames)] for i in range(args.frames)]
+
+    codec = MuLawCodec()
+    results = {
+        "decode lut (in-place)": _rate(codec.decode, ulaw_payloads),
+        "encode lut (in-place)": _rate(codec.encode, pcm_payloads),
+    }
+
+    try:
+        import g711
+    except ImportError:
+        g711 = None
+
+    if g711 is not None:
+        # The path twilio_stream used before: float decode, then int16 copy.
+        # (g711 returns floats in [-1, 1], so that cast truncates to ~silence.)
+        def g711_decode(p):
+            return np.asarray(g711.decode_ulaw(p), dtype=np.int16).tobytes()
+
+        # What a correctly scaled g711 decode costs.
+        def g711_decode_scaled(p):
+            return (g711.decode_ulaw(p) * 32768.0).astype(np.int16).tobytes()
+
+        def g711_encode(p):
+            return g711.encode_ulaw(p.astype(np.float32) / 32768.0)
+
+        results["decode g711 + asarray"] = _rate(g711_decode, ulaw_payloads)
+        results["decode g711 scaled"] = _rate(g711_decode_scaled, ulaw_payloads)
+        results["encode g711"] = _rate(g711_encode, pcm_payloads)
+    else:
+        print("g711 not installed; skipping baseline")
+
+    print(f"{args.frames} frames of {TWILIO_FRAME_SAMPLES} samples, single core")
+    for name, fps in results.items():
+        # 50 frames/sec is one real-time call direction
+        print(f"  {name:<24} {fps:>12,.0f} frames/s  ({fps / 50:,.0f} call-directions)")
+
+
+if __name__ == "__main__":
+    main()
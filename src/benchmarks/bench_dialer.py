@@ -0,0 +1,114 @@
+"""
+Outbound campaign against the mock Twilio API.
+
+Usage (from src/):
+    python -m benchmarks.bench_dialer [--numbers 30] [--cps 5] [--max-concurrent 8]
+
+Starts benchmarks.mock_twilio in this process and one server worker with
+TWILIO_API_BASE pointing at it, submits a campaign to POST /campaigns and
+polls GET /campaigns/{id} until every call has reached a final status
+through the mock's status callbacks. Reported: placement rate against the
+configured --cps, peak simultaneous calls against --max-concurrent, final
+statuses, and event-loop lag on the worker while it dialed (each create
+waits --api-latency-ms on the mock; a blocking client would stall the loop
+for that long on every call).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+from benchmarks.load_twilio import histogram_quantile, scrape, wait_healthy
+from benchmarks.mock_twilio import MockTwilioServer
+
+TOKEN = "bench-token"
+
+
+def api(base_url: str, path: str, body: dict | None = None) -> dict:
+    req = urllib.request.Request(
+        f"{base_url}{path}",
+        data=json.dumps(body).encode() if body is not None else None,
+        headers={"Authorization": f"Bearer {TOKEN}", "Content-Type": "application/json"},
+        method="POST" if body is not None else "GET",
+    )
+    with urllib.request.urlopen(req, timeout=5) as resp:
+        return json.loads(resp.read())
+
+
+def spawn_server(args, twilio_url: str) -> subprocess.Popen:
+    src = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env.update({
+        "PUBLIC_URL": f"http://127.0.0.1:{args.port}",
+        "TWILIO_API_BASE": twilio_url,
+        "TWILIO_ACCOUNT_SID": "AC" + "0" * 32,
+        "TWILIO_AUTH_TOKEN": "test",
+        "TWILIO_PHONE_NUMBER": "+15550000000",
+        "DIALER_API_TOKEN": TOKEN,
+        "DIALER_CALLS_PER_SECOND": str(args.cps),
+        "DIALER_MAX_CONCURRENT": str(args.max_concurrent),
+        "PYTHONWARNINGS": "ignore",
+    })
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server.app:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=src, env=env, stdout=subprocess.DEVNULL,
+    )
+
+
+async def main(args) -> None:
+    twilio = MockTwilioServer(
+        api_latency=args.api_latency_ms / 1000, ring_ms=args.ring_ms,
+        answer_ms=args.answer_ms, call_ms=args.call_ms, busy_every=args.busy_every,
+    )
+    async with twilio:
+        server = spawn_server(args, twilio.url)
+        base = f"http://127.0.0.1:{args.port}"
+        try:
+            await asyncio.to_thread(wait_healthy, base)
+            before = await asyncio.to_thread(scrape, base)
+            numbers = [f"+1555{i:07d}" for i in range(args.numbers)]
+            start = time.perf_counter()
+            campaign = await asyncio.to_thread(api, base, "/campaigns", {"numbers": numbers})
+            while True:
+                await asyncio.sleep(0.25)
+                status = await asyncio.to_thread(api, base, f"/campaigns/{campaign['id']}")
+                if status["finished"] or time.perf_counter() - start > args.timeout:
+                    break
+            elapsed = time.perf_counter() - start
+            after = await asyncio.to_thread(scrape, base)
+        finally:
+            server.terminate()
+            server.wait()
+
+    stats = twilio.stats()
+    lag = "voice_event_loop_lag_seconds"
+    print(f"campaign of {args.numbers} numbers finished={status['finished']} in {elapsed:.1f}s")
+    print(f"  final statuses        {status['statuses']}")
+    print(f"  calls created         {stats['created']} at {stats['mean_creates_per_second']:.2f}/s (limit {args.cps:g}/s; peak {stats['peak_creates_per_second']} in any 1 s window)")
+    print(f"  peak simultaneous     {stats['max_live']} live calls (cap {args.max_concurrent})")
+    print(f"  status callbacks      {stats['callbacks_sent']} sent, {stats['callbacks_failed']} failed")
+    print(
+        f"  worker loop lag       p50 {1000 * histogram_quantile(before, after, lag, 0.5):.1f} ms"
+        f"  p99 {1000 * histogram_quantile(before, after, lag, 0.99):.1f} ms"
+        f"  (API latency {args.api_latency_ms} ms per create)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--numbers", type=int, default=30)
+    parser.add_argument("--cps", type=float, default=5)
+    parser.add_argument("--max-concurrent", type=int, default=8)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--api-latency-ms", type=int, default=300)
+    parser.add_argument("--ring-ms", type=int, default=300)
+    parser.add_argument("--answer-ms", type=int, default=700)
+    parser.add_argument("--call-ms", type=int, default=2000)
+    parser.add_argument("--busy-every", type=int, default=7)
+    parser.add_argument("--timeout", type=float, default=120)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,89 @@
+"""
+CPU per call for audio events in aconnect: decode/re-encode vs. raw pass-through.
+
+Usage (from src/):
+    python -m benchmarks.bench_passthrough [--seconds 600]
+
+Simulates the audio events of one call (input_audio_buffer.append from the
+caller, response.audio.delta from the model) and times only what aconnect
+does with each one: before, json.loads + json.dumps; after, a type sniff and
+forwarding the original string.
+"""
+
+import argparse
+import base64
+import json
+import os
+import time
+
+from langchain_openai_voice import PASSTHROUGH_INPUT_EVENTS, PASSTHROUGH_OUTPUT_EVENTS
+from langchain_openai_voice.utils import sniff_event_type
+
+
+def _input_event(nbytes: int) -> str:
+    audio = base64.b64encode(os.urandom(nbytes)).decode()
+    return json.dumps({"type": "input_audio_buffer.append", "audio": audio})
+
+
+def _output_event(nbytes: int, i: int) -> str:
+    return json.dumps({
+        "type": "response.audio.delta",
+        "event_id": f"event_{i:08d}",
+        "response_id": "resp_0123456789",
+        "item_id": "item_0123456789",
+        "output_index": 0,
+        "content_index": 0,
+        "delta": base64.b64encode(os.urandom(nbytes)).decode(),
+    })
+
+
+def _old(raw: str) -> str:
+    return json.dumps(json.loads(raw))
+
+
+def _new(raw: str, passthrough: set[str]) -> str:
+    if sniff_event_type(raw) in passthrough:
+        return raw
+    return json.dumps(json.loads(raw))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=int, default=600, help="simulated call seconds")
+    parser.add_argument("--in-rate", type=int, default=10, help="append events/sec")
+    parser.add_argument("--in-bytes", type=int, default=4800, help="PCM bytes per append")
+    parser.add_argument("--out-rate", type=int, default=25, help="delta events/sec")
+    parser.add_argument("--out-bytes", type=int, default=4800, help="PCM bytes per delta")
+    args = parser.parse_args()
+
+    inputs = [_input_event(args.in_bytes) for _ in range(32)]
+    outputs = [_output_event(args.out_bytes, i) for i in range(32)]
+    n_in = args.seconds * args.in_rate
+    n_out = args.seconds * args.out_rate
+
+    def run(fn_in, fn_out) -> float:
+        start = time.process_time()
+        for i in range(n_in):
+            fn_in(inputs[i % 32])
+        for i in range(n_out):
+            fn_out(outputs[i % 32])
+        return time.process_time() - start
+
+    before = run(_old, _old)
+    after = run(
+        lambda raw: _new(raw, PASSTHROUGH_INPUT_EVENTS),
+        lambda raw: _new(raw, PASSTHROUGH_OUTPUT_EVENTS),
+    )
+
+    events = n_in + n_out
+    print(f"{args.seconds}s call: {n_in} appends x {args.in_bytes} B, {n_out} deltas x {args.out_bytes} B")
+    for name, cpu in (("decode + re-encode", before), ("raw pass-through", after)):
+        print(
+            f"  {name:<20} {1e6 * cpu / events:8.2f} us/event   "
+            f"{1000 * cpu / args.seconds:7.3f} ms CPU per call-second"
+        )
+    print(f"  speedup {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Whole-buffer vs. streaming ASR -> TTS with the offline fake providers.
+
+Usage (from src/):
+    python -m benchmarks.bench_providers [--asr-first-ms 150] [--tts-first-ms 200]
+
+Caller audio arrives in real time (100 ms chunks). The whole-buffer pipeline
+waits for the last chunk, calls transcribe() and synthesize(), and can only
+start playback when synthesis has finished. The streaming pipeline feeds
+transcribe_stream() while audio arrives and plays the first chunk of
+synthesize_stream(). Reported: time from the end of caller audio to the
+first playable audio, plus per-provider time to first chunk.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from langchain_openai_voice.utils import FakeASR, FakeTTS, first_chunk_timer
+
+REPLY = "two plus three is five, is there anything else I can help you with today on this call"
+
+
+async def caller_audio(seconds: float, chunk_ms: int = 100):
+    for _ in range(int(seconds * 1000 / chunk_ms)):
+        await asyncio.sleep(chunk_ms / 1000)
+        yield bytes(4800)
+
+
+async def whole_buffer(asr: FakeASR, tts: FakeTTS, speech_s: float) -> float:
+    audio = b"".join([chunk async for chunk in caller_audio(speech_s)])
+    speech_end = time.perf_counter()
+    await asr.transcribe(audio)
+    await tts.synthesize(REPLY)
+    return time.perf_counter() - speech_end
+
+
+async def streaming(asr: FakeASR, tts: FakeTTS, speech_s: float, first_chunks: dict) -> float:
+    speech_end = 0.0
+
+    async def audio():
+        nonlocal speech_end
+        async for chunk in caller_audio(speech_s):
+            yield chunk
+        speech_end = time.perf_counter()
+
+    def record(name):
+        return lambda seconds: first_chunks[name].append(seconds)
+
+    async for _ in first_chunk_timer(asr.transcribe_stream(audio()), record("asr")):
+        pass
+    async for _ in first_chunk_timer(tts.synthesize_stream(REPLY), record("tts")):
+        return time.perf_counter() - speech_end  # first playable chunk
+    return time.perf_counter() - speech_end
+
+
+async def main(args) -> None:
+    asr = FakeASR(first_chunk_ms=args.asr_first_ms, final_ms=args.asr_final_ms)
+    tts = FakeTTS(first_chunk_ms=args.tts_first_ms, realtime_factor=args.tts_rtf)
+    first_chunks = {"asr": [], "tts": []}
+    whole, stream = [], []
+    for _ in range(args.turns):
+        whole.append(await whole_buffer(asr, tts, args.speech_s))
+        stream.append(await streaming(asr, tts, args.speech_s, first_chunks))
+
+    print(f"{args.turns} turns, {args.speech_s:.1f}s of caller speech, {len(REPLY.split())}-word reply")
+    for name, samples in (("whole-buffer", whole), ("streaming", stream)):
+        print(f"  {name:<14} speech end -> first audio  p50 {1000 * statistics.median(samples):7.1f} ms")
+    for name, samples in first_chunks.items():
+        print(f"  {name} time to first chunk  p50 {1000 * statistics.median(samples):7.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--speech-s", type=float, default=1.5)
+    parser.add_argument("--asr-first-ms", type=float, default=150)
+    parser.add_argument("--asr-final-ms", type=float, default=250)
+    parser.add_argument("--tts-first-ms", type=float, default=200)
+    parser.add_argument("--tts-rtf", type=float, default=3.0)
+    asyncio.run(main(parser.parse_args()))
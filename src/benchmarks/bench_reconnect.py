@@ -0,0 +1,158 @@
+"""
+Calls surviving Realtime connection drops.
+
+Usage (from src/):
+    python -m benchmarks.bench_reconnect [--calls 5] [--duration 20] [--drops 3]
+
+Runs `--calls` concurrent agent sessions against benchmarks.mock_realtime,
+each feeding 24 kHz mic audio in real time (utterances of a tone separated
+by silence; every `--tool-every`th turn starts with a tool call), and cuts
+every model connection `--drops` times during the run, evenly spaced. After
+each drop the mock answers the next `--reject` handshakes with HTTP 503, so
+redials are also turned away for a while. Done
+once with reconnect disabled (reconnect_max_outage=0) and once enabled.
+
+Reported per mode: calls still running at the end, utterances answered with
+audio, reconnects (and redials rejected) and their time to recover (connection lost -> reopened,
+configured, conversation replayed and buffered mic audio flushed), items
+replayed into the new sessions and mic events held during the gaps.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import numpy as np
+from langchain_core.tools import tool
+
+from langchain_openai_voice import OpenAIVoiceReactAgent
+from langchain_openai_voice.eventlog import CallLog
+from langchain_openai_voice.timeline import TurnTimeline
+
+from benchmarks.mock_realtime import MockRealtimeServer, TurnProfile
+
+CHUNK_MS = 100
+
+
+@tool
+def add(a: int, b: int) -> int:
+    """Add two numbers."""
+    return a + b
+
+
+def _chunks() -> tuple[bytes, bytes]:
+    t = np.arange(24000 * CHUNK_MS // 1000) / 24000
+    tone = (np.sin(2 * np.pi * 300 * t) * 6000).astype("<i2")
+    return tone.tobytes(), bytes(tone.nbytes)
+
+
+SPEECH, SILENCE = _chunks()
+
+
+class _Reconnects(CallLog):
+    def __init__(self):
+        super().__init__(None, None)
+        self.infos: list[dict] = []
+
+    def event(self, event: str, **fields) -> None:
+        if event == "reconnected":
+            self.infos.append(fields)
+
+
+async def call(server_url: str, args, reconnect: bool) -> dict:
+    agent = OpenAIVoiceReactAgent(
+        url=server_url, openai_api_key="test", tools=[add], external_sample_rate=24000,
+        reconnect_max_outage=15.0 if reconnect else 0,
+    )
+    log = _Reconnects()
+    utterances = 0
+    answered = 0
+    awaiting = False
+
+    async def on_output(chunk: str) -> None:
+        nonlocal answered, awaiting
+        if awaiting and '"response.audio.delta"' in chunk[:64]:
+            awaiting = False
+            answered += 1
+
+    session = asyncio.create_task(agent.aconnect(
+        agent.external_audio_stream(), on_output, timeline=TurnTimeline(), call_log=log,
+    ))
+    cycle = (args.utterance_ms + args.pause_ms) // CHUNK_MS
+    speech = args.utterance_ms // CHUNK_MS
+    start = time.perf_counter()
+    for i in range(int(args.duration * 1000 / CHUNK_MS)):
+        delay = start + i * CHUNK_MS / 1000 - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if session.done():
+            break
+        position = i % cycle
+        await agent.handleExternalAudioChunk(SPEECH if position < speech else SILENCE)
+        if position == speech and i < args.duration * 1000 / CHUNK_MS - cycle // 2:
+            utterances += 1
+            awaiting = True
+    alive = not session.done()
+    await asyncio.sleep(1.0)
+    agent.close_external_audio()
+    session.cancel()
+    try:
+        await session
+    except (asyncio.CancelledError, Exception):
+        pass
+    return {"alive": alive, "utterances": utterances, "answered": min(answered, utterances), "reconnects": log.infos}
+
+
+async def run_mode(args, reconnect: bool) -> dict:
+    profile = TurnProfile(tool_every=args.tool_every, first_audio_ms=300)
+    async with MockRealtimeServer(handshake_delay=args.handshake_ms / 1000, profile=profile) as server:
+        calls = [asyncio.create_task(call(server.url, args, reconnect)) for _ in range(args.calls)]
+        for _ in range(args.drops):
+            await asyncio.sleep(args.duration / (args.drops + 1))
+            server.reject_handshakes(args.reject)
+            server.drop_connections()
+        results = await asyncio.gather(*calls)
+    infos = [info for r in results for info in r["reconnects"]]
+    recover = sorted(1000 * info["seconds"] for info in infos)
+    return {
+        "alive": sum(r["alive"] for r in results),
+        "utterances": sum(r["utterances"] for r in results),
+        "answered": sum(r["answered"] for r in results),
+        "reconnects": len(infos),
+        "rejected": server.rejected,
+        "recover_p50_ms": statistics.median(recover) if recover else float("nan"),
+        "recover_max_ms": recover[-1] if recover else float("nan"),
+        "replayed": sum(info["replayed_items"] for info in infos),
+        "held_events": sum(info["buffered_events"] for info in infos),
+    }
+
+
+async def main(args) -> None:
+    print(
+        f"{args.calls} calls x {args.duration:.0f}s, {args.drops} connection drops "
+        f"(then {args.reject} handshakes rejected), "
+        f"handshake {args.handshake_ms} ms"
+    )
+    for reconnect in (False, True):
+        r = await run_mode(args, reconnect)
+        print(f"reconnect {'on' if reconnect else 'off'}:")
+        print(f"  calls alive at end     {r['alive']}/{args.calls}")
+        print(f"  utterances answered    {r['answered']}/{r['utterances']}")
+        print(f"  reconnects             {r['reconnects']} ({r['rejected']} handshakes rejected)")
+        print(f"  time to recover        p50 {r['recover_p50_ms']:.0f} ms  max {r['recover_max_ms']:.0f} ms")
+        print(f"  items replayed         {r['replayed']}")
+        print(f"  mic events held        {r['held_events']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=5)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--drops", type=int, default=3)
+    parser.add_argument("--reject", type=int, default=3, help="handshakes answered with 503 after each drop")
+    parser.add_argument("--handshake-ms", type=int, default=150)
+    parser.add_argument("--utterance-ms", type=int, default=1500)
+    parser.add_argument("--pause-ms", type=int, default=2500)
+    parser.add_argument("--tool-every", type=int, default=2)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,59 @@
+"""
+Streaming resampler throughput, 8 kHz <-> 24 kHz in 20 ms chunks.
+
+Usage (from src/):
+    python -m benchmarks.bench_resample [--seconds 600]
+
+Reports chunks/sec and the real-time factor per core for each direction, and
+checks that chunked output matches the whole signal resampled in one pass.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from langchain_openai_voice.resample import (
+    REALTIME_RATE,
+    TELEPHONY_RATE,
+    realtime_to_telephony,
+    telephony_to_realtime,
+)
+
+
+def _run(name: str, factory, rate: int, seconds: int) -> None:
+    chunk = rate // 50  # 20 ms
+    rng = np.random.default_rng(0)
+    signal = rng.integers(-8000, 8000, rate * 2, dtype=np.int16)
+    chunks = [signal[i : i + chunk] for i in range(0, signal.size, chunk)]
+
+    resampler = factory()
+    n_chunks = seconds * 50
+    start = time.perf_counter()
+    for i in range(n_chunks):
+        resampler.process(chunks[i % len(chunks)])
+    elapsed = time.perf_counter() - start
+
+    whole = factory().process(signal).copy()
+    streamed = factory()
+    parts = np.concatenate([streamed.process(c).copy() for c in chunks])
+    exact = np.array_equal(whole, parts)
+
+    print(
+        f"  {name:<12} {n_chunks / elapsed:>10,.0f} chunks/s  "
+        f"{seconds / elapsed:>8,.0f}x real time  chunked==whole: {exact}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=int, default=600, help="audio seconds per direction")
+    args = parser.parse_args()
+
+    print(f"{args.seconds}s of audio per direction, 20 ms chunks, single core")
+    _run("8k -> 24k", telephony_to_realtime, TELEPHONY_RATE, args.seconds)
+    _run("24k -> 8k", realtime_to_telephony, REALTIME_RATE, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
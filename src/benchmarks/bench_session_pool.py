@@ -0,0 +1,76 @@
+"""
+Time-to-session-ready with and without the pre-warmed SessionPool.
+
+Usage (from src/):
+    python -m benchmarks.bench_session_pool [--calls 20] [--handshake-ms 150]
+
+Runs against a local Realtime stand-in whose handshake and session.update
+acknowledgement are delayed to approximate the real endpoint. Calls arrive
+`--gap-ms` apart so the pool has time to refill between them.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from langchain_openai_voice import OpenAIVoiceReactAgent
+from langchain_openai_voice.pool import SessionPool
+from langchain_openai_voice.session import open_session
+
+from benchmarks.mock_realtime import MockRealtimeServer
+
+
+def _summary(name: str, samples: list[float]) -> None:
+    ms = sorted(1000 * s for s in samples)
+    p95 = ms[min(len(ms) - 1, int(0.95 * len(ms)))]
+    print(f"  {name:<16} p50 {statistics.median(ms):8.2f} ms   p95 {p95:8.2f} ms")
+
+
+async def main(args) -> None:
+    async with MockRealtimeServer(
+        handshake_delay=args.handshake_ms / 1000,
+        update_delay=args.update_ms / 1000,
+    ) as server:
+        agent = OpenAIVoiceReactAgent(url=server.url, openai_api_key="test")
+
+        cold = []
+        for _ in range(args.calls):
+            start = time.monotonic()
+            session = await open_session(
+                api_key="test",
+                model=agent.model,
+                url=agent.url,
+                session_update=agent.session_update_event(),
+                wait_ready=True,
+            )
+            cold.append(time.monotonic() - start)
+            await session.close()
+
+        pool = SessionPool.for_agent(agent, size=args.pool_size)
+        await pool.start()
+        await asyncio.sleep(3 * (args.handshake_ms + args.update_ms) / 1000 + 0.1)
+        warm = []
+        for _ in range(args.calls):
+            start = time.monotonic()
+            session = await pool.acquire()
+            warm.append(time.monotonic() - start)
+            await session.close()
+            await asyncio.sleep(args.gap_ms / 1000)
+        stats = pool.stats()
+        await pool.close()
+
+    print(f"{args.calls} calls, handshake {args.handshake_ms} ms, session.update ack {args.update_ms} ms")
+    _summary("no pool", cold)
+    _summary(f"pool (size {args.pool_size})", warm)
+    print(f"  pool hits {stats['hits']}, misses {stats['misses']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--handshake-ms", type=float, default=150)
+    parser.add_argument("--update-ms", type=float, default=50)
+    parser.add_argument("--gap-ms", type=float, default=400)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,137 @@
+"""
+Cold-start cost of the server: import time and time to first healthy response.
+
+Usage (from src/):
+    python -m benchmarks.bench_startup [--runs 5] [--modes eager,warm,lazy]
+    # fail (exit 1) when the default mode regresses past a budget
+    python -m benchmarks.bench_startup --max-import-ms 400 --max-healthy-ms 1500
+
+For each STARTUP_IMPORTS mode, in fresh interpreters:
+- import time of server.app (measured inside the process, so interpreter
+  start-up is excluded);
+- time from launching uvicorn to the first 200 from /health (what a platform
+  health check or a gunicorn worker boot waits for), and the latency of the
+  first /twilio/voice request after that.
+The slowest imports of the first mode (python -X importtime) are listed so a
+new eager import shows up by name.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import server.app; print(time.perf_counter() - t)"
+
+
+def server_env(mode: str) -> dict:
+    env = dict(os.environ)
+    env.setdefault("PUBLIC_URL", "https://example.invalid")
+    env["STARTUP_IMPORTS"] = mode
+    env["PYTHONWARNINGS"] = "ignore"
+    return env
+
+
+def import_seconds(mode: str) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=SRC, env=server_env(mode),
+        capture_output=True, text=True, check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(mode: str, top: int) -> list[tuple[float, str]]:
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import server.app"], cwd=SRC, env=server_env(mode),
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        if len(name) - len(name.lstrip()) == 3:  # direct imports of server.app
+            rows.append((int(parts[1]) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def get(url: str, method: str = "GET") -> int:
+    req = urllib.request.Request(url, method=method, data=b"" if method == "POST" else None)
+    with urllib.request.urlopen(req, timeout=5) as resp:
+        resp.read()
+        return resp.status
+
+
+def first_healthy(mode: str, port: int, timeout: float = 60.0) -> tuple[float, float]:
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server.app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=SRC, env=server_env(mode), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            try:
+                if get(f"{base}/health") == 200:
+                    break
+            except OSError:
+                pass
+            if time.perf_counter() - start > timeout or server.poll() is not None:
+                raise RuntimeError(f"server ({mode}) did not become healthy")
+            time.sleep(0.005)
+        healthy = time.perf_counter() - start
+        t = time.perf_counter()
+        get(f"{base}/twilio/voice", method="POST")
+        return healthy, time.perf_counter() - t
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(args) -> int:
+    modes = args.modes.split(",")
+    results = {}
+    for mode in modes:
+        imports = [import_seconds(mode) for _ in range(args.runs)]
+        boots = [first_healthy(mode, args.port) for _ in range(args.runs)]
+        results[mode] = (
+            statistics.median(imports),
+            statistics.median(b[0] for b in boots),
+            statistics.median(b[1] for b in boots),
+        )
+
+    print(f"{args.runs} runs per mode (medians)")
+    print(f"  {'mode':<8} {'import':>10} {'first /health':>15} {'first /twilio/voice':>21}")
+    for mode, (imp, healthy, voice) in results.items():
+        print(f"  {mode:<8} {1000 * imp:8.0f} ms {1000 * healthy:12.0f} ms {1000 * voice:18.1f} ms")
+
+    print(f"slowest direct imports of server.app ({modes[0]}):")
+    for ms, name in slowest_imports(modes[0], args.top):
+        print(f"  {ms:8.1f} ms  {name}")
+
+    imp, healthy, _ = results[modes[0]]
+    failed = False
+    if args.max_import_ms and 1000 * imp > args.max_import_ms:
+        print(f"❌ import time {1000 * imp:.0f} ms exceeds {args.max_import_ms:.0f} ms")
+        failed = True
+    if args.max_healthy_ms and 1000 * healthy > args.max_healthy_ms:
+        print(f"❌ time to first healthy response {1000 * healthy:.0f} ms exceeds {args.max_healthy_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modes", default="warm,eager,lazy", help="STARTUP_IMPORTS values; the first is checked against the budgets")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--top", type=int, default=8)
+    parser.add_argument("--max-import-ms", type=float, default=0)
+    parser.add_argument("--max-healthy-ms", type=float, default=0)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,195 @@
+"""
+Browser /ws sessions in JSON/base64 mode against binary PCM16 mode.
+
+Usage (from src/):
+    python -m benchmarks.bench_ws_binary [--sessions 20] [--duration 20]
+
+Spawns benchmarks.mock_realtime and one server worker, then runs the same
+load once per mode: `--sessions` concurrent /ws sessions, each streaming
+100 ms of 24 kHz PCM16 every 100 ms (alternating a tone and silence so the
+mock answers every utterance) and receiving the replies. JSON mode sends
+input_audio_buffer.append events and gets response.audio.delta events, as
+the browser client did before; binary mode offers the voice.pcm16
+subprotocol and sends and receives raw PCM16 binary frames.
+
+Reported per mode: bytes on the wire per session-second in each direction
+(payload plus websocket frame headers, client frames masked), audio bytes
+received (to check both modes carried the same audio) and the worker's CPU
+per session (process_cpu_seconds_total over the run).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from base64 import b64decode, b64encode
+
+import numpy as np
+
+from benchmarks.load_twilio import histogram_quantile, scrape, wait_healthy
+
+CHUNK_MS = 100
+CHUNK_BYTES = 24000 * CHUNK_MS // 1000 * 2
+
+
+def _chunks() -> tuple[bytes, bytes]:
+    t = np.arange(CHUNK_BYTES // 2) / 24000
+    tone = (np.sin(2 * np.pi * 300 * t) * 6000).astype("<i2").tobytes()
+    return tone, bytes(CHUNK_BYTES)
+
+
+SPEECH, SILENCE = _chunks()
+
+
+def frame_bytes(payload: int, masked: bool) -> int:
+    header = 2 if payload < 126 else 4 if payload < 65536 else 10
+    return payload + header + (4 if masked else 0)
+
+
+class SessionResult:
+    def __init__(self):
+        self.error: str | None = None
+        self.sent = 0         # wire bytes, client -> server
+        self.received = 0     # wire bytes, server -> client
+        self.audio = 0        # PCM16 bytes of model audio received
+
+
+async def session(ws_url: str, binary: bool, duration: float, utterance_ms: int, pause_ms: int) -> SessionResult:
+    import websockets
+
+    result = SessionResult()
+
+    async def receive(ws) -> None:
+        async for message in ws:
+            if isinstance(message, bytes):
+                result.received += frame_bytes(len(message), masked=False)
+                result.audio += len(message)
+                continue
+            raw = message.encode()
+            result.received += frame_bytes(len(raw), masked=False)
+            event = json.loads(message)
+            if event.get("type") == "response.audio.delta":
+                result.audio += len(b64decode(event["delta"]))
+
+    try:
+        subprotocols = ["voice.pcm16"] if binary else None
+        async with websockets.connect(ws_url, subprotocols=subprotocols, max_size=None) as ws:
+            if binary and ws.subprotocol != "voice.pcm16":
+                raise RuntimeError("server did not accept the voice.pcm16 subprotocol")
+            receiver = asyncio.create_task(receive(ws))
+            cycle = (utterance_ms + pause_ms) // CHUNK_MS
+            start = time.perf_counter()
+            for i in range(int(duration * 1000 / CHUNK_MS)):
+                delay = start + i * CHUNK_MS / 1000 - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                pcm = SPEECH if i % cycle < utterance_ms // CHUNK_MS else SILENCE
+                if binary:
+                    message = pcm
+                else:
+                    message = json.dumps({"type": "input_audio_buffer.append", "audio": b64encode(pcm).decode()})
+                await ws.send(message)
+                size = len(message) if binary else len(message.encode())
+                result.sent += frame_bytes(size, masked=True)
+                if receiver.done():
+                    raise RuntimeError("server closed the session")
+            await asyncio.sleep(0.5)  # let the last reply arrive
+            receiver.cancel()
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    return result
+
+
+async def run_mode(args, binary: bool) -> dict:
+    ws_url = args.server.replace("http", "ws", 1) + "/ws"
+    before = await asyncio.to_thread(scrape, args.server)
+    wall = time.perf_counter()
+    tasks = []
+    for _ in range(args.sessions):
+        tasks.append(asyncio.create_task(
+            session(ws_url, binary, args.duration, args.utterance_ms, args.pause_ms)
+        ))
+        await asyncio.sleep(args.ramp / args.sessions)
+    results = await asyncio.gather(*tasks)
+    wall = time.perf_counter() - wall
+    await asyncio.sleep(0.5)
+    after = await asyncio.to_thread(scrape, args.server)
+
+    ok = [r for r in results if not r.error]
+    seconds = args.duration * max(len(ok), 1)
+    cpu = after["process_cpu_seconds_total"] - before["process_cpu_seconds_total"]
+    return {
+        "mode": "binary" if binary else "json",
+        "failed": len(results) - len(ok),
+        "errors": sorted({r.error for r in results if r.error})[:3],
+        "up_kbps": sum(r.sent for r in ok) / seconds / 1000,
+        "down_kbps": sum(r.received for r in ok) / seconds / 1000,
+        "audio_kb": sum(r.audio for r in ok) / max(len(ok), 1) / 1000,
+        "cpu_per_session_pct": 100 * cpu / wall / args.sessions,
+        "lag_p99_ms": 1000 * histogram_quantile(before, after, "voice_event_loop_lag_seconds", 0.99),
+    }
+
+
+def spawn(args) -> list[subprocess.Popen]:
+    src = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    mock = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.mock_realtime", "--port", str(args.mock_port)],
+        cwd=src, stdout=subprocess.DEVNULL,
+    )
+    env = dict(os.environ)
+    env.setdefault("PUBLIC_URL", "https://localhost")
+    env.setdefault("OPENAI_API_KEY", "load-test")
+    env["OPENAI_REALTIME_URL"] = f"ws://127.0.0.1:{args.mock_port}/v1/realtime"
+    env["PYTHONWARNINGS"] = "ignore"
+    port = args.server.rsplit(":", 1)[-1]
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server.app:app", "--port", port, "--log-level", "warning"],
+        cwd=src, env=env, stdout=subprocess.DEVNULL,
+    )
+    return [mock, server]
+
+
+async def main(args) -> None:
+    print(f"{args.sessions} sessions x {args.duration:.0f}s per mode, {CHUNK_MS} ms PCM16 chunks at 24 kHz")
+    print(f"  {'mode':<7} {'failed':>6} {'up kB/s':>8} {'down kB/s':>10} {'audio kB':>9} {'cpu/sess':>9} {'lag p99':>8}")
+    rows = []
+    for binary in (False, True):
+        row = await run_mode(args, binary)
+        rows.append(row)
+        print(
+            f"  {row['mode']:<7} {row['failed']:>6} {row['up_kbps']:>8.1f} {row['down_kbps']:>10.1f} "
+            f"{row['audio_kb']:>9.0f} {row['cpu_per_session_pct']:>8.2f}% {row['lag_p99_ms']:>6.1f}ms"
+        )
+        for error in row["errors"]:
+            print(f"       error: {error}")
+    json_row, binary_row = rows
+    total = lambda row: row["up_kbps"] + row["down_kbps"]
+    print(
+        f"binary mode: {100 * (1 - total(binary_row) / total(json_row)):.0f}% fewer bytes on the wire, "
+        f"worker CPU per session {binary_row['cpu_per_session_pct'] - json_row['cpu_per_session_pct']:+.2f} points"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", default="http://127.0.0.1:8000")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per session")
+    parser.add_argument("--ramp", type=float, default=2.0)
+    parser.add_argument("--utterance-ms", type=int, default=1500)
+    parser.add_argument("--pause-ms", type=int, default=3500)
+    parser.add_argument("--spawn", action="store_true", help="start the mock and a server worker")
+    parser.add_argument("--mock-port", type=int, default=9100)
+    args = parser.parse_args()
+
+    processes = spawn(args) if args.spawn else []
+    try:
+        wait_healthy(args.server)
+        asyncio.run(main(args))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
@@ -0,0 +1,336 @@
+"""
+Concurrent-call load test for /twilio/stream.
+
+Usage (from src/):
+    # spawn the mock Realtime server and one server worker, then ramp calls
+    python -m benchmarks.load_twilio --spawn --calls 10,25,50,100 --duration 30
+
+    # or drive an already running worker (started with OPENAI_REALTIME_URL
+    # pointing at `python -m benchmarks.mock_realtime`)
+    python -m benchmarks.load_twilio --server http://127.0.0.1:8000 --calls 50
+
+Each simulated call is a Twilio Media Stream socket: `connected` and `start`,
+then a 20 ms μ-law `media` frame on a fixed schedule, alternating between a
+tone (the caller speaking) and silence. End-to-end latency is the time from
+the last speech frame of an utterance to the first `media` frame the server
+sends back; it includes the mock's VAD silence window and first-audio delay,
+which are printed for reference. When an utterance starts while the reply
+is still arriving (shorten --pause-ms to force it), barge-in latency is the
+time from its first speech frame to the server's `clear` message.
+
+Per step the worker's /metrics are scraped before and after to derive CPU per
+call (process_cpu_seconds_total) and event-loop lag percentiles
+(voice_event_loop_lag_seconds), plus outbound jitter-buffer underruns
+(voice_downlink_underruns_total) and the share of caller frames the speech
+gate kept from the model (voice_vad_frames_total). The sustained capacity reported at the end
+is the largest step with no failed calls or unanswered turns, e2e p95 under
+--max-p95-ms and loop-lag p99 under --max-lag-ms.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+import uuid
+from base64 import b64encode
+
+import numpy as np
+
+from langchain_openai_voice.codec import ulaw_encode
+
+FRAME_MS = 20
+FRAME_SAMPLES = 160
+
+
+def _frames() -> tuple[str, str]:
+    t = np.arange(FRAME_SAMPLES) / 8000
+    tone = (np.sin(2 * np.pi * 300 * t) * 6000).astype(np.int16)
+    speech = b64encode(ulaw_encode(tone).tobytes()).decode()
+    silence = b64encode(b"\xff" * FRAME_SAMPLES).decode()
+    return speech, silence
+
+
+SPEECH_FRAME, SILENCE_FRAME = _frames()
+
+
+def percentile(values: list[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else float("nan")
+
+
+# ---- server metrics -------------------------------------------------------
+
+def scrape(base_url: str) -> dict[str, float]:
+    with urllib.request.urlopen(f"{base_url}/metrics", timeout=5) as resp:
+        text = resp.read().decode()
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, _, value = line.rpartition(" ")
+            samples[name] = float(value)
+    return samples
+
+
+# Quantile from the delta of two scrapes of an (unlabelled) histogram,
+# interpolating linearly within the bucket like Prometheus' histogram_quantile.
+def histogram_quantile(before: dict, after: dict, name: str, q: float) -> float:
+    buckets = []
+    for key, value in after.items():
+        if key.startswith(f'{name}_bucket{{le="'):
+            le = key[len(name) + 12 : -2]
+            buckets.append((float(le), value - before.get(key, 0.0)))
+    buckets.sort()
+    if not buckets or buckets[-1][1] <= 0:
+        return float("nan")
+    rank = q * buckets[-1][1]
+    lower_bound, lower_count = 0.0, 0.0
+    for bound, count in buckets:
+        if count >= rank:
+            if bound == float("inf"):
+                return lower_bound
+            span = count - lower_count
+            return lower_bound + (bound - lower_bound) * ((rank - lower_count) / span if span else 1.0)
+        lower_bound, lower_count = bound, count
+    return lower_bound
+
+
+# ---- simulated calls ------------------------------------------------------
+
+class CallResult:
+    def __init__(self):
+        self.connected = False
+        self.error: str | None = None
+        self.turns = 0
+        self.answered = 0
+        self.latencies: list[float] = []
+        self.barge_ins: list[float] = []
+        self.media_in = 0
+        self.send_lag_max = 0.0  # how far the generator itself fell behind schedule
+
+
+async def simulated_call(ws_url: str, duration: float, utterance_ms: int, pause_ms: int) -> CallResult:
+    import websockets
+
+    result = CallResult()
+    stream_sid = f"MZ{uuid.uuid4().hex}"
+    speech_stopped_at: float | None = None
+    speech_started_at: float | None = None
+    last_media_at = 0.0
+
+    async def receive(ws) -> None:
+        nonlocal speech_stopped_at, speech_started_at, last_media_at
+        async for raw in ws:
+            message = json.loads(raw)
+            event = message.get("event")
+            if event == "clear":
+                if speech_started_at is not None:
+                    result.barge_ins.append(time.perf_counter() - speech_started_at)
+                    speech_started_at = None
+                continue
+            if event != "media":
+                continue
+            last_media_at = time.perf_counter()
+            result.media_in += 1
+            if speech_stopped_at is not None:
+                result.latencies.append(time.perf_counter() - speech_stopped_at)
+                result.answered += 1
+                speech_stopped_at = None
+
+    try:
+        async with websockets.connect(ws_url, max_size=None) as ws:
+            result.connected = True
+            await ws.send(json.dumps({"event": "connected", "protocol": "Call", "version": "1.0.0"}))
+            await ws.send(json.dumps({
+                "event": "start",
+                "streamSid": stream_sid,
+                "start": {"streamSid": stream_sid, "callSid": f"CA{uuid.uuid4().hex}",
+                          "mediaFormat": {"encoding": "audio/x-mulaw", "sampleRate": 8000, "channels": 1}},
+            }))
+            receiver = asyncio.create_task(receive(ws))
+
+            cycle = (utterance_ms + pause_ms) // FRAME_MS
+            speech_frames = utterance_ms // FRAME_MS
+            n_frames = int(duration * 1000 / FRAME_MS)
+            start = time.perf_counter()
+            for i in range(n_frames):
+                due = start + i * FRAME_MS / 1000
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    result.send_lag_max = max(result.send_lag_max, -delay)
+                position = i % cycle
+                speaking = position < speech_frames
+                await ws.send(json.dumps({
+                    "event": "media",
+                    "streamSid": stream_sid,
+                    "media": {"track": "inbound", "chunk": str(i), "timestamp": str(i * FRAME_MS),
+                              "payload": SPEECH_FRAME if speaking else SILENCE_FRAME},
+                }))
+                if position == 0 and time.perf_counter() - last_media_at < 0.1:
+                    speech_started_at = time.perf_counter()  # talking over the reply
+                if position == speech_frames - 1:
+                    result.turns += 1
+                    speech_stopped_at = time.perf_counter()
+                if receiver.done():
+                    raise RuntimeError("server closed the stream")
+            await ws.send(json.dumps({"event": "stop", "streamSid": stream_sid}))
+            receiver.cancel()
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    return result
+
+
+async def run_step(args, calls: int) -> dict:
+    ws_url = args.server.replace("http", "ws", 1) + "/twilio/stream"
+    before = await asyncio.to_thread(scrape, args.server)
+    wall = time.perf_counter()
+    tasks = []
+    for i in range(calls):
+        tasks.append(asyncio.create_task(
+            simulated_call(ws_url, args.duration, args.utterance_ms, args.pause_ms)
+        ))
+        await asyncio.sleep(args.ramp / max(calls, 1))  # spread call starts
+    results = await asyncio.gather(*tasks)
+    wall = time.perf_counter() - wall
+    await asyncio.sleep(0.5)  # let the worker close recordings/sessions
+    after = await asyncio.to_thread(scrape, args.server)
+
+    latencies = [x for r in results for x in r.latencies]
+    barge_ins = [x for r in results for x in r.barge_ins]
+    failed = [r for r in results if r.error or not r.connected]
+    # the last utterance of a call may legitimately be cut off by the hangup
+    unanswered = sum(max(0, r.turns - r.answered - 1) for r in results)
+    cpu = after["process_cpu_seconds_total"] - before["process_cpu_seconds_total"]
+    lag = "voice_event_loop_lag_seconds"
+    underruns = 'voice_downlink_underruns_total{transport="twilio"}'
+    vad = {}
+    for result in ("forwarded", "suppressed"):
+        key = f'voice_vad_frames_total{{transport="twilio",result="{result}"}}'
+        vad[result] = after.get(key, 0.0) - before.get(key, 0.0)
+    return {
+        "calls": calls,
+        "failed": len(failed),
+        "errors": sorted({r.error for r in failed if r.error})[:3],
+        "turns": sum(r.turns for r in results),
+        "unanswered": unanswered,
+        "underruns": int(after.get(underruns, 0) - before.get(underruns, 0)),
+        "vad_suppressed_pct": 100 * vad["suppressed"] / (sum(vad.values()) or float("nan")),
+        "cpu_per_call_pct": 100 * cpu / wall / calls,
+        "cpu_total_pct": 100 * cpu / wall,
+        "lag_p50_ms": 1000 * histogram_quantile(before, after, lag, 0.50),
+        "lag_p99_ms": 1000 * histogram_quantile(before, after, lag, 0.99),
+        "lag_max_ms": 1000 * after.get("voice_event_loop_lag_max_seconds", float("nan")),
+        "e2e_p50_ms": 1000 * percentile(latencies, 50),
+        "e2e_p95_ms": 1000 * percentile(latencies, 95),
+        "e2e_p99_ms": 1000 * percentile(latencies, 99),
+        "barge_in_p50_ms": 1000 * percentile(barge_ins, 50),
+        "barge_in_p95_ms": 1000 * percentile(barge_ins, 95),
+        "generator_lag_ms": 1000 * max((r.send_lag_max for r in results), default=0.0),
+    }
+
+
+def within_slo(step: dict, args) -> bool:
+    return (
+        step["failed"] == 0
+        and step["unanswered"] == 0
+        and step["e2e_p95_ms"] <= args.max_p95_ms
+        and not step["lag_p99_ms"] > args.max_lag_ms
+    )
+
+
+# ---- process management (--spawn) ------------------------------------------
+
+def spawn(args) -> list[subprocess.Popen]:
+    src = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    mock = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.mock_realtime", "--port", str(args.mock_port),
+         "--vad-silence-ms", str(args.vad_silence_ms), "--first-audio-ms", str(args.first_audio_ms),
+         "--tool-every", str(args.tool_every)],
+        cwd=src,
+    )
+    env = dict(os.environ)
+    env.setdefault("PUBLIC_URL", "https://localhost")
+    env.setdefault("OPENAI_API_KEY", "load-test")
+    env["OPENAI_REALTIME_URL"] = f"ws://127.0.0.1:{args.mock_port}/v1/realtime"
+    port = args.server.rsplit(":", 1)[-1]
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server.app:app", "--port", port, "--log-level", "warning"],
+        cwd=src, env=env, stdout=subprocess.DEVNULL,
+    )
+    return [mock, server]
+
+
+def wait_healthy(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            # 503 until the worker has warmed up and can take calls
+            with urllib.request.urlopen(f"{base_url}/health/capacity", timeout=1):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+
+
+async def main(args) -> None:
+    steps = [int(n) for n in args.calls.split(",")]
+    print(
+        f"{args.duration:.0f}s per step, {args.utterance_ms} ms utterances every "
+        f"{args.utterance_ms + args.pause_ms} ms; mock VAD silence {args.vad_silence_ms} ms, "
+        f"first audio {args.first_audio_ms} ms after speech_stopped"
+    )
+    print(
+        f"{'calls':>6} {'failed':>6} {'unans':>6} {'underrun':>8} {'vad sup':>7} {'cpu/call':>9} {'cpu':>7} "
+        f"{'lag p50':>8} {'lag p99':>8} {'lag max':>8} {'e2e p50':>8} {'e2e p95':>8} {'e2e p99':>8} "
+        f"{'barge50':>8} {'barge95':>8} {'gen lag':>8}"
+    )
+    sustained = 0
+    for calls in steps:
+        s = await run_step(args, calls)
+        print(
+            f"{s['calls']:>6} {s['failed']:>6} {s['unanswered']:>6} {s['underruns']:>8} {s['vad_suppressed_pct']:>6.0f}% {s['cpu_per_call_pct']:>8.2f}% "
+            f"{s['cpu_total_pct']:>6.1f}% {s['lag_p50_ms']:>8.1f} {s['lag_p99_ms']:>8.1f} "
+            f"{s['lag_max_ms']:>8.1f} {s['e2e_p50_ms']:>8.0f} {s['e2e_p95_ms']:>8.0f} "
+            f"{s['e2e_p99_ms']:>8.0f} {s['barge_in_p50_ms']:>8.0f} {s['barge_in_p95_ms']:>8.0f} "
+            f"{s['generator_lag_ms']:>8.1f}"
+        )
+        for error in s["errors"]:
+            print(f"       error: {error}")
+        if within_slo(s, args):
+            sustained = max(sustained, calls)
+    print(
+        f"sustained concurrent calls per worker: {sustained} "
+        f"(e2e p95 <= {args.max_p95_ms:.0f} ms, loop lag p99 <= {args.max_lag_ms:.0f} ms)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", default="http://127.0.0.1:8000")
+    parser.add_argument("--calls", default="10,25,50", help="comma-separated concurrency steps")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per call")
+    parser.add_argument("--ramp", type=float, default=2.0, help="seconds over which calls start")
+    parser.add_argument("--utterance-ms", type=int, default=1500)
+    parser.add_argument("--pause-ms", type=int, default=3500)
+    parser.add_argument("--max-p95-ms", type=float, default=1500.0)
+    parser.add_argument("--max-lag-ms", type=float, default=50.0)
+    parser.add_argument("--spawn", action="store_true", help="start the mock and a server worker")
+    parser.add_argument("--mock-port", type=int, default=9100)
+    parser.add_argument("--vad-silence-ms", type=int, default=200)
+    parser.add_argument("--first-audio-ms", type=int, default=300)
+    parser.add_argument("--tool-every", type=int, default=0)
+    args = parser.parse_args()
+
+    processes = spawn(args) if args.spawn else []
+    try:
+        wait_healthy(args.server)
+        asyncio.run(main(args))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
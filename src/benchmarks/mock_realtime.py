@@ -0,0 +1,314 @@
+"""
+Local stand-in for the OpenAI Realtime websocket.
+
+Usage:
+    async with MockRealtimeServer(handshake_delay=0.15) as server:
+        agent = OpenAIVoiceReactAgent(url=server.url, openai_api_key="test")
+
+    # or as a separate process, e.g. for benchmarks.load_twilio
+    python -m benchmarks.mock_realtime --port 9100 --first-audio-ms 300
+
+handshake_delay simulates the TCP/TLS/HTTP upgrade round trips to the real
+endpoint; update_delay the time until `session.updated` is acknowledged.
+
+With a TurnProfile the server also plays the model side of a conversation,
+using the event types aconnect handles. A simple energy VAD runs over the
+appended PCM16: speech sends `input_audio_buffer.speech_started` (cancelling
+any response in progress, as a barge-in does), and `vad_silence_ms` of
+silence after it `speech_stopped`. Each turn then produces the input
+transcript, optionally a function call (every `tool_every` turns; the reply
+starts after the `function_call_output` arrives), and `response_ms` of audio
+as `response.audio.delta` events, followed by `response.done`.
+`conversation.item.truncate` is acknowledged with `conversation.item.truncated`.
+
+drop_connections() (or GET /drop on the server's port, e.g.
+`curl http://127.0.0.1:9100/drop`) cuts every open connection without a
+closing handshake, like a network failure, to exercise reconnects.
+reject_handshakes(n) (or GET /reject?count=n) answers the next n websocket
+handshakes with HTTP 503, like an overloaded endpoint turning redials away.
+Items
+created by clients (`conversation.item.create`) are counted per kind in
+`items_created`, so a replayed conversation can be checked.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import websockets
+from websockets.exceptions import ConnectionClosed
+
+
+@dataclass
+class TurnProfile:
+    vad_threshold: int = 500          # mean |sample| of an append that counts as speech
+    vad_silence_ms: int = 200         # silence after speech before speech_stopped
+    transcript_ms: int = 150          # speech_stopped -> input transcription
+    first_audio_ms: int = 300         # speech_stopped (or tool output) -> first delta
+    response_ms: int = 2000           # audio per response
+    delta_ms: int = 100               # audio per response.audio.delta
+    realtime_factor: float = 4.0      # deltas are generated this much faster than real time
+    tool_every: int = 0               # every Nth turn starts with a function call (0: never)
+    tool_name: str = "add"
+    tool_arguments: str = '{"a": 2, "b": 3}'
+    transcript: str = "What is two plus three?"
+
+
+def _tone(ms: int, rate: int = 24000, hz: float = 440.0) -> bytes:
+    t = np.arange(rate * ms // 1000) / rate
+    return (np.sin(2 * np.pi * hz * t) * 8000).astype("<i2").tobytes()
+
+
+class _Conversation:
+    def __init__(self, server: "MockRealtimeServer", websocket):
+        self.server = server
+        self.profile = server.profile
+        self.websocket = websocket
+        self.speaking = False
+        self.silence_ms = 0.0
+        self.turns = 0
+        self.response: asyncio.Task | None = None
+        self.pending_tool: str | None = None  # call_id waiting for its output
+        self.truncations = 0
+
+    async def send(self, event: dict) -> None:
+        await self.websocket.send(json.dumps(event))
+
+    async def on_append(self, audio_b64: str) -> None:
+        pcm = np.frombuffer(base64.b64decode(audio_b64), dtype="<i2")
+        if not pcm.size:
+            return
+        ms = pcm.size * 1000 / 24000
+        loud = np.abs(pcm.astype(np.int32)).mean() >= self.profile.vad_threshold
+        if loud:
+            self.silence_ms = 0.0
+            if not self.speaking:
+                self.speaking = True
+                self.cancel_response()
+                await self.send({"type": "input_audio_buffer.speech_started", "audio_start_ms": 0})
+        elif self.speaking:
+            self.silence_ms += ms
+            if self.silence_ms >= self.profile.vad_silence_ms:
+                self.speaking = False
+                await self.send({"type": "input_audio_buffer.speech_stopped", "audio_end_ms": 0})
+                self.start_response(new_turn=True)
+
+    def cancel_response(self) -> None:
+        if self.response is not None and not self.response.done():
+            self.response.cancel()
+        self.response = None
+
+    def start_response(self, new_turn: bool = False) -> None:
+        self.cancel_response()
+        self.response = asyncio.create_task(self._respond(new_turn))
+
+    async def _respond(self, new_turn: bool) -> None:
+        try:
+            await self._play_turn(new_turn)
+        except ConnectionClosed:
+            pass  # caller hung up mid-response
+
+    async def _play_turn(self, new_turn: bool) -> None:
+        p = self.profile
+        response_id = f"resp_{uuid.uuid4().hex[:12]}"
+        item_id = f"item_{uuid.uuid4().hex[:12]}"
+        if new_turn:
+            self.turns += 1
+            await asyncio.sleep(p.transcript_ms / 1000)
+            await self.send({
+                "type": "conversation.item.input_audio_transcription.completed",
+                "item_id": f"item_{uuid.uuid4().hex[:12]}",
+                "transcript": p.transcript,
+            })
+            await asyncio.sleep(max(0, p.first_audio_ms - p.transcript_ms) / 1000)
+        else:
+            await asyncio.sleep(p.first_audio_ms / 1000)
+        await self.send({"type": "response.created", "response": {"id": response_id}})
+
+        if new_turn and p.tool_every and self.turns % p.tool_every == 0:
+            self.pending_tool = f"call_{uuid.uuid4().hex[:12]}"
+            await self.send({
+                "type": "response.function_call_arguments.done",
+                "response_id": response_id,
+                "item_id": item_id,
+                "call_id": self.pending_tool,
+                "name": p.tool_name,
+                "arguments": p.tool_arguments,
+            })
+            await self.send({"type": "response.done", "response": {"id": response_id}})
+            return
+
+        chunk = self.server.delta_audio
+        interval = p.delta_ms / 1000 / p.realtime_factor
+        for _ in range(max(1, p.response_ms // p.delta_ms)):
+            await self.send({
+                "type": "response.audio.delta",
+                "response_id": response_id,
+                "item_id": item_id,
+                "output_index": 0,
+                "content_index": 0,
+                "delta": chunk,
+            })
+            await asyncio.sleep(interval)
+        await self.send({"type": "response.audio.done", "response_id": response_id, "item_id": item_id})
+        await self.send({"type": "response.audio_transcript.done", "transcript": "Two plus three is five."})
+        await self.send({"type": "response.done", "response": {"id": response_id}})
+
+
+class MockRealtimeServer:
+    def __init__(
+        self,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        handshake_delay: float = 0.0,
+        update_delay: float = 0.0,
+        profile: TurnProfile | None = None,
+    ):
+        self.host = host
+        self.port = port
+        self.handshake_delay = handshake_delay
+        self.update_delay = update_delay
+        self.profile = profile
+        self.connections = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.items_created: Counter[str] = Counter()
+        self._open: set = set()
+        self._reject = 0
+        self._server = None
+        if profile is not None:
+            self.delta_audio = base64.b64encode(_tone(profile.delta_ms)).decode()
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}/v1/realtime"
+
+    async def __aenter__(self) -> "MockRealtimeServer":
+        self._server = await websockets.serve(
+            self._handle,
+            self.host,
+            self.port,
+            process_request=self._process_request,
+            max_size=None,
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    def drop_connections(self) -> int:
+        """Abort every open connection (no close frame); returns how many."""
+        dropped = list(self._open)
+        for websocket in dropped:
+            websocket.transport.abort()
+        self.dropped += len(dropped)
+        return len(dropped)
+
+    def reject_handshakes(self, count: int = 1) -> None:
+        """Answer the next `count` handshakes with HTTP 503."""
+        self._reject = count
+
+    async def _process_request(self, connection, request):
+        if request.path == "/drop":
+            return connection.respond(HTTPStatus.OK, f"dropped {self.drop_connections()}\n")
+        if request.path.startswith("/reject"):
+            query = parse_qs(urlsplit(request.path).query)
+            self.reject_handshakes(int(query.get("count", ["1"])[0]))
+            return connection.respond(HTTPStatus.OK, f"rejecting {self._reject}\n")
+        if self._reject > 0:
+            self._reject -= 1
+            self.rejected += 1
+            return connection.respond(HTTPStatus.SERVICE_UNAVAILABLE, "overloaded\n")
+        if self.handshake_delay:
+            await asyncio.sleep(self.handshake_delay)
+        return None
+
+    async def _handle(self, websocket) -> None:
+        self.connections += 1
+        self._open.add(websocket)
+        session = {"id": f"sess_{uuid.uuid4().hex[:12]}"}
+        conversation = _Conversation(self, websocket) if self.profile else None
+        await websocket.send(json.dumps({"type": "session.created", "session": session}))
+        try:
+            async for raw in websocket:
+                event = json.loads(raw)
+                await self.on_event(websocket, session, event, conversation)
+        except ConnectionClosed:
+            pass
+        finally:
+            self._open.discard(websocket)
+            if conversation is not None:
+                conversation.cancel_response()
+
+    async def on_event(self, websocket, session: dict, event: dict, conversation=None) -> None:
+        t = event.get("type")
+        if t == "session.update":
+            if self.update_delay:
+                await asyncio.sleep(self.update_delay)
+            session.update(event.get("session") or {})
+            await websocket.send(json.dumps({"type": "session.updated", "session": session}))
+        elif conversation is None:
+            return
+        elif t == "input_audio_buffer.append":
+            await conversation.on_append(event.get("audio", ""))
+        elif t == "conversation.item.create":
+            item = event.get("item") or {}
+            self.items_created[item.get("role") or item.get("type", "")] += 1
+            if item.get("type") == "function_call_output" and item.get("call_id") == conversation.pending_tool:
+                conversation.pending_tool = None
+        elif t == "response.create":
+            conversation.start_response()
+        elif t == "response.cancel":
+            conversation.cancel_response()
+        elif t == "conversation.item.truncate":
+            conversation.truncations += 1
+            await websocket.send(json.dumps({
+                "type": "conversation.item.truncated",
+                "item_id": event.get("item_id"),
+                "content_index": event.get("content_index", 0),
+                "audio_end_ms": event.get("audio_end_ms", 0),
+            }))
+
+
+async def _serve(args) -> None:
+    profile = TurnProfile(
+        vad_silence_ms=args.vad_silence_ms,
+        transcript_ms=args.transcript_ms,
+        first_audio_ms=args.first_audio_ms,
+        response_ms=args.response_ms,
+        realtime_factor=args.realtime_factor,
+        tool_every=args.tool_every,
+    )
+    server = MockRealtimeServer(
+        host=args.host, port=args.port, handshake_delay=args.handshake_ms / 1000, profile=profile
+    )
+    async with server:
+        print(f"mock Realtime server on {server.url}", flush=True)
+        await asyncio.Future()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--handshake-ms", type=int, default=0)
+    parser.add_argument("--vad-silence-ms", type=int, default=200)
+    parser.add_argument("--transcript-ms", type=int, default=150)
+    parser.add_argument("--first-audio-ms", type=int, default=300)
+    parser.add_argument("--response-ms", type=int, default=2000)
+    parser.add_argument("--realtime-factor", type=float, default=4.0)
+    parser.add_argument("--tool-every", type=int, default=0)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,178 @@
+"""
+Local stand-in for the Twilio Calls API.
+
+Usage:
+    async with MockTwilioServer(api_latency=0.3) as twilio:
+        dialer = OutboundDialer(..., api_base=twilio.url)
+
+    # or as a separate process; point the server at it with
+    # TWILIO_API_BASE=http://127.0.0.1:9200
+    python -m benchmarks.mock_twilio --port 9200 --api-latency-ms 300
+
+POST /2010-04-01/Accounts/{sid}/Calls.json answers after `api_latency` with a
+queued call, then plays the call's life through its StatusCallback like
+Twilio does: initiated, ringing after `ring_ms`, in-progress after
+`answer_ms` and completed `call_ms` later. Every `busy_every`-th call ends as
+busy instead of being answered. GET /stats reports what the dialer did:
+calls created, the mean and peak (any one-second window) request rate and
+the peak number of simultaneous live calls.
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from collections import deque
+
+from aiohttp import ClientSession, web
+
+
+class MockTwilioServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        *,
+        api_latency: float = 0.2,
+        ring_ms: int = 300,
+        answer_ms: int = 1000,
+        call_ms: int = 3000,
+        busy_every: int = 0,
+    ):
+        self.host = host
+        self.port = port
+        self.api_latency = api_latency
+        self.ring_ms = ring_ms
+        self.answer_ms = answer_ms
+        self.call_ms = call_ms
+        self.busy_every = busy_every
+
+        self.created: list[float] = []
+        self.live = 0
+        self.max_live = 0
+        self.callbacks_sent = 0
+        self.callbacks_failed = 0
+        self._tasks: set[asyncio.Task] = set()
+        self._session: ClientSession | None = None
+        self._runner: web.AppRunner | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def __aenter__(self) -> "MockTwilioServer":
+        app = web.Application()
+        app.router.add_post("/2010-04-01/Accounts/{account}/Calls.json", self._create_call)
+        app.router.add_get("/stats", self._stats)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        self._session = ClientSession()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await self._session.close()
+        await self._runner.cleanup()
+
+    async def _create_call(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        self.created.append(time.monotonic())
+        await asyncio.sleep(self.api_latency)
+        sid = "CA" + uuid.uuid4().hex
+        busy = self.busy_every and len(self.created) % self.busy_every == 0
+        task = asyncio.create_task(self._play_call(sid, dict(form), busy))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return web.json_response(
+            {
+                "sid": sid,
+                "account_sid": request.match_info["account"],
+                "to": form.get("To"),
+                "from": form.get("From"),
+                "status": "queued",
+                "direction": "outbound-api",
+            },
+            status=201,
+        )
+
+    async def _play_call(self, sid: str, form: dict, busy: bool) -> None:
+        callback = form.get("StatusCallback")
+
+        async def report(status: str) -> None:
+            if not callback:
+                return
+            data = {"CallSid": sid, "CallStatus": status, "To": form.get("To", ""), "From": form.get("From", "")}
+            try:
+                async with self._session.post(callback, data=data) as resp:
+                    await resp.read()
+                self.callbacks_sent += 1
+            except Exception:
+                self.callbacks_failed += 1
+
+        await report("initiated")
+        await asyncio.sleep(self.ring_ms / 1000)
+        await report("ringing")
+        await asyncio.sleep(self.answer_ms / 1000)
+        if busy:
+            await report("busy")
+            return
+        self.live += 1
+        self.max_live = max(self.max_live, self.live)
+        await report("in-progress")
+        try:
+            await asyncio.sleep(self.call_ms / 1000)
+        finally:
+            self.live -= 1
+        await report("completed")
+
+    def stats(self) -> dict:
+        # highest number of creates inside any one-second window
+        window: deque[float] = deque()
+        peak = 0
+        for t in self.created:
+            window.append(t)
+            while window[0] <= t - 1.0:
+                window.popleft()
+            peak = max(peak, len(window))
+        span = self.created[-1] - self.created[0] if len(self.created) > 1 else 0.0
+        return {
+            "created": len(self.created),
+            "mean_creates_per_second": (len(self.created) - 1) / span if span else 0.0,
+            "peak_creates_per_second": peak,
+            "live": self.live,
+            "max_live": self.max_live,
+            "callbacks_sent": self.callbacks_sent,
+            "callbacks_failed": self.callbacks_failed,
+        }
+
+    async def _stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats())
+
+
+async def _serve(args) -> None:
+    server = MockTwilioServer(
+        args.host, args.port, api_latency=args.api_latency_ms / 1000, ring_ms=args.ring_ms,
+        answer_ms=args.answer_ms, call_ms=args.call_ms, busy_every=args.busy_every,
+    )
+    async with server:
+        print(f"mock Twilio API on {server.url}")
+        await asyncio.Future()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9200)
+    parser.add_argument("--api-latency-ms", type=int, default=200)
+    parser.add_argument("--ring-ms", type=int, default=300)
+    parser.add_argument("--answer-ms", type=int, default=1000)
+    parser.add_argument("--call-ms", type=int, default=3000)
+    parser.add_argument("--busy-every", type=int, default=0)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -1,275 +1,32 @@
-import asyncio
-import json
-import websockets
-
-from contextlib import asynccontextmanager
-from typing import AsyncGenerator, AsyncIterator, Any, Callable, Coroutine
-from langchain_openai_voice.utils import amerge
-
-from langchain_core.tools import BaseTool
-from langchain_core._api import beta
-from langchain_core.utils import secret_from_env
-
-from pydantic import BaseModel, Field, SecretStr, PrivateAttr
-
-DEFAULT_MODEL = "gpt-4o-realtime-preview-2024-10-01"
-DEFAULT_URL = "wss://api.openai.com/v1/realtime"
-
-EVENTS_TO_IGNORE = {
-    "response.function_call_arguments.delta",
-    "rate_limits.updated",
-    "response.audio_transcript.delta",
-    "response.created",
-    "response.content_part.added",
-    "response.content_part.done",
-    "conversation.item.created",
-    "response.audio.done",
-    "session.created",
-    "session.updated",
-    "response.done",
-    "response.output_item.done",
+"""
+OpenAI Realtime voice agent for LangChain tools.
+
+The agent itself lives in `langchain_openai_voice.agent` and pulls in
+langchain_core, which dominates import time. It is loaded on first access of
+a name below, so the audio modules (codec, resample, downlink, vad, ...) can
+be imported on their own without that cost.
+"""
+
+import importlib
+
+_LAZY = {
+    "OpenAIVoiceReactAgent": "agent",
+    "VoiceToolExecutor": "agent",
+    "connect": "agent",
+    "DEFAULT_MODEL": "agent",
+    "EVENTS_TO_IGNORE": "agent",
+    "PASSTHROUGH_INPUT_EVENTS": "agent",
+    "PASSTHROUGH_OUTPUT_EVENTS": "agent",
 }
 
 
-@asynccontextmanager
-async def connect(
-    *,
-    api_key: str,
-    model: str,
-    url: str,
-) -> AsyncGenerator[
-    tuple[
-        Callable[[dict[str, Any] | str], Coroutine[Any, Any, None]],
-        AsyncIterator[dict[str, Any]],
-    ],
-    None,
-]:
-    """
-    Usage:
-        async with connect(model="gpt-4o-realtime-preview-2024-10-01", api_key=..., url=...) as (send_event, stream):
-            await send_event({"type": "session.update", ...})
-            async for message in stream:
-                print(message)
-    """
-
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "OpenAI-Beta": "realtime=v1",
-    }
-
-    url = url or DEFAULT_URL
-    url += f"?model={model}"
-
-    websocket = await websockets.connect(url, extra_headers=headers)
-
-    try:
-        async def send_event(event: dict[str, Any] | str) -> None:
-            formatted_event = json.dumps(event) if isinstance(event, dict) else event
-            await websocket.send(formatted_event)
-
-        async def event_stream() -> AsyncIterator[dict[str, Any]]:
-            async for raw_event in websocket:
-                yield json.loads(raw_event)
-
-        stream: AsyncIterator[dict[str, Any]] = event_stream()
-        yield send_event, stream
-    finally:
-        await websocket.close()
-
-
-class VoiceToolExecutor(BaseModel):
-    """
-    Can accept function calls and emits function call outputs to a stream.
-    """
-
-    tools_by_name: dict[str, BaseTool]
-    _trigger_future: asyncio.Future = PrivateAttr(default_factory=asyncio.Future)
-    _lock: asyncio.Lock = PrivateAttr(default_factory=asyncio.Lock)
-
-    async def _trigger_func(self) -> dict:  # returns a tool call
-        return await self._trigger_future
-
-    async def add_tool_call(self, tool_call: dict) -> None:
-        # lock to avoid simultaneous tool calls racing and missing
-        async with self._lock:
-            if self._trigger_future.done():
-                # TODO: handle simultaneous tool calls better
-                raise ValueError("Tool call adding already in progress")
-            self._trigger_future.set_result(tool_call)
-
-    async def _create_tool_call_task(self, tool_call: dict) -> asyncio.Task[dict]:
-        tool = self.tools_by_name.get(tool_call["name"])
-        if tool is None:
-            # immediately yield error, do not add task
-            raise ValueError(
-                f"tool {tool_call['name']} not found. "
-                f"Must be one of {list(self.tools_by_name.keys())}"
-            )
-
-        # try to parse args
-        try:
-            args = json.loads(tool_call["arguments"])
-        except json.JSONDecodeError:
-            raise ValueError(
-                f"failed to parse arguments `{tool_call['arguments']}`. Must be valid JSON."
-            )
-
-        async def run_tool() -> dict:
-            result = await tool.ainvoke(args)
-            try:
-                result_str = json.dumps(result)
-            except TypeError:
-                # not json serializable, use str
-                result_str = str(result)
-            return {
-                "type": "conversation.item.create",
-                "item": {
-                    "id": tool_call["call_id"],
-                    "call_id": tool_call["call_id"],
-                    "type": "function_call_output",
-                    "output": result_str,
-                },
-            }
-
-        task = asyncio.create_task(run_tool())
-        return task
-
-    async def output_iterator(self) -> AsyncIterator[dict]:  # yield events
-        trigger_task = asyncio.create_task(self._trigger_func())
-        tasks = set([trigger_task])
-        while True:
-            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
-            for task in done:
-                tasks.remove(task)
-                if task == trigger_task:
-                    async with self._lock:
-                        self._trigger_future = asyncio.Future()
-                    trigger_task = asyncio.create_task(self._trigger_func())
-                    tasks.add(trigger_task)
-                    tool_call = task.result()
-                    try:
-                        new_task = await self._create_tool_call_task(tool_call)
-                        tasks.add(new_task)
-                    except ValueError as e:
-                        yield {
-                            "type": "conversation.item.create",
-                            "item": {
-                                "id": tool_call["call_id"],
-                                "call_id": tool_call["call_id"],
-                                "type": "function_call_output",
-                                "output": (f"Error: {str(e)}"),
-                            },
-                        }
-                else:
-                    yield task.result()
-
-
-@beta()
-class OpenAIVoiceReactAgent(BaseModel):
-    model: str = Field(default=DEFAULT_MODEL)
-    api_key: SecretStr = Field(
-        alias="openai_api_key",
-        default_factory=secret_from_env("OPENAI_API_KEY", default=""),
-    )
-    instructions: str | None = None
-    tools: list[BaseTool] | None = None
-    url: str = Field(default=DEFAULT_URL)
-
-    async def aconnect(
-        self,
-        input_stream: AsyncIterator[str],
-        send_output_chunk: Callable[[str], Coroutine[Any, Any, None]],
-    ) -> None:
-        """
-        Connect to the OpenAI API and send and receive messages.
-
-        input_stream: AsyncIterator[str]
-            Stream of input events to send to the model.
-            Usually transports input_audio_buffer.append events from the microphone.
-
-        send_output_chunk: Callable[[str], Awaitable[None]]
-            Callback to receive output events from the model.
-            Usually sends response.audio.delta events to the speaker.
-        """
-        tools_by_name = {tool.name: tool for tool in (self.tools or [])}
-        tool_executor = VoiceToolExecutor(tools_by_name=tools_by_name)
-
-        async with connect(
-            model=self.model,
-            api_key=self.api_key.get_secret_value(),
-            url=self.url,
-        ) as (model_send, model_receive_stream):
-            # send tools and instructions with initial chunk
-            tool_defs = [
-                {
-                    "type": "function",
-                    "name": tool.name,
-                    "description": tool.description,
-                    "parameters": {"type": "object", "properties": tool.args},
-                }
-                for tool in tools_by_name.values()
-            ]
-            await model_send(
-                {
-                    "type": "session.update",
-                    "session": {
-                        "instructions": self.instructions,
-                        "input_audio_transcription": {
-                            "model": "whisper-1",
-                        },
-                        "tools": tool_defs,
-                    },
-                }
-            )
-
-            async for stream_key, data_raw in amerge(
-                input_mic=input_stream,
-                output_speaker=model_receive_stream,
-                tool_outputs=tool_executor.output_iterator(),
-            ):
-                try:
-                    data = json.loads(data_raw) if isinstance(data_raw, str) else data_raw
-                except json.JSONDecodeError:
-                    print("error decoding data:", data_raw)
-                    continue
-
-                if stream_key == "input_mic":
-                    await model_send(data)
-                elif stream_key == "tool_outputs":
-                    print("tool output", data)
-                    await model_send(data)
-                    await model_send({"type": "response.create", "response": {}})
-                elif stream_key == "output_speaker":
-                    t = data.get("type")
-                    if t == "response.audio.delta":
-                        await send_output_chunk(json.dumps(data))
-                    elif t == "input_audio_buffer.speech_started":
-                        print("interrupt")
-                        await send_output_chunk(json.dumps(data))
-                    elif t == "error":
-                        print("error:", data)
-                    elif t == "response.function_call_arguments.done":
-                        print("tool call", data)
-                        await tool_executor.add_tool_call(data)
-                    elif t == "response.audio_transcript.done":
-                        print("model:", data.get("transcript"))
-                    elif t == "conversation.item.input_audio_transcription.completed":
-                        print("user:", data.get("transcript"))
-                    elif t in EVENTS_TO_IGNORE:
-                        pass
-                    else:
-                        print(t)
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
 
-    # Add External audio entry for Twilio/SIP.js pipelines
-    async def handleExternalAudioChunk(self, pcm_bytes: bytes) -> None:
-        """
-        Accept raw PCM16 bytes (e.g., 8kHz mono from Twilio after μ-law decode)
-        and (in the future) forward them to the model as base64 frames.
-        Later we can implement:
-          base64_audio = base64.b64encode(pcm_bytes).decode("utf-8")
-          await model_send({"type": "input_audio_buffer.append", "audio": base64_audio})
-        """
-        print(f"[Agent] Received {len(pcm_bytes)} bytes of PCM audio")
-        return
 
 __all__ = ["OpenAIVoiceReactAgent"]
@@ -0,0 +1,608 @@
+import asyncio
+import json
+import time
+
+from contextlib import aclosing, asynccontextmanager
+from functools import partial
+from typing import AsyncGenerator, AsyncIterator, Any, Callable, Coroutine
+from langchain_openai_voice.utils import amerge, sniff_event_type
+from langchain_openai_voice.resample import (
+    REALTIME_RATE,
+    TELEPHONY_RATE,
+    StreamingResampler,
+    telephony_to_realtime,
+)
+from langchain_openai_voice.uplink import AudioUplink
+from langchain_openai_voice.session import DEFAULT_URL, RealtimeSession, open_websocket
+from langchain_openai_voice.tool_cache import ToolResultCache
+from langchain_openai_voice.timeline import TurnTimeline
+from langchain_openai_voice.eventlog import CallLog
+from langchain_openai_voice.reconnect import ReconnectingConnection
+from langchain_openai_voice.profiling import DispatchStats
+from langchain_openai_voice.playback import PlaybackTracker, delta_nbytes, sniff_item_id
+
+from langchain_core.tools import BaseTool
+from langchain_core._api import beta
+from langchain_core.utils import secret_from_env
+
+from pydantic import BaseModel, ConfigDict, Field, SecretStr, PrivateAttr
+
+DEFAULT_MODEL = "gpt-4o-realtime-preview-2024-10-01"
+
+EVENTS_TO_IGNORE = {
+    "response.function_call_arguments.delta",
+    "rate_limits.updated",
+    "response.audio_transcript.delta",
+    "response.created",
+    "response.content_part.added",
+    "response.content_part.done",
+    "conversation.item.created",
+    "conversation.item.truncated",
+    "session.created",
+    "session.updated",
+    "response.output_item.done",
+}
+
+# High-rate audio events are forwarded as the original JSON string, untouched;
+# everything else is decoded and dispatched.
+PASSTHROUGH_INPUT_EVENTS = {"input_audio_buffer.append"}
+PASSTHROUGH_OUTPUT_EVENTS = {"response.audio.delta"}
+
+
+@asynccontextmanager
+async def connect(
+    *,
+    api_key: str,
+    model: str,
+    url: str,
+    raw: bool = False,
+) -> AsyncGenerator[
+    tuple[
+        Callable[[dict[str, Any] | str], Coroutine[Any, Any, None]],
+        AsyncIterator[dict[str, Any] | str],
+    ],
+    None,
+]:
+    """
+    Usage:
+        async with connect(model="gpt-4o-realtime-preview-2024-10-01", api_key=..., url=...) as (send_event, stream):
+            await send_event({"type": "session.update", ...})
+            async for message in stream:
+                print(message)
+
+    With raw=True the stream yields the undecoded JSON strings.
+    """
+
+    websocket = await open_websocket(api_key=api_key, model=model, url=url)
+
+    try:
+        async def send_event(event: dict[str, Any] | str) -> None:
+            formatted_event = json.dumps(event) if isinstance(event, dict) else event
+            await websocket.send(formatted_event)
+
+        async def event_stream() -> AsyncIterator[dict[str, Any] | str]:
+            async for raw_event in websocket:
+                yield raw_event if raw else json.loads(raw_event)
+
+        stream: AsyncIterator[dict[str, Any] | str] = event_stream()
+        yield send_event, stream
+    finally:
+        await websocket.close()
+
+
+def _function_call_output(call_id: str, output: str) -> dict:
+    return {
+        "type": "conversation.item.create",
+        "item": {
+            "id": call_id,
+            "call_id": call_id,
+            "type": "function_call_output",
+            "output": output,
+        },
+    }
+
+
+class VoiceToolExecutor(BaseModel):
+    """
+    Can accept function calls and emits function call outputs to a stream.
+
+    Any number of calls may be in flight; each output is emitted as soon as its
+    call finishes. Calls to the same tool are limited to `max_concurrency` at a
+    time (override per tool in `tool_concurrency`), and a call that runs past
+    its timeout (`timeout`, overridable in `tool_timeouts`) or raises produces
+    an error output instead of hanging the turn. With a `cache`, repeated and
+    concurrent identical calls are served from / share one execution.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    tools_by_name: dict[str, BaseTool]
+    timeout: float | None = 30.0
+    tool_timeouts: dict[str, float] = Field(default_factory=dict)
+    max_concurrency: int = 4
+    tool_concurrency: dict[str, int] = Field(default_factory=dict)
+    cache: ToolResultCache | None = None
+
+    # ("call", (tool_call, generation)) from add_tool_call, ("done", task) when
+    # a call finishes; cancel_all() bumps the generation to void queued calls
+    _queue: asyncio.Queue = PrivateAttr(default_factory=asyncio.Queue)
+    _generation: int = PrivateAttr(default=0)
+    _tasks: dict[str, asyncio.Task] = PrivateAttr(default_factory=dict)
+    _semaphores: dict[str, asyncio.Semaphore] = PrivateAttr(default_factory=dict)
+    _pending: int = PrivateAttr(default=0)
+    _interrupted: bool = PrivateAttr(default=False)
+    _cancel_reason: str | None = PrivateAttr(default=None)
+
+    async def add_tool_call(self, tool_call: dict) -> None:
+        self._interrupted = False
+        self._pending += 1
+        self._queue.put_nowait(("call", (tool_call, self._generation)))
+
+    def cancel_all(self, reason: str | None = None) -> int:
+        """
+        Cancel every in-flight call (e.g. on barge-in). Each one still emits an
+        error output, naming `reason`, so the conversation has an output for
+        every call. Returns the number of calls cancelled (running or not yet
+        started).
+        """
+        if self._pending:
+            self._interrupted = True
+        self._cancel_reason = reason
+        self._generation += 1
+        for task in self._tasks.values():
+            task.cancel(reason)
+        return self._pending
+
+    @property
+    def in_flight(self) -> int:
+        return self._pending
+
+    def should_respond(self) -> bool:
+        """True once every call has produced its output and none was interrupted."""
+        return self._pending == 0 and not self._interrupted
+
+    def _semaphore(self, name: str) -> asyncio.Semaphore:
+        sem = self._semaphores.get(name)
+        if sem is None:
+            limit = self.tool_concurrency.get(name, self.max_concurrency)
+            sem = self._semaphores[name] = asyncio.Semaphore(limit)
+        return sem
+
+    def _cancelled_output(self, call_id: str) -> dict:
+        reason = self._cancel_reason
+        return _function_call_output(
+            call_id, f"Error: tool call cancelled ({reason})" if reason else "Error: tool call cancelled"
+        )
+
+    def _create_tool_call_task(self, tool_call: dict) -> asyncio.Task[dict]:
+        tool = self.tools_by_name.get(tool_call["name"])
+        if tool is None:
+            # immediately yield error, do not add task
+            raise ValueError(
+                f"tool {tool_call['name']} not found. "
+                f"Must be one of {list(self.tools_by_name.keys())}"
+            )
+
+        # try to parse args
+        try:
+            args = json.loads(tool_call["arguments"])
+        except json.JSONDecodeError:
+            raise ValueError(
+                f"failed to parse arguments `{tool_call['arguments']}`. Must be valid JSON."
+            )
+
+        call_id = tool_call["call_id"]
+        timeout = self.tool_timeouts.get(tool.name, self.timeout)
+
+        async def run_tool() -> dict:
+            async def invoke() -> str:
+                async with self._semaphore(tool.name):
+                    result = await tool.ainvoke(args)
+                try:
+                    return json.dumps(result)
+                except TypeError:
+                    # not json serializable, use str
+                    return str(result)
+
+            policy = self.cache.policy_for(tool) if self.cache is not None else None
+            try:
+                if policy is not None:
+                    call = self.cache.get_or_run(tool.name, args, policy, invoke)
+                else:
+                    call = invoke()
+                # the timeout covers waiting for a concurrency slot as well
+                result_str = await asyncio.wait_for(call, timeout)
+            except asyncio.TimeoutError:
+                return _function_call_output(
+                    call_id, f"Error: tool {tool.name} timed out after {timeout}s"
+                )
+            except asyncio.CancelledError:
+                return self._cancelled_output(call_id)
+            except Exception as e:
+                return _function_call_output(call_id, f"Error: {e}")
+            return _function_call_output(call_id, result_str)
+
+        task = asyncio.create_task(run_tool(), name=call_id)
+        task.add_done_callback(lambda t: self._queue.put_nowait(("done", t)))
+        self._tasks[call_id] = task
+        return task
+
+    async def output_iterator(self) -> AsyncIterator[dict]:  # yield events
+        try:
+            while True:
+                kind, item = await self._queue.get()
+                if kind == "call":
+                    tool_call, generation = item
+                    if generation != self._generation:
+                        self._pending -= 1
+                        yield self._cancelled_output(tool_call["call_id"])
+                        continue
+                    try:
+                        self._create_tool_call_task(tool_call)
+                    except ValueError as e:
+                        self._pending -= 1
+                        yield _function_call_output(tool_call["call_id"], f"Error: {str(e)}")
+                else:
+                    call_id = item.get_name()
+                    if self._tasks.get(call_id) is item:
+                        del self._tasks[call_id]
+                    self._pending -= 1
+                    if item.cancelled():
+                        # cancelled before run_tool started running
+                        yield self._cancelled_output(call_id)
+                    else:
+                        yield item.result()
+        finally:
+            # caller hung up / session ended: stop any running tools
+            for task in self._tasks.values():
+                task.cancel()
+
+
+@beta()
+class OpenAIVoiceReactAgent(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    model: str = Field(default=DEFAULT_MODEL)
+    api_key: SecretStr = Field(
+        alias="openai_api_key",
+        default_factory=secret_from_env("OPENAI_API_KEY", default=""),
+    )
+    instructions: str | None = None
+    tools: list[BaseTool] | None = None
+    url: str = Field(default=DEFAULT_URL)
+    # Sample rate of audio passed to handleExternalAudioChunk (Twilio: 8 kHz).
+    external_sample_rate: int = Field(default=TELEPHONY_RATE)
+    # External audio is coalesced into append events of this length, and
+    # never held longer than uplink_max_delay_ms (defaults to the batch length).
+    uplink_batch_ms: int = Field(default=100)
+    uplink_max_delay_ms: int | None = None
+    # Tool calls run concurrently; each is bounded by tool_timeout seconds.
+    tool_timeout: float | None = 30.0
+    max_concurrent_tool_calls: int = 4
+    cancel_tools_on_interrupt: bool = True
+    # Shared across calls to reuse results of repeated tool calls.
+    tool_cache: ToolResultCache | None = None
+    # A dropped Realtime connection is redialed (with the conversation
+    # replayed) for up to this many seconds; 0 ends the session instead.
+    reconnect_max_outage: float = 15.0
+    # Shared across calls; times every dispatched event by source and type.
+    dispatch_stats: DispatchStats | None = None
+
+    _uplink_resampler: StreamingResampler | None = PrivateAttr(default=None)
+    _uplink: AudioUplink | None = PrivateAttr(default=None)
+    _playback: PlaybackTracker | None = PrivateAttr(default=None)
+
+    async def aconnect(
+        self,
+        input_stream: AsyncIterator[str],
+        send_output_chunk: Callable[[str], Coroutine[Any, Any, None]],
+        *,
+        session: RealtimeSession | None = None,
+        timeline: TurnTimeline | None = None,
+        call_log: CallLog | None = None,
+    ) -> None:
+        """
+        Connect to the OpenAI API and send and receive messages.
+
+        input_stream: AsyncIterator[str]
+            Stream of input events to send to the model.
+            Usually transports input_audio_buffer.append events from the microphone.
+
+        send_output_chunk: Callable[[str], Awaitable[None]]
+            Callback to receive output events from the model.
+            Usually sends response.audio.delta events to the speaker; also
+            gets response.audio.done (end of an item's audio) and
+            input_audio_buffer.speech_started (barge-in).
+
+        session: RealtimeSession | None
+            An already connected session configured with this agent's
+            session_update_event() (e.g. from a SessionPool). Skips the
+            handshake and session.update; the session is closed on return.
+
+        timeline: TurnTimeline | None
+            Receives per-turn latency marks (speech stopped, transcript,
+            first audio, response done, tool round trips, barge-in).
+
+        call_log: CallLog | None
+            Receives the session's records: user and model transcripts, tool
+            calls and outputs, barge-ins, errors and unhandled event types.
+            Without one they are printed.
+
+        If the model connection drops, it is reopened with backoff, configured
+        again and given back the recent conversation; input sent meanwhile is
+        held and flushed (see reconnect.ReconnectingConnection).
+
+        On `input_audio_buffer.speech_started` the rest of the audio being
+        played is dropped, the event is passed to send_output_chunk so the
+        client can flush what it has buffered, and the model's item is
+        truncated to what was actually heard.
+        """
+        tools_by_name = {tool.name: tool for tool in (self.tools or [])}
+
+        if self.reconnect_max_outage > 0:
+            await self._run_reconnecting(
+                tools_by_name, session, input_stream, send_output_chunk, timeline, call_log,
+            )
+            return
+
+        if session is not None:
+            try:
+                await self._run(
+                    tools_by_name, session.send_event, session.events(raw=True),
+                    input_stream, send_output_chunk, timeline, call_log,
+                )
+            finally:
+                await session.close()
+            return
+
+        async with connect(
+            model=self.model,
+            api_key=self.api_key.get_secret_value(),
+            url=self.url,
+            raw=True,
+        ) as (model_send, model_receive_stream):
+            # send tools and instructions with initial chunk
+            await model_send(self.session_update_event())
+            await self._run(
+                tools_by_name, model_send, model_receive_stream,
+                input_stream, send_output_chunk, timeline, call_log,
+            )
+
+    async def _run_reconnecting(
+        self,
+        tools_by_name: dict[str, BaseTool],
+        session: RealtimeSession | None,
+        input_stream: AsyncIterator[str],
+        send_output_chunk: Callable[[str], Coroutine[Any, Any, None]],
+        timeline: TurnTimeline | None,
+        call_log: CallLog | None,
+    ) -> None:
+        timeline = timeline or TurnTimeline()
+        log = call_log or CallLog(None, None)
+
+        def on_reconnect(info: dict) -> None:
+            timeline.reconnect(info["seconds"])
+            log.event("reconnected", **info)
+
+        connection = ReconnectingConnection(
+            partial(open_websocket, api_key=self.api_key.get_secret_value(), model=self.model, url=self.url),
+            self.session_update_event(),
+            websocket=session.websocket if session is not None else None,
+            max_outage=self.reconnect_max_outage,
+            on_reconnect=on_reconnect,
+        )
+        try:
+            await connection.connect()
+            await self._run(
+                tools_by_name, connection.send, connection.events(),
+                input_stream, send_output_chunk, timeline, call_log,
+            )
+        finally:
+            await connection.close()
+
+    def session_update_event(self) -> dict:
+        """The session.update event carrying this agent's instructions and tools."""
+        tool_defs = [
+            {
+                "type": "function",
+                "name": tool.name,
+                "description": tool.description,
+                "parameters": {"type": "object", "properties": tool.args},
+            }
+            for tool in (self.tools or [])
+        ]
+        return {
+            "type": "session.update",
+            "session": {
+                "instructions": self.instructions,
+                "input_audio_transcription": {
+                    "model": "whisper-1",
+                },
+                "tools": tool_defs,
+            },
+        }
+
+    async def _run(
+        self,
+        tools_by_name: dict[str, BaseTool],
+        model_send: Callable[[dict[str, Any] | str], Coroutine[Any, Any, None]],
+        model_receive_stream: AsyncIterator[dict[str, Any] | str],
+        input_stream: AsyncIterator[str],
+        send_output_chunk: Callable[[str], Coroutine[Any, Any, None]],
+        timeline: TurnTimeline | None = None,
+        call_log: CallLog | None = None,
+    ) -> None:
+        timeline = timeline or TurnTimeline()
+        log = call_log or CallLog(None, None)
+        stats = self.dispatch_stats
+        playback = self._playback = PlaybackTracker()
+        tool_executor = VoiceToolExecutor(
+            tools_by_name=tools_by_name,
+            timeout=self.tool_timeout,
+            max_concurrency=self.max_concurrent_tool_calls,
+            cache=self.tool_cache,
+        )
+
+        merged = amerge(
+            input_mic=input_stream,
+            output_speaker=model_receive_stream,
+            tool_outputs=tool_executor.output_iterator(),
+        )
+        # aclosing: stop the per-stream pumps as soon as the session ends
+        async with aclosing(merged):
+            async for stream_key, data_raw in merged:
+                dispatched_at = time.perf_counter()
+                t = None
+                try:
+                    if isinstance(data_raw, str):
+                        # fast path: audio in/out goes through without a decode/encode
+                        t = sniff_event_type(data_raw)
+                        if stream_key == "input_mic" and t in PASSTHROUGH_INPUT_EVENTS:
+                            await model_send(data_raw)
+                            continue
+                        if stream_key == "output_speaker" and t in PASSTHROUGH_OUTPUT_EVENTS:
+                            item_id = sniff_item_id(data_raw)
+                            if playback.should_drop(item_id):
+                                continue
+                            timeline.audio_delta()
+                            playback.sent(item_id, delta_nbytes(data_raw))
+                            await send_output_chunk(data_raw)
+                            continue
+
+                    try:
+                        data = json.loads(data_raw) if isinstance(data_raw, str) else data_raw
+                    except json.JSONDecodeError:
+                        log.event("decode_error", data=data_raw)
+                        continue
+                    t = data.get("type")
+
+                    if stream_key == "input_mic":
+                        await model_send(data)
+                    elif stream_key == "tool_outputs":
+                        item = data["item"]
+                        log.event("tool_output", tool_call_id=item["call_id"], output=item.get("output"))
+                        await model_send(data)
+                        timeline.tool_output(data["item"]["call_id"])
+                        # one response after the last of a batch of parallel calls,
+                        # none if the user interrupted while tools were running
+                        if tool_executor.should_respond():
+                            await model_send({"type": "response.create", "response": {}})
+                    elif stream_key == "output_speaker":
+                        if t == "response.audio.delta":
+                            if playback.should_drop(data.get("item_id")):
+                                continue
+                            timeline.audio_delta()
+                            playback.sent(
+                                data.get("item_id"),
+                                len(data.get("delta", "")) * 3 // 4,
+                                data.get("content_index", 0),
+                            )
+                            await send_output_chunk(json.dumps(data))
+                        elif t == "input_audio_buffer.speech_started":
+                            started = time.perf_counter()
+                            truncate = playback.interrupt()
+                            log.event("speech_started", interrupted=truncate is not None)
+                            # client first: it holds the audio the caller is hearing
+                            await send_output_chunk(json.dumps(data))
+                            if truncate is not None:
+                                await model_send(truncate)
+                            timeline.barge_in(time.perf_counter() - started)
+                            if self.cancel_tools_on_interrupt:
+                                tool_executor.cancel_all("interrupted by user")
+                        elif t == "response.audio.done":
+                            playback.audio_done(data.get("item_id"))
+                            await send_output_chunk(json.dumps(data))
+                        elif t == "error":
+                            log.event("error", error=data.get("error"))
+                        elif t == "response.function_call_arguments.done":
+                            log.event(
+                                "tool_call", tool_call_id=data["call_id"],
+                                name=data.get("name"), arguments=data.get("arguments"),
+                            )
+                            timeline.tool_call(data["call_id"], data.get("name", ""))
+                            await tool_executor.add_tool_call(data)
+                        elif t == "response.audio_transcript.done":
+                            log.event("model_transcript", text=data.get("transcript"))
+                        elif t == "conversation.item.input_audio_transcription.completed":
+                            timeline.transcript_completed()
+                            log.event("user_transcript", text=data.get("transcript"))
+                        elif t == "input_audio_buffer.speech_stopped":
+                            log.next_turn()
+                            timeline.speech_stopped()
+                        elif t == "response.done":
+                            timeline.response_done()
+                        elif t in EVENTS_TO_IGNORE:
+                            pass
+                        else:
+                            log.event("unhandled_event", event_type=t)
+                finally:
+                    if stats is not None:
+                        stats.timer(stream_key, t, dispatched_at)
+
+    # Add External audio entry for Twilio/SIP.js pipelines
+    async def handleExternalAudioChunk(self, pcm_bytes: bytes | memoryview) -> None:
+        """
+        Accept raw PCM16 as bytes or any buffer such as an int16 ndarray
+        (e.g., 8kHz mono from Twilio after μ-law decode), resample it to the
+        model's 24kHz (unless external_sample_rate already is) and queue it on
+        the uplink.
+
+        Frames are coalesced into batched input_audio_buffer.append events,
+        which external_audio_stream() yields; pass that stream to aconnect().
+        """
+        self._get_uplink().push(self._resample_uplink(pcm_bytes))
+
+    def send_external_event(self, event: str) -> None:
+        """
+        Queue a client event (JSON text, e.g. input_audio_buffer.commit) on the
+        uplink, after the external audio received so far.
+        """
+        self._get_uplink().push_event(event)
+
+    def external_audio_stream(self) -> AsyncIterator[str]:
+        """
+        Input stream of batched append events built from handleExternalAudioChunk.
+        Ends after close_external_audio().
+        """
+        return aiter(self._get_uplink())
+
+    def close_external_audio(self) -> None:
+        """Flush any buffered external audio and end external_audio_stream()."""
+        if self._uplink is not None:
+            self._uplink.close()
+
+    def uplink_stats(self) -> dict:
+        return self._uplink.stats() if self._uplink is not None else {}
+
+    def uplink_queue_depth(self) -> int:
+        """External audio batches not yet picked up by the model connection."""
+        return self._uplink.queue_depth if self._uplink is not None else 0
+
+    def playback_stats(self) -> dict:
+        """Barge-in counters of the current (or last) aconnect session."""
+        return self._playback.stats() if self._playback is not None else {}
+
+    def _get_uplink(self) -> AudioUplink:
+        if self._uplink is None:
+            self._uplink = AudioUplink(
+                batch_ms=self.uplink_batch_ms,
+                max_delay_ms=self.uplink_max_delay_ms,
+            )
+        return self._uplink
+
+    # Resample external audio to the model rate. Returns a view into the
+    # per-call resampler's buffer (valid until the next chunk), so the frame
+    # path does not allocate.
+    def _resample_uplink(self, pcm_bytes: bytes | memoryview):
+        if self.external_sample_rate == REALTIME_RATE:
+            return pcm_bytes  # e.g. a browser already capturing at 24 kHz
+        if self._uplink_resampler is None:
+            if self.external_sample_rate == TELEPHONY_RATE:
+                self._uplink_resampler = telephony_to_realtime()
+            else:
+                self._uplink_resampler = StreamingResampler(
+                    self.external_sample_rate, REALTIME_RATE
+                )
+        return self._uplink_resampler.process(pcm_bytes)
+
+__all__ = ["OpenAIVoiceReactAgent"]
@@ -0,0 +1,111 @@
+"""
+G.711 μ-law <-> PCM16 codec backed by NumPy lookup tables.
+
+Twilio Media Streams carry 8 kHz μ-law in 20 ms frames (160 bytes). Decoding is
+a single gather from a 256-entry table and encoding a single gather from a
+65536-entry table indexed by the raw 16-bit sample, so both directions are one
+vectorized pass with no per-sample Python work.
+"""
+
+import numpy as np
+
+ULAW_BIAS = 0x84
+ULAW_CLIP = 32635
+
+# 20 ms of 8 kHz mono audio, the frame size Twilio sends and expects.
+TWILIO_FRAME_SAMPLES = 160
+
+
+def _build_decode_table() -> np.ndarray:
+    u = ~np.arange(256, dtype=np.uint8)
+    sign = u & 0x80
+    exponent = (u >> 4).astype(np.int32) & 0x07
+    mantissa = u.astype(np.int32) & 0x0F
+    magnitude = (((mantissa << 3) + ULAW_BIAS) << exponent) - ULAW_BIAS
+    return np.where(sign != 0, -magnitude, magnitude).astype(np.int16)
+
+
+def _build_encode_table() -> np.ndarray:
+    # Index is the int16 sample reinterpreted as uint16.
+    pcm = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32)
+    sign = np.where(pcm < 0, 0x80, 0x00)
+    magnitude = np.minimum(np.abs(pcm), ULAW_CLIP) + ULAW_BIAS
+    # exponent = position of the highest set bit above bit 7, clamped to 0..7
+    exponent = np.clip(np.floor(np.log2(magnitude)).astype(np.int32) - 7, 0, 7)
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8)
+
+
+ULAW_DECODE_TABLE = _build_decode_table()
+ULAW_ENCODE_TABLE = _build_encode_table()
+
+
+def _as_uint8(data) -> np.ndarray:
+    if isinstance(data, np.ndarray):
+        return data.view(np.uint8).reshape(-1)
+    return np.frombuffer(data, dtype=np.uint8)
+
+
+def _as_int16(pcm) -> np.ndarray:
+    if isinstance(pcm, np.ndarray):
+        return pcm if pcm.dtype == np.int16 else pcm.astype(np.int16)
+    return np.frombuffer(pcm, dtype=np.int16)
+
+
+# Decode μ-law bytes to int16 PCM. If `out` is given it must hold at least
+# len(data) samples; the filled prefix is returned as a view.
+def ulaw_decode(data, out: np.ndarray | None = None) -> np.ndarray:
+    codes = _as_uint8(data)
+    if out is None:
+        return ULAW_DECODE_TABLE[codes]
+    view = out if out.size == codes.size else out[: codes.size]
+    ULAW_DECODE_TABLE.take(codes, out=view, mode="clip")
+    return view
+
+
+# Encode int16 PCM (ndarray or PCM16 little-endian bytes) to μ-law.
+# If `out` is given it must hold at least len(pcm) bytes.
+def ulaw_encode(pcm, out: np.ndarray | None = None) -> np.ndarray:
+    index = _as_int16(pcm).view(np.uint16)
+    if out is None:
+        return ULAW_ENCODE_TABLE[index]
+    view = out if out.size == index.size else out[: index.size]
+    ULAW_ENCODE_TABLE.take(index, out=view, mode="clip")
+    return view
+
+
+class MuLawCodec:
+    """
+    Per-call μ-law codec with reusable output buffers.
+
+    decode() and encode() return views into internal buffers that stay valid
+    until the next call in the same direction. Copy (e.g. with .tobytes()) if
+    the result has to outlive that. Buffers grow on demand and are then reused,
+    so the steady-state 20 ms frame path does not allocate.
+    """
+
+    def __init__(self, frame_samples: int = TWILIO_FRAME_SAMPLES):
+        self._pcm_out = np.empty(frame_samples, dtype=np.int16)
+        self._ulaw_out = np.empty(frame_samples, dtype=np.uint8)
+
+    # Inbound: μ-law payload from Twilio -> int16 PCM view.
+    def decode(self, ulaw) -> np.ndarray:
+        n = len(ulaw)
+        if n > self._pcm_out.size:
+            self._pcm_out = np.empty(n, dtype=np.int16)
+        return ulaw_decode(ulaw, out=self._pcm_out)
+
+    # Outbound: int16 PCM (array or PCM16 bytes) -> μ-law view.
+    def encode(self, pcm) -> np.ndarray:
+        samples = _as_int16(pcm)
+        if samples.size > self._ulaw_out.size:
+            self._ulaw_out = np.empty(samples.size, dtype=np.uint8)
+        return ulaw_encode(samples, out=self._ulaw_out)
+
+
+__all__ = [
+    "MuLawCodec",
+    "TWILIO_FRAME_SAMPLES",
+    "ulaw_decode",
+    "ulaw_encode",
+]
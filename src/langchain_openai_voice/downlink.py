@@ -0,0 +1,192 @@
+"""
+Downlink stage for telephony (Twilio Media Streams).
+
+The model streams `response.audio.delta` events of arbitrary length, usually
+faster than real time. Twilio expects 8 kHz μ-law and plays whatever it is
+sent from its own buffer, so forwarding deltas as they arrive floods that
+buffer (and makes barge-in `clear` throw away seconds of audio), while
+forwarding them late makes the caller hear gaps.
+
+PacedDownlink resamples and encodes each delta on arrival, re-frames the
+μ-law stream into exact 20 ms frames and sends one frame per 20 ms from a
+per-call task. A small adaptive jitter buffer sits in front of the pacer:
+playback of a response starts once `target_ms` of audio is buffered (or the
+response has ended), an underrun (buffer empty while the response is still
+streaming) raises the target by one frame, and a long stretch without
+underruns lowers it again.
+"""
+
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable
+
+from langchain_openai_voice.codec import TWILIO_FRAME_SAMPLES, MuLawCodec
+from langchain_openai_voice.resample import realtime_to_telephony
+
+FRAME_MS = 20
+
+
+class PacedDownlink:
+    """
+    24 kHz PCM16 in, paced 20 ms 8 kHz μ-law frames out via `send_frame`.
+
+    push(), end_of_response() and clear() are synchronous; run() is the pacer
+    and should be started as a task for the lifetime of the call.
+    """
+
+    def __init__(
+        self,
+        send_frame: Callable[[bytes], Awaitable[None]],
+        *,
+        target_ms: int = 60,
+        min_target_ms: int = 40,
+        max_target_ms: int = 300,
+        lead_frames: int = 2,
+        relax_after_ms: int = 30_000,
+        max_buffer_ms: int = 120_000,
+        on_underrun: Callable[[], None] | None = None,
+    ):
+        self.send_frame = send_frame
+        self.target_ms = target_ms
+        self.min_target_ms = min_target_ms
+        self.max_target_ms = max_target_ms
+        self.lead_frames = lead_frames
+        self.relax_frames = relax_after_ms // FRAME_MS
+        self.max_frames = max_buffer_ms // FRAME_MS
+        self.on_underrun = on_underrun
+
+        self._codec = MuLawCodec()
+        self._resampler = realtime_to_telephony()
+        self._frames: deque[bytes] = deque()
+        self._partial = bytearray()
+        self._enqueued = 0      # frames ever queued
+        self._ended_at = 0      # value of _enqueued at the last end_of_response()
+        self._playing = False
+        self._stable_frames = 0
+        self._wake = asyncio.Event()
+        self._closed = False
+
+        self.frames_sent = 0
+        self.underruns = 0
+        self.cleared_frames = 0
+        self.overflow_frames = 0
+        self.max_depth_ms = 0
+
+    @property
+    def depth_ms(self) -> int:
+        """Audio buffered server-side and not yet sent."""
+        return len(self._frames) * FRAME_MS
+
+    def push(self, pcm) -> None:
+        if self._closed:
+            return
+        self._partial += memoryview(self._codec.encode(self._resampler.process(pcm)))
+        n = len(self._partial) // TWILIO_FRAME_SAMPLES
+        if not n:
+            return
+        end = n * TWILIO_FRAME_SAMPLES
+        chunk = bytes(self._partial[:end])
+        del self._partial[:end]
+        self._frames.extend(chunk[i : i + TWILIO_FRAME_SAMPLES] for i in range(0, end, TWILIO_FRAME_SAMPLES))
+        self._enqueued += n
+        while len(self._frames) > self.max_frames:
+            self._frames.popleft()
+            self.overflow_frames += 1
+        self.max_depth_ms = max(self.max_depth_ms, self.depth_ms)
+        self._wake.set()
+
+    def push_frames(self, frames) -> None:
+        """Queue ready-made 20 ms μ-law frames (e.g. a cached phrase) as a complete response."""
+        if self._closed:
+            return
+        self._partial.clear()
+        self._frames.extend(frames)
+        self._enqueued = self._ended_at = self._enqueued + len(frames)
+        self.max_depth_ms = max(self.max_depth_ms, self.depth_ms)
+        self._wake.set()
+
+    def end_of_response(self) -> None:
+        """The current response has no more audio: pad and release the last frame."""
+        if self._partial:
+            self._partial += b"\xff" * (TWILIO_FRAME_SAMPLES - len(self._partial))  # μ-law silence
+            self._frames.append(bytes(self._partial))
+            self._partial.clear()
+            self._enqueued += 1
+        self._ended_at = self._enqueued
+        self._wake.set()
+
+    def clear(self) -> int:
+        """Drop everything not yet sent (barge-in). Returns the dropped milliseconds."""
+        dropped = len(self._frames)
+        self._frames.clear()
+        self._partial.clear()
+        self._resampler.reset()
+        self._ended_at = self._enqueued
+        self._playing = False
+        self.cleared_frames += dropped
+        return dropped * FRAME_MS
+
+    def close(self) -> None:
+        self._closed = True
+        self._wake.set()
+
+    def _ready(self) -> bool:
+        if not self._frames:
+            return False
+        return self.depth_ms >= self.target_ms or self._ended_at == self._enqueued
+
+    async def _send_next(self) -> bool:
+        if self._frames:
+            await self.send_frame(self._frames.popleft())
+            self.frames_sent += 1
+            self._stable_frames += 1
+            if self._stable_frames >= self.relax_frames and self.target_ms > self.min_target_ms:
+                self.target_ms -= FRAME_MS
+                self._stable_frames = 0
+            return True
+        self._playing = False
+        if self._ended_at != self._enqueued or self._partial:
+            # still streaming but nothing to play: the caller hears a gap
+            self.underruns += 1
+            self._stable_frames = 0
+            self.target_ms = min(self.max_target_ms, self.target_ms + FRAME_MS)
+            if self.on_underrun is not None:
+                self.on_underrun()
+        return False
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        interval = FRAME_MS / 1000
+        next_at = 0.0
+        while not self._closed:
+            if not self._playing:
+                if not self._ready():
+                    self._wake.clear()
+                    await self._wake.wait()
+                    continue
+                self._playing = True
+                # a couple of frames ahead absorb our own scheduling jitter
+                for _ in range(self.lead_frames):
+                    if not await self._send_next():
+                        break
+                next_at = loop.time() + interval
+                continue
+            delay = next_at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            next_at += interval
+            await self._send_next()
+
+    def stats(self) -> dict:
+        return {
+            "depth_ms": self.depth_ms,
+            "max_depth_ms": self.max_depth_ms,
+            "target_ms": self.target_ms,
+            "frames_sent": self.frames_sent,
+            "underruns": self.underruns,
+            "cleared_ms": self.cleared_frames * FRAME_MS,
+            "overflow_ms": self.overflow_frames * FRAME_MS,
+        }
+
+
+__all__ = ["FRAME_MS", "PacedDownlink"]
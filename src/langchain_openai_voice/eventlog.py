@@ -0,0 +1,156 @@
+"""
+Structured per-call event log.
+
+aconnect (and the server) describe what happens on a call as small records:
+transcripts, tool calls and outputs, speech starts (barge-ins), errors,
+unhandled model events, call status changes. Recording one is a dict build
+and an append; nothing is formatted or written on the audio path.
+
+EventLog buffers the records in memory and a background task (run()) writes
+them in batches, from a worker thread, as JSON lines to one file per UTC day:
+
+    {directory}/events-2025-01-31.jsonl
+    {"ts": 1738281600.12, "call_id": "MZ...", "turn": 3, "event": "user_transcript", "text": "..."}
+
+Memory is bounded: at most `max_records` are buffered (newer records are
+dropped and counted once the writer falls behind) and string fields are cut
+to `max_field_chars`. `sample_rates` keeps only a fraction of high-volume
+event types, e.g. {"unhandled_event": 0.1}.
+
+Each call logs through a CallLog handle, which stamps the call id and the
+current turn. Without an EventLog, a CallLog prints its records instead.
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+from datetime import datetime, timezone
+
+
+class EventLog:
+    def __init__(
+        self,
+        directory: str,
+        *,
+        sample_rates: dict[str, float] | None = None,
+        max_records: int = 10_000,
+        max_field_chars: int = 2000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+    ):
+        self.directory = directory
+        self.sample_rates = dict(sample_rates or {})
+        self.max_records = max_records
+        self.max_field_chars = max_field_chars
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._buffer: list[dict] = []
+        self._wakeup: asyncio.Event | None = None
+        self._closed = False
+
+        self.recorded = 0
+        self.written = 0
+        self.sampled_out = 0
+        self.dropped = 0
+        self.write_errors = 0
+        self.batches = 0
+
+    def call(self, call_id: str, **fields) -> "CallLog":
+        """Per-call handle; `fields` (e.g. transport) are added to every record."""
+        return CallLog(self, call_id, **fields)
+
+    def record(self, event: str, **fields) -> bool:
+        """Buffer one record; False if it was sampled out or dropped. Never blocks."""
+        rate = self.sample_rates.get(event, 1.0)
+        if rate < 1.0 and random.random() >= rate:
+            self.sampled_out += 1
+            return False
+        if self._closed or len(self._buffer) >= self.max_records:
+            self.dropped += 1
+            return False
+        for key, value in fields.items():
+            if isinstance(value, str) and len(value) > self.max_field_chars:
+                fields[key] = value[: self.max_field_chars] + "…"
+        self._buffer.append({"ts": time.time(), "event": event, **fields})
+        self.recorded += 1
+        if len(self._buffer) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+        return True
+
+    async def run(self) -> None:
+        """Write buffered records every `flush_interval` (or per full batch) until cancelled."""
+        self._wakeup = asyncio.Event()
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                await self.flush()
+        finally:
+            self._wakeup = None
+
+    async def flush(self) -> None:
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        await asyncio.to_thread(self._write, batch)
+
+    async def aclose(self) -> None:
+        """Write what is still buffered; later records are dropped."""
+        self._closed = True
+        await self.flush()
+
+    def _write(self, batch: list[dict]) -> None:
+        by_day: dict[str, list[str]] = {}
+        for record in batch:
+            day = datetime.fromtimestamp(record["ts"], timezone.utc).strftime("%Y-%m-%d")
+            by_day.setdefault(day, []).append(json.dumps(record, ensure_ascii=False, default=str))
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for day, lines in by_day.items():
+                with open(os.path.join(self.directory, f"events-{day}.jsonl"), "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+        except OSError as e:
+            self.write_errors += 1
+            print("⚠️ Event log write failed:", e)
+            return
+        self.written += len(batch)
+        self.batches += 1
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self._buffer),
+            "recorded": self.recorded,
+            "written": self.written,
+            "sampled_out": self.sampled_out,
+            "dropped": self.dropped,
+            "write_errors": self.write_errors,
+            "batches": self.batches,
+        }
+
+
+class CallLog:
+    """Records of one call: stamps call_id, turn and the handle's fields."""
+
+    def __init__(self, log: EventLog | None, call_id: str | None, **fields):
+        self.log = log
+        self.call_id = call_id
+        self.fields = fields
+        self.turn = 0
+
+    def next_turn(self) -> None:
+        self.turn += 1
+
+    def event(self, event: str, **fields) -> None:
+        if self.log is None:
+            print(f"{event}:", fields)
+            return
+        self.log.record(event, call_id=self.call_id, turn=self.turn, **self.fields, **fields)
+
+
+__all__ = ["CallLog", "EventLog"]
@@ -0,0 +1,193 @@
+"""
+Pre-rendered audio for fixed phrases (greetings, fillers, error messages).
+
+Synthesizing "Sorry, something went wrong" on every call adds the TTS
+provider's latency to moments where the caller should hear something at
+once. PhraseCache renders each phrase once through a TTS provider, stores it
+as ready-to-send 20 ms frames in the formats the transports use, and serves
+later requests from memory:
+
+    ulaw_8000   160-byte μ-law frames for Twilio media messages
+    pcm_24000   960-byte PCM16 frames for the browser / Realtime format
+
+Entries are keyed by (provider, voice, text, format), bounded by entry count
+and total bytes (least recently used first out), and optionally written to
+`cache_dir` so a restarted worker skips synthesis entirely. Providers are
+expected to produce 24 kHz PCM16 (BaseTTS.sample_rate).
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+
+# format -> (frame size in bytes, padding byte). The codec and resampler
+# (numpy) are only imported by render(), so serving cached phrases is cheap.
+FORMATS = {
+    "ulaw_8000": (160, b"\xff"),             # TWILIO_FRAME_SAMPLES
+    "pcm_24000": (24000 // 50 * 2, b"\x00"),  # 20 ms at REALTIME_RATE
+}
+
+
+@dataclass(frozen=True)
+class PhraseKey:
+    provider: str
+    voice: str
+    text: str
+    format: str
+
+    def filename(self) -> str:
+        digest = hashlib.sha256(json.dumps([self.provider, self.voice, self.text]).encode()).hexdigest()
+        return f"{digest[:32]}.{self.format}"
+
+
+class PhraseAudio:
+    """A rendered phrase: equally sized 20 ms frames (the last one padded)."""
+
+    def __init__(self, key: PhraseKey, data: bytes):
+        self.key = key
+        self.data = data
+        size, _ = FORMATS[key.format]
+        self.frames = [data[i : i + size] for i in range(0, len(data), size)]
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.data)
+
+    @property
+    def duration_ms(self) -> int:
+        return len(self.frames) * 20
+
+
+def render(pcm24: bytes, format: str) -> bytes:
+    """24 kHz PCM16 -> whole 20 ms frames of `format`."""
+    from langchain_openai_voice.codec import ulaw_encode
+    from langchain_openai_voice.resample import realtime_to_telephony
+
+    pcm24 = pcm24[: len(pcm24) // 2 * 2]
+    if format == "ulaw_8000":
+        data = ulaw_encode(realtime_to_telephony().process(pcm24)).tobytes()
+    elif format == "pcm_24000":
+        data = bytes(pcm24)
+    else:
+        raise ValueError(f"unknown phrase format: {format}")
+    size, pad = FORMATS[format]
+    if len(data) % size:
+        data += pad * (size - len(data) % size)
+    return data
+
+
+class PhraseCache:
+    def __init__(
+        self,
+        *,
+        max_entries: int = 256,
+        max_bytes: int = 32 * 1024 * 1024,
+        cache_dir: str | None = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self._entries: OrderedDict[PhraseKey, PhraseAudio] = OrderedDict()
+        self._bytes = 0
+        self._inflight: dict[tuple[str, str, str], asyncio.Task] = {}
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.renders = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key_for(tts, text: str, format: str) -> PhraseKey:
+        return PhraseKey(tts.name, getattr(tts, "voice", "default"), text, format)
+
+    def lookup(self, tts, text: str, format: str = "ulaw_8000") -> PhraseAudio | None:
+        """Memory-only lookup; never synthesizes. Safe to call on the frame path."""
+        key = self.key_for(tts, text, format)
+        phrase = self._entries.get(key)
+        if phrase is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return phrase
+
+    async def get(self, tts, text: str, format: str = "ulaw_8000") -> PhraseAudio:
+        """Cached phrase, loading it from disk or synthesizing it on a miss."""
+        phrase = self.lookup(tts, text, format)
+        if phrase is not None:
+            return phrase
+        key = self.key_for(tts, text, format)
+        if self.cache_dir:
+            data = await asyncio.to_thread(self._read, key)
+            if data is not None:
+                self.disk_hits += 1
+                return self._store(PhraseAudio(key, data))
+        pcm24 = await self._synthesize(tts, text)
+        phrase = self._store(PhraseAudio(key, render(pcm24, format)))
+        if self.cache_dir:
+            await asyncio.to_thread(self._write, key, phrase.data)
+        return phrase
+
+    async def prerender(self, tts, texts, formats=tuple(FORMATS)) -> None:
+        """Render every text in every format (e.g. at startup)."""
+        await asyncio.gather(*(self.get(tts, text, format) for text in texts for format in formats))
+
+    # One synthesis per (provider, voice, text), shared by all formats and
+    # by concurrent misses.
+    async def _synthesize(self, tts, text: str) -> bytes:
+        ident = (tts.name, getattr(tts, "voice", "default"), text)
+        task = self._inflight.get(ident)
+        if task is None:
+            self.renders += 1
+            task = asyncio.ensure_future(self._collect(tts, text))
+            self._inflight[ident] = task
+            task.add_done_callback(lambda _: self._inflight.pop(ident, None))
+        return await asyncio.shield(task)
+
+    @staticmethod
+    async def _collect(tts, text: str) -> bytes:
+        return b"".join([chunk async for chunk in tts.synthesize_stream(text)])
+
+    def _store(self, phrase: PhraseAudio) -> PhraseAudio:
+        if phrase.nbytes > self.max_bytes:
+            return phrase  # served once, never cached
+        old = self._entries.pop(phrase.key, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+        self._entries[phrase.key] = phrase
+        self._bytes += phrase.nbytes
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.evictions += 1
+        return phrase
+
+    def _read(self, key: PhraseKey) -> bytes | None:
+        try:
+            with open(os.path.join(self.cache_dir, key.filename()), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, key: PhraseKey, data: bytes) -> None:
+        path = os.path.join(self.cache_dir, key.filename())
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)  # readers never see a partial file
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "renders": self.renders,
+            "evictions": self.evictions,
+        }
+
+
+__all__ = ["FORMATS", "PhraseAudio", "PhraseCache", "PhraseKey", "render"]
@@ -0,0 +1,124 @@
+"""
+Outbound audio bookkeeping for barge-in.
+
+aconnect records every `response.audio.delta` it forwards, per response item.
+When the caller starts speaking, interrupt() marks the item as interrupted so
+its remaining deltas (still queued in the merge or still arriving from the
+model) are dropped instead of sent, and returns the
+`conversation.item.truncate` event that tells the model how much of the item
+was actually heard.
+
+Playback is assumed to start when the first delta of an item is sent and to
+run in real time, so the heard offset is min(audio sent, time since first
+delta). That matches a client (or a paced Twilio sender) that starts playing
+immediately and keeps its buffer short.
+"""
+
+import re
+import time
+from collections import deque
+
+_ITEM_ID_FIELD = re.compile(r'"item_id"\s*:\s*"([^"]*)"')
+_DELTA_FIELD = re.compile(r'"delta"\s*:\s*"')
+
+
+# item_id of a response.audio.delta event, read without decoding the JSON.
+# item_id precedes the (large) delta in events from the API, so the search
+# stays in the first few hundred characters.
+def sniff_item_id(raw: str, window: int = 512) -> str | None:
+    match = _ITEM_ID_FIELD.search(raw, 0, window)
+    return match.group(1) if match else None
+
+
+# Size in bytes of the base64 "delta" payload of a raw audio event.
+def delta_nbytes(raw: str) -> int:
+    match = _DELTA_FIELD.search(raw)
+    if match is None:
+        return 0
+    start = match.end()
+    end = raw.find('"', start)
+    n = end - start
+    padding = (raw[end - 1] == "=") + (raw[end - 2] == "=") if n >= 2 else 0
+    return n * 3 // 4 - padding
+
+
+# The base64 "delta" payload of a raw audio event, sliced out without decoding
+# the JSON (base64 contains no characters JSON would escape).
+def delta_payload(raw: str) -> str | None:
+    match = _DELTA_FIELD.search(raw)
+    if match is None:
+        return None
+    start = match.end()
+    return raw[start : raw.find('"', start)]
+
+
+class PlaybackTracker:
+    def __init__(self, sample_rate: int = 24000, *, keep_interrupted: int = 16):
+        self.bytes_per_ms = sample_rate * 2 / 1000  # PCM16 mono
+        self.item_id: str | None = None
+        self.content_index = 0
+        self.sent_bytes = 0
+        self.first_sent_at = 0.0
+        self.complete = False  # response.audio.done seen for the item
+        self._interrupted: deque[str] = deque(maxlen=keep_interrupted)
+
+        self.interruptions = 0
+        self.dropped_deltas = 0
+        self.truncated_ms = 0.0  # generated audio the caller never heard
+
+    def should_drop(self, item_id: str | None) -> bool:
+        if item_id is not None and item_id in self._interrupted:
+            self.dropped_deltas += 1
+            return True
+        return False
+
+    def sent(self, item_id: str | None, nbytes: int, content_index: int = 0) -> None:
+        if item_id != self.item_id:
+            self.item_id = item_id
+            self.content_index = content_index
+            self.sent_bytes = 0
+            self.first_sent_at = time.perf_counter()
+            self.complete = False
+        self.sent_bytes += nbytes
+
+    def audio_done(self, item_id: str | None) -> None:
+        if item_id == self.item_id:
+            self.complete = True
+
+    def played_ms(self) -> float:
+        sent_ms = self.sent_bytes / self.bytes_per_ms
+        elapsed_ms = (time.perf_counter() - self.first_sent_at) * 1000
+        return min(sent_ms, elapsed_ms)
+
+    def interrupt(self) -> dict | None:
+        """
+        Stop the current item. Returns the truncate event to send to the
+        model, or None if nothing is playing (no item, or complete and fully heard).
+        """
+        item_id = self.item_id
+        if item_id is None:
+            return None
+        self.item_id = None
+        played = self.played_ms()
+        unheard = self.sent_bytes / self.bytes_per_ms - played
+        if self.complete and unheard <= 0:
+            return None
+        self._interrupted.append(item_id)
+        self.interruptions += 1
+        self.truncated_ms += unheard
+        return {
+            "type": "conversation.item.truncate",
+            "item_id": item_id,
+            "content_index": self.content_index,
+            "audio_end_ms": int(played),
+        }
+
+    def stats(self) -> dict:
+        return {
+            "interruptions": self.interruptions,
+            "dropped_deltas": self.dropped_deltas,
+            "truncated_ms": round(self.truncated_ms),
+        }
+
+
+__all__ = ["PlaybackTracker", "delta_nbytes", "delta_payload", "sniff_item_id"]
@@ -0,0 +1,203 @@
+"""
+Pool of pre-warmed Realtime sessions.
+
+Opening the websocket and configuring it with `session.update` sits on the
+critical path of every call before the caller hears anything. SessionPool keeps
+`size` sessions connected and configured ahead of time, hands one out per call
+and opens a replacement in the background.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any
+
+from langchain_openai_voice.session import RealtimeSession, open_session
+
+
+class SessionPool:
+    """
+    Keeps `size` configured Realtime sessions warm.
+
+    acquire() returns a warm session when one is available (a hit) and falls
+    back to opening one inline (a miss). Idle sessions are health-checked every
+    `health_interval` seconds and recycled once older than `max_idle_age`.
+    """
+
+    def __init__(
+        self,
+        *,
+        api_key: str,
+        model: str,
+        url: str,
+        session_update: dict[str, Any] | None,
+        size: int = 2,
+        max_idle_age: float = 300.0,
+        health_interval: float = 15.0,
+        connect_timeout: float = 10.0,
+    ):
+        self.api_key = api_key
+        self.model = model
+        self.url = url
+        self.session_update = session_update
+        self.size = size
+        self.max_idle_age = max_idle_age
+        self.health_interval = health_interval
+        self.connect_timeout = connect_timeout
+
+        self._idle: deque[RealtimeSession] = deque()
+        self._opening = 0
+        self._wake = asyncio.Event()
+        self._maintainer: asyncio.Task | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._closed = False
+        self._failures_in_row = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.opened = 0
+        self.failures = 0
+        self.recycled = 0
+        self.acquire_seconds: dict[str, list[float]] = {"warm": [], "cold": []}
+
+    @classmethod
+    def for_agent(cls, agent, **kwargs) -> "SessionPool":
+        """Pool of sessions configured for `agent` (an OpenAIVoiceReactAgent)."""
+        return cls(
+            api_key=agent.api_key.get_secret_value(),
+            model=agent.model,
+            url=agent.url,
+            session_update=agent.session_update_event(),
+            **kwargs,
+        )
+
+    async def start(self) -> None:
+        if self._maintainer is None:
+            self._maintainer = asyncio.create_task(self._maintain())
+
+    async def close(self) -> None:
+        self._closed = True
+        if self._maintainer is not None:
+            self._maintainer.cancel()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(
+            *(t for t in [self._maintainer, *self._tasks] if t is not None),
+            return_exceptions=True,
+        )
+        while self._idle:
+            await self._idle.popleft().close()
+
+    async def acquire(self) -> RealtimeSession:
+        start = time.monotonic()
+        while self._idle:
+            session = self._idle.popleft()
+            if session.is_open and session.age < self.max_idle_age:
+                self.hits += 1
+                self._record("warm", start)
+                self._wake.set()  # refill in the background
+                return session
+            self.recycled += 1
+            self._spawn(session.close())
+
+        self.misses += 1
+        self._wake.set()
+        session = await self._open()
+        self._record("cold", start)
+        return session
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _record(self, kind: str, start: float) -> None:
+        samples = self.acquire_seconds[kind]
+        samples.append(time.monotonic() - start)
+        if len(samples) > 1000:
+            del samples[:500]
+
+    async def _open(self) -> RealtimeSession:
+        session = await open_session(
+            api_key=self.api_key,
+            model=self.model,
+            url=self.url,
+            session_update=self.session_update,
+            wait_ready=True,
+            timeout=self.connect_timeout,
+        )
+        self.opened += 1
+        return session
+
+    async def _open_into_pool(self) -> None:
+        # _opening was incremented by the caller when this task was created
+        try:
+            session = await self._open()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failures += 1
+            self._failures_in_row += 1
+            print("⚠️ Session pool: failed to open session:", e)
+            return
+        finally:
+            self._opening -= 1
+        self._failures_in_row = 0
+        if self._closed:
+            await session.close()
+        else:
+            self._idle.append(session)
+
+    async def _check_health(self) -> None:
+        keep: deque[RealtimeSession] = deque()
+        while self._idle:
+            session = self._idle.popleft()
+            if session.is_open and session.age < self.max_idle_age and await session.ping():
+                keep.append(session)
+            else:
+                self.recycled += 1
+                self._spawn(session.close())
+        # sessions acquired while we were pinging are already gone from _idle
+        self._idle.extend(keep)
+
+    async def _maintain(self) -> None:
+        last_check = time.monotonic()
+        while not self._closed:
+            missing = self.size - len(self._idle) - self._opening
+            for _ in range(max(missing, 0)):
+                self._opening += 1
+                self._spawn(self._open_into_pool())
+
+            # back off while the upstream keeps failing
+            delay = self.health_interval
+            if self._failures_in_row:
+                delay = min(self.health_interval, 0.5 * 2 ** min(self._failures_in_row, 6))
+            try:
+                self._wake.clear()
+                await asyncio.wait_for(self._wake.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+            if time.monotonic() - last_check >= self.health_interval:
+                last_check = time.monotonic()
+                await self._check_health()
+
+    def stats(self) -> dict:
+        def avg_ms(samples: list[float]) -> float:
+            return 1000 * sum(samples) / len(samples) if samples else 0.0
+
+        return {
+            "size": self.size,
+            "idle": len(self._idle),
+            "opening": self._opening,
+            "hits": self.hits,
+            "misses": self.misses,
+            "opened": self.opened,
+            "failures": self.failures,
+            "recycled": self.recycled,
+            "time_to_ready_warm_ms": avg_ms(self.acquire_seconds["warm"]),
+            "time_to_ready_cold_ms": avg_ms(self.acquire_seconds["cold"]),
+        }
+
+
+__all__ = ["SessionPool"]
@@ -0,0 +1,65 @@
+"""
+Per-event-type dispatch timing.
+
+aconnect (and the server's Twilio stream) time each event they dispatch and
+add it to a DispatchStats keyed by (source, event type): the input stream,
+the model or tool outputs in aconnect, "twilio" for Media Stream messages.
+The time is wall time from taking the event to being ready for the next one,
+so it includes awaited sends; an event type whose max or total stands out is
+where the loop is spending its time. Recording is two dict updates. At most
+`max_keys` event types are kept per DispatchStats; later ones are counted
+under "other".
+"""
+
+import time
+
+
+class DispatchStats:
+    def __init__(self, max_keys: int = 256):
+        self.max_keys = max_keys
+        # (source, event) -> [count, total seconds, max seconds]
+        self._stats: dict[tuple[str, str], list] = {}
+
+    def record(self, source: str, event: str | None, seconds: float) -> None:
+        key = (source, event or "?")
+        entry = self._stats.get(key)
+        if entry is None:
+            if len(self._stats) >= self.max_keys:
+                key = (source, "other")
+                entry = self._stats.get(key)
+            if entry is None:
+                self._stats[key] = [1, seconds, seconds]
+                return
+        entry[0] += 1
+        entry[1] += seconds
+        if seconds > entry[2]:
+            entry[2] = seconds
+
+    def timer(self, source: str, event: str | None, started: float) -> None:
+        """record() with the time since `started` (a time.perf_counter() value)."""
+        self.record(source, event, time.perf_counter() - started)
+
+    def items(self) -> list[tuple[str, str, int, float, float]]:
+        """(source, event, count, total seconds, max seconds) per key."""
+        return [(source, event, *entry) for (source, event), entry in self._stats.items()]
+
+    def top(self, n: int = 20) -> list[dict]:
+        """The `n` event types with the most total dispatch time."""
+        rows = sorted(self.items(), key=lambda row: row[3], reverse=True)[:n]
+        return [
+            {
+                "source": source,
+                "event": event,
+                "count": count,
+                "total_ms": 1000 * total,
+                "avg_us": 1e6 * total / count,
+                "max_ms": 1000 * max_seconds,
+            }
+            for source, event, count, total, max_seconds in rows
+        ]
+
+    def reset(self) -> None:
+        self._stats.clear()
+
+
+__all__ = ["DispatchStats"]
@@ -0,0 +1,265 @@
+"""
+Transparent reconnect of the Realtime websocket.
+
+ReconnectingConnection stands in for the (send_event, event stream) pair of
+connect(). When the socket drops without us closing it, it redials with
+exponential backoff, re-sends `session.update`, replays the conversation so
+far (ConversationHistory) and then flushes whatever was sent during the gap,
+mic audio included, so the caller hears a short pause instead of a dead
+line. It gives up, raising ConnectionError from the event stream, once the
+outage has lasted `max_outage` seconds.
+
+ConversationHistory keeps the last `max_items` conversation items (user and
+assistant transcripts, function calls and their outputs), cut to a
+`max_chars` budget, as they are seen on the wire. Only the few event types
+that carry them are decoded; audio passes through untouched.
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from websockets.exceptions import ConnectionClosed, WebSocketException
+
+from langchain_openai_voice.utils import sniff_event_type
+
+_HISTORY_EVENTS = {
+    "conversation.item.input_audio_transcription.completed",
+    "response.audio_transcript.done",
+    "response.function_call_arguments.done",
+}
+
+
+class ConversationHistory:
+    def __init__(self, *, max_items: int = 20, max_chars: int = 8000):
+        self.max_items = max_items
+        self.max_chars = max_chars
+        self._items: deque[dict] = deque()
+        self._chars = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _add(self, item: dict, size: int) -> None:
+        item["_size"] = size
+        self._items.append(item)
+        self._chars += size
+        while self._items and (len(self._items) > self.max_items or self._chars > self.max_chars):
+            self._chars -= self._items.popleft()["_size"]
+
+    def observe_server(self, raw: str) -> None:
+        """Keep the conversation items carried by a (raw) server event."""
+        t = sniff_event_type(raw)
+        if t not in _HISTORY_EVENTS:
+            return
+        event = json.loads(raw)
+        if t == "conversation.item.input_audio_transcription.completed":
+            text = event.get("transcript") or ""
+            if text:
+                self._add({"type": "message", "role": "user", "content": [{"type": "input_text", "text": text}]}, len(text))
+        elif t == "response.audio_transcript.done":
+            text = event.get("transcript") or ""
+            if text:
+                self._add({"type": "message", "role": "assistant", "content": [{"type": "text", "text": text}]}, len(text))
+        else:
+            arguments = event.get("arguments") or ""
+            self._add(
+                {"type": "function_call", "call_id": event.get("call_id"), "name": event.get("name"), "arguments": arguments},
+                len(arguments),
+            )
+
+    def observe_client(self, event: dict[str, Any] | str) -> None:
+        """Keep function call outputs sent to the model."""
+        if not isinstance(event, dict) or event.get("type") != "conversation.item.create":
+            return
+        item = event.get("item") or {}
+        if item.get("type") == "function_call_output":
+            output = str(item.get("output", ""))
+            self._add({"type": "function_call_output", "call_id": item.get("call_id"), "output": output}, len(output))
+
+    def replay_events(self) -> list[dict]:
+        """
+        conversation.item.create events recreating the history in a new
+        session, plus a response.create when the model still owed an answer
+        (the last item is the user's, or a tool output).
+        """
+        calls = {item["call_id"] for item in self._items if item["type"] == "function_call"}
+        events = []
+        last = None
+        for item in self._items:
+            if item["type"] == "function_call_output" and item["call_id"] not in calls:
+                continue  # its call was trimmed away
+            last = {k: v for k, v in item.items() if k != "_size"}
+            events.append({"type": "conversation.item.create", "item": last})
+        if last is not None and (last["type"] == "function_call_output" or last.get("role") == "user"):
+            events.append({"type": "response.create", "response": {}})
+        return events
+
+
+class ReconnectingConnection:
+    def __init__(
+        self,
+        open_websocket: Callable[[], Awaitable[Any]],
+        session_update: dict[str, Any],
+        *,
+        websocket=None,
+        history: ConversationHistory | None = None,
+        backoff: float = 0.1,
+        max_backoff: float = 2.0,
+        max_outage: float = 15.0,
+        connect_timeout: float = 5.0,
+        max_buffered_chars: int = 1_000_000,
+        on_reconnect: Callable[[dict], None] | None = None,
+    ):
+        """
+        open_websocket: opens a new, unconfigured socket.
+        session_update: sent on every (re)connect.
+        websocket: an already open and configured socket to start with (e.g.
+            from a SessionPool); otherwise the first connect opens one.
+        max_buffered_chars: cap on events held during a gap (about 15 s of
+            24 kHz mic audio by default); the oldest are dropped beyond it.
+        on_reconnect: called with the stats of each recovery.
+        """
+        self.open_websocket = open_websocket
+        self.session_update = session_update
+        self.history = history or ConversationHistory()
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_outage = max_outage
+        self.connect_timeout = connect_timeout
+        self.max_buffered_chars = max_buffered_chars
+        self.on_reconnect = on_reconnect
+
+        self._ws = websocket
+        self._connected = websocket is not None
+        self._buffer: deque[str] = deque()
+        self._buffered_chars = 0
+        self._lost_at = 0.0
+        self._reconnecting: asyncio.Task | None = None
+        self._discarded: asyncio.Task | None = None
+        self._closing = False
+
+        self.reconnects = 0
+        self.failed_attempts = 0
+        self.buffer_dropped = 0
+        self.recover_seconds: list[float] = []
+
+    async def connect(self) -> None:
+        """Open and configure the first socket (unless one was given)."""
+        if self._ws is None:
+            self._ws = await asyncio.wait_for(self.open_websocket(), self.connect_timeout)
+            await self._ws.send(json.dumps(self.session_update))
+            self._connected = True
+
+    async def send(self, event: dict[str, Any] | str) -> None:
+        self.history.observe_client(event)
+        formatted_event = json.dumps(event) if isinstance(event, dict) else event
+        if not self._connected:
+            self._hold(formatted_event)
+            return
+        try:
+            await self._ws.send(formatted_event)
+        except ConnectionClosed:
+            self._hold(formatted_event)
+            self._lost()
+
+    async def events(self) -> AsyncIterator[str]:
+        """Raw server events, across reconnects."""
+        while True:
+            ws = self._ws
+            try:
+                async for raw_event in ws:
+                    self.history.observe_server(raw_event)
+                    yield raw_event
+            except ConnectionClosed:
+                pass
+            if self._closing:
+                return
+            if ws is self._ws:
+                self._lost()
+            await self._wait_reconnected()
+
+    async def close(self) -> None:
+        self._closing = True
+        if self._reconnecting is not None:
+            self._reconnecting.cancel()
+        if self._ws is not None:
+            await self._ws.close()
+
+    def _hold(self, formatted_event: str) -> None:
+        self._buffer.append(formatted_event)
+        self._buffered_chars += len(formatted_event)
+        while self._buffered_chars > self.max_buffered_chars and len(self._buffer) > 1:
+            self._buffered_chars -= len(self._buffer.popleft())
+            self.buffer_dropped += 1
+
+    def _lost(self) -> None:
+        if not self._connected or self._closing:
+            return
+        self._connected = False
+        self._lost_at = time.monotonic()
+        self._reconnecting = asyncio.create_task(self._reconnect())
+
+    async def _wait_reconnected(self) -> None:
+        if self._reconnecting is not None:
+            await asyncio.shield(self._reconnecting)  # raises ConnectionError on giving up
+
+    async def _reconnect(self) -> None:
+        if self._ws is not None:
+            # drop the dead socket without waiting out its closing handshake
+            self._discarded = asyncio.create_task(self._ws.close())
+        delay = 0.0
+        attempts = 0
+        while True:
+            if delay:
+                await asyncio.sleep(delay)
+            attempts += 1
+            ws = None
+            try:
+                ws = await asyncio.wait_for(self.open_websocket(), self.connect_timeout)
+                await ws.send(json.dumps(self.session_update))
+                replay = self.history.replay_events()
+                for event in replay:
+                    await ws.send(json.dumps(event))
+                buffered = len(self._buffer)
+                # sends made while flushing join the buffer and are flushed too
+                while self._buffer:
+                    await ws.send(self._buffer[0])
+                    self._buffered_chars -= len(self._buffer.popleft())
+                break
+            # refused, reset, timed out, or a rejected handshake (e.g. HTTP 503/429)
+            except (OSError, WebSocketException, asyncio.TimeoutError) as e:
+                self.failed_attempts += 1
+                if ws is not None:
+                    self._discarded = asyncio.create_task(ws.close())
+                if time.monotonic() - self._lost_at + delay >= self.max_outage:
+                    raise ConnectionError(
+                        f"Realtime connection lost; gave up after {attempts} attempts: {e}"
+                    ) from e
+                delay = min(self.max_backoff, max(self.backoff, delay * 2))
+
+        self._ws = ws
+        self._connected = True
+        seconds = time.monotonic() - self._lost_at
+        self.reconnects += 1
+        self.recover_seconds.append(seconds)
+        if self.on_reconnect is not None:
+            self.on_reconnect({
+                "seconds": seconds,
+                "attempts": attempts,
+                "replayed_items": sum(1 for e in replay if e["type"] == "conversation.item.create"),
+                "buffered_events": buffered,
+            })
+
+    def stats(self) -> dict:
+        return {
+            "reconnects": self.reconnects,
+            "failed_attempts": self.failed_attempts,
+            "buffer_dropped": self.buffer_dropped,
+            "recover_seconds_max": max(self.recover_seconds, default=0.0),
+        }
+
+
+__all__ = ["ConversationHistory", "ReconnectingConnection"]
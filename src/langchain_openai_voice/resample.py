@@ -0,0 +1,134 @@
+"""
+Streaming polyphase resampler for PCM16 audio.
+
+Twilio carries 8 kHz audio while the Realtime API speaks 24 kHz PCM16. The
+resampler keeps the tail of the previous chunk as filter history, so a stream
+fed in 20 ms pieces produces exactly the same samples as the whole signal
+resampled at once (no clicks at frame boundaries). All working buffers are
+allocated up front and reused, so memory per call is fixed.
+"""
+
+from math import gcd
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+TELEPHONY_RATE = 8000
+REALTIME_RATE = 24000
+
+
+# Kaiser-windowed sinc lowpass, laid out as one reversed row per phase so that
+# output = window_of_inputs @ row.
+def _design_polyphase(up: int, down: int, taps_per_phase: int, beta: float) -> np.ndarray:
+    length = up * taps_per_phase
+    cutoff = 0.5 / max(up, down) * 0.9  # cycles/sample at the upsampled rate
+    t = np.arange(length) - (length - 1) / 2
+    h = 2 * cutoff * np.sinc(2 * cutoff * t) * np.kaiser(length, beta)
+    h *= up / h.sum()  # unity passband gain after zero-stuffing
+    # phase p uses taps h[p], h[p + up], ...; reverse so the newest sample is last
+    return np.ascontiguousarray(h.reshape(taps_per_phase, up).T[:, ::-1], dtype=np.float32)
+
+
+class StreamingResampler:
+    """
+    Rational-ratio resampler with state carried across chunks.
+
+    process() accepts int16 PCM (ndarray or PCM16 bytes) of up to `max_chunk`
+    samples and returns an int16 view into an internal buffer, valid until the
+    next call. Larger chunks are accepted but grow the buffers once.
+    """
+
+    def __init__(
+        self,
+        in_rate: int,
+        out_rate: int,
+        *,
+        taps_per_phase: int = 16,
+        max_chunk: int = 4800,
+        beta: float = 8.0,
+    ):
+        g = gcd(in_rate, out_rate)
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.up = out_rate // g
+        self.down = in_rate // g
+        self._bank = _design_polyphase(self.up, self.down, taps_per_phase, beta)
+        self._taps = taps_per_phase
+        self._consumed = 0  # input samples seen so far
+        self._produced = 0  # output samples emitted so far
+        self._alloc(max_chunk)
+
+    def _alloc(self, max_chunk: int) -> None:
+        history = self._taps - 1
+        old = getattr(self, "_buf", None)
+        self._buf = np.zeros(history + max_chunk, dtype=np.float32)
+        if old is not None and history:
+            self._buf[:history] = old[:history]
+        max_out = -(-max_chunk * self.up // self.down) + 1
+        self._acc = np.empty(max_out, dtype=np.float32)
+        self._out = np.empty(max_out, dtype=np.int16)
+        self._max_chunk = max_chunk
+
+    def reset(self) -> None:
+        self._buf[:] = 0
+        self._consumed = 0
+        self._produced = 0
+
+    def process(self, pcm) -> np.ndarray:
+        x = pcm if isinstance(pcm, np.ndarray) else np.frombuffer(pcm, dtype=np.int16)
+        n_in = x.size
+        if n_in > self._max_chunk:
+            self._alloc(n_in)
+
+        history = self._taps - 1
+        buf = self._buf
+        buf[history : history + n_in] = x
+
+        up, down = self.up, self.down
+        start = self._produced
+        total_in = self._consumed + n_in
+        end = -(-total_in * up // down)  # outputs whose newest input is available
+        count = end - start
+        acc = self._acc[:count]
+
+        if count:
+            windows = sliding_window_view(buf[: history + n_in], self._taps)
+            # Outputs n, n+up, n+2*up, ... share a phase and step `down` inputs.
+            for j in range(min(up, count)):
+                t = (start + j) * down
+                w = t // up - self._consumed
+                k = -(-(count - j) // up)
+                np.matmul(windows[w : w + (k - 1) * down + 1 : down], self._bank[t % up], out=acc[j::up])
+
+        # keep the last taps-1 inputs as history for the next chunk
+        if history:
+            buf[:history] = buf[n_in : n_in + history]
+        self._consumed = total_in
+        self._produced = end
+
+        out = self._out[:count]
+        np.rint(acc, out=acc)
+        np.clip(acc, -32768, 32767, out=acc)
+        np.copyto(out, acc, casting="unsafe")
+        return out
+
+
+# 8 kHz telephony -> 24 kHz Realtime (uplink)
+def telephony_to_realtime(**kwargs) -> StreamingResampler:
+    kwargs.setdefault("max_chunk", 1600)
+    return StreamingResampler(TELEPHONY_RATE, REALTIME_RATE, **kwargs)
+
+
+# 24 kHz Realtime -> 8 kHz telephony (downlink)
+def realtime_to_telephony(**kwargs) -> StreamingResampler:
+    kwargs.setdefault("taps_per_phase", 48)
+    return StreamingResampler(REALTIME_RATE, TELEPHONY_RATE, **kwargs)
+
+
+__all__ = [
+    "REALTIME_RATE",
+    "StreamingResampler",
+    "TELEPHONY_RATE",
+    "realtime_to_telephony",
+    "telephony_to_realtime",
+]
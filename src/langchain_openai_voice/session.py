@@ -0,0 +1,127 @@
+"""
+Realtime websocket sessions.
+
+open_websocket() performs the handshake; RealtimeSession wraps an open socket
+that may already have been configured with `session.update`, so it can be
+created ahead of time (see pool.SessionPool) and handed to aconnect().
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator
+
+import websockets
+
+DEFAULT_URL = "wss://api.openai.com/v1/realtime"
+
+_WEBSOCKETS_MAJOR = int(websockets.__version__.split(".")[0])
+
+
+async def open_websocket(*, api_key: str, model: str, url: str):
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "OpenAI-Beta": "realtime=v1",
+    }
+
+    url = url or DEFAULT_URL
+    url += f"?model={model}"
+
+    # websockets>=14 renamed extra_headers to additional_headers
+    if _WEBSOCKETS_MAJOR >= 14:
+        return await websockets.connect(url, additional_headers=headers)
+    return await websockets.connect(url, extra_headers=headers)
+
+
+class RealtimeSession:
+    """
+    An open (and usually already configured) Realtime websocket.
+
+    ready_seconds is the time from starting the handshake until the session
+    was usable: connected, `session.update` sent and, if requested,
+    acknowledged with `session.updated`.
+    """
+
+    def __init__(self, websocket, *, started_at: float):
+        self.websocket = websocket
+        self.started_at = started_at
+        self.ready_at = started_at
+
+    @property
+    def ready_seconds(self) -> float:
+        return self.ready_at - self.started_at
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.ready_at
+
+    @property
+    def is_open(self) -> bool:
+        ws = self.websocket
+        if hasattr(ws, "state"):
+            return ws.state is websockets.protocol.State.OPEN
+        return not ws.closed
+
+    async def send_event(self, event: dict[str, Any] | str) -> None:
+        formatted_event = json.dumps(event) if isinstance(event, dict) else event
+        await self.websocket.send(formatted_event)
+
+    async def events(self, raw: bool = False) -> AsyncIterator[dict[str, Any] | str]:
+        """Server events, decoded; with raw=True the undecoded JSON strings."""
+        if raw:
+            async for raw_event in self.websocket:
+                yield raw_event
+        else:
+            async for raw_event in self.websocket:
+                yield json.loads(raw_event)
+
+    async def ping(self, timeout: float = 5.0) -> bool:
+        try:
+            pong = await self.websocket.ping()
+            await asyncio.wait_for(pong, timeout)
+            return True
+        except Exception:
+            return False
+
+    async def close(self) -> None:
+        await self.websocket.close()
+
+
+async def open_session(
+    *,
+    api_key: str,
+    model: str,
+    url: str,
+    session_update: dict[str, Any] | None = None,
+    wait_ready: bool = False,
+    timeout: float = 10.0,
+) -> RealtimeSession:
+    """
+    Connect and send `session_update`. With wait_ready=True, also wait for the
+    server's `session.updated` acknowledgement (events before it are dropped).
+    """
+    started = time.monotonic()
+    websocket = await asyncio.wait_for(
+        open_websocket(api_key=api_key, model=model, url=url), timeout
+    )
+    session = RealtimeSession(websocket, started_at=started)
+    try:
+        if session_update is not None:
+            await session.send_event(session_update)
+            if wait_ready:
+                await asyncio.wait_for(_wait_for_event(websocket, "session.updated"), timeout)
+    except BaseException:
+        await websocket.close()
+        raise
+    session.ready_at = time.monotonic()
+    return session
+
+
+async def _wait_for_event(websocket, event_type: str) -> None:
+    async for raw_event in websocket:
+        event = json.loads(raw_event)
+        if event.get("type") == event_type:
+            return
+        if event.get("type") == "error":
+            raise ConnectionError(f"session setup failed: {event.get('error')}")
+    raise ConnectionError("websocket closed during session setup")
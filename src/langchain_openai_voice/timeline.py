@@ -0,0 +1,83 @@
+"""
+Per-turn latency timeline for a voice session.
+
+aconnect marks the moments that make up a conversational turn. A turn starts
+when the server VAD reports `input_audio_buffer.speech_stopped` and ends at the
+`response.done` that has no tool calls still outstanding. Durations are handed
+to `observe(metric, seconds, labels)` as they become known, so a metrics
+backend only sees a handful of floats per turn.
+
+    turn_transcript       speech_stopped -> input transcription completed
+    turn_first_audio      speech_stopped -> first response.audio.delta
+    turn_response         speech_stopped -> final response.done
+    tool_call             function_call_arguments.done -> tool output sent
+    barge_in              speech_started received -> client flushed, item truncated
+    reconnect             model connection lost -> reopened, conversation replayed
+"""
+
+import time
+from collections import deque
+from typing import Callable
+
+Observer = Callable[[str, float, dict], None]
+
+
+class TurnTimeline:
+    def __init__(self, observe: Observer | None = None, *, keep_turns: int = 50):
+        self.observe = observe
+        self.turns: deque[dict] = deque(maxlen=keep_turns)  # recent completed turns
+        self._turn: dict | None = None
+        self._first_audio_pending = False
+        self._tools: dict[str, tuple[str, float]] = {}
+
+    def _emit(self, metric: str, seconds: float, labels: dict | None = None) -> None:
+        if self.observe is not None:
+            self.observe(metric, seconds, labels or {})
+
+    def speech_stopped(self) -> None:
+        now = time.perf_counter()
+        self._turn = {"speech_stopped": now}
+        self._first_audio_pending = True
+
+    def transcript_completed(self) -> None:
+        turn = self._turn
+        if turn is not None and "transcript" not in turn:
+            turn["transcript"] = now = time.perf_counter()
+            self._emit("turn_transcript", now - turn["speech_stopped"])
+
+    # Called for every audio delta; only the first of a turn does any work.
+    def audio_delta(self) -> None:
+        if self._first_audio_pending:
+            self._first_audio_pending = False
+            now = time.perf_counter()
+            self._turn["first_audio"] = now
+            self._emit("turn_first_audio", now - self._turn["speech_stopped"])
+
+    def tool_call(self, call_id: str, name: str) -> None:
+        self._tools[call_id] = (name, time.perf_counter())
+
+    def tool_output(self, call_id: str) -> None:
+        started = self._tools.pop(call_id, None)
+        if started is not None:
+            name, at = started
+            self._emit("tool_call", time.perf_counter() - at, {"tool": name})
+
+    def barge_in(self, seconds: float) -> None:
+        self._emit("barge_in", seconds)
+
+    def reconnect(self, seconds: float) -> None:
+        self._emit("reconnect", seconds)
+
+    def response_done(self) -> None:
+        turn = self._turn
+        if turn is None or self._tools:
+            return  # no open turn, or a tool round trip will produce another response
+        now = time.perf_counter()
+        turn["response_done"] = now
+        self._emit("turn_response", now - turn["speech_stopped"])
+        self.turns.append({k: v - turn["speech_stopped"] for k, v in turn.items()})
+        self._turn = None
+        self._first_audio_pending = False
+
+
+__all__ = ["TurnTimeline"]
@@ -0,0 +1,166 @@
+"""
+Result cache for voice tool calls.
+
+Callers tend to ask the same things, and a search tool round trip is heard as
+silence. ToolResultCache sits in front of `tool.ainvoke` in VoiceToolExecutor:
+results are keyed on tool name plus canonical JSON arguments, kept per tool
+under TTL, entry-count (LRU) and byte limits, and identical calls that arrive
+while one is already running share that single execution. An execution
+whose callers have all given up (timed out, or cancelled by a barge-in) is
+cancelled, so it does not hold the tool's concurrency slot.
+
+Tools opt out with `metadata={"cache": False}` (e.g. side-effecting tools) or
+tune their limits with `metadata={"cache": {"ttl": 600}}`.
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Awaitable, Callable
+
+
+@dataclass(frozen=True)
+class ToolCachePolicy:
+    ttl: float = 300.0
+    max_entries: int = 256
+    max_bytes: int = 1024 * 1024
+
+
+class _ToolCache:
+    def __init__(self, policy: ToolCachePolicy):
+        self.policy = policy
+        self.entries: OrderedDict[str, tuple[float, str, int]] = OrderedDict()  # expires, value, size
+        self.bytes = 0
+
+
+class ToolResultCache:
+    """
+    Process-wide cache shared by every call's VoiceToolExecutor.
+
+    Only successful results are stored; errors and timeouts are never cached.
+    """
+
+    def __init__(
+        self,
+        default_policy: ToolCachePolicy | None = ToolCachePolicy(),
+        policies: dict[str, ToolCachePolicy | None] | None = None,
+    ):
+        self.default_policy = default_policy
+        self.policies = dict(policies or {})
+        self._caches: dict[str, _ToolCache] = {}
+        self._inflight: dict[tuple[str, str], list] = {}  # [task, waiters]
+
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0  # calls that joined an identical in-flight execution
+        self.evictions = 0
+        self.expirations = 0
+
+    def policy_for(self, tool) -> ToolCachePolicy | None:
+        """Effective policy for a tool, or None if it is not cached."""
+        if tool.name in self.policies:
+            return self.policies[tool.name]
+        setting = (getattr(tool, "metadata", None) or {}).get("cache", True)
+        if setting is False or self.default_policy is None:
+            return None
+        if isinstance(setting, dict):
+            return replace(self.default_policy, **setting)
+        return self.default_policy
+
+    @staticmethod
+    def make_key(args: Any) -> str:
+        return json.dumps(args, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+    async def get_or_run(
+        self,
+        tool_name: str,
+        args: Any,
+        policy: ToolCachePolicy,
+        run: Callable[[], Awaitable[str]],
+    ) -> str:
+        key = self.make_key(args)
+        cache = self._caches.get(tool_name)
+        if cache is None or cache.policy != policy:
+            cache = self._caches[tool_name] = _ToolCache(policy)
+
+        entry = cache.entries.get(key)
+        if entry is not None:
+            expires, value, _ = entry
+            if expires > time.monotonic():
+                cache.entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self._remove(cache, key)
+            self.expirations += 1
+
+        inflight_key = (tool_name, key)
+        inflight = self._inflight.get(inflight_key)
+        if inflight is not None:
+            self.shared += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(run())
+            inflight = self._inflight[inflight_key] = [task, 0]
+            task.add_done_callback(lambda t: self._finish(cache, inflight_key, t))
+        task = inflight[0]
+        inflight[1] += 1
+        try:
+            # one waiter timing out or being cancelled must not kill the shared run
+            return await asyncio.shield(task)
+        finally:
+            inflight[1] -= 1
+            if inflight[1] == 0 and not task.done():
+                # nobody is waiting any more: stop it (freeing its concurrency slot)
+                task.cancel()
+                if self._inflight.get(inflight_key) is inflight:
+                    del self._inflight[inflight_key]
+
+    def _finish(self, cache: _ToolCache, inflight_key: tuple[str, str], task: asyncio.Task) -> None:
+        inflight = self._inflight.get(inflight_key)
+        if inflight is not None and inflight[0] is task:
+            del self._inflight[inflight_key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        value = task.result()
+        size = len(value.encode("utf-8"))
+        policy = cache.policy
+        if size > policy.max_bytes or policy.max_entries <= 0:
+            return
+        key = inflight_key[1]
+        if key in cache.entries:
+            self._remove(cache, key)
+        cache.entries[key] = (time.monotonic() + policy.ttl, value, size)
+        cache.bytes += size
+        while len(cache.entries) > policy.max_entries or cache.bytes > policy.max_bytes:
+            oldest = next(iter(cache.entries))
+            self._remove(cache, oldest)
+            self.evictions += 1
+
+    @staticmethod
+    def _remove(cache: _ToolCache, key: str) -> None:
+        _, _, size = cache.entries.pop(key)
+        cache.bytes -= size
+
+    def clear(self) -> None:
+        self._caches.clear()
+        self._inflight.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.shared
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared_inflight": self.shared,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": (self.hits + self.shared) / lookups if lookups else 0.0,
+            "tools": {
+                name: {"entries": len(c.entries), "bytes": c.bytes}
+                for name, c in self._caches.items()
+            },
+        }
+
+
+__all__ = ["ToolCachePolicy", "ToolResultCache"]
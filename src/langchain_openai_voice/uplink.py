@@ -0,0 +1,135 @@
+"""
+Uplink stage for externally sourced audio (Twilio, SIP.js).
+
+Telephony delivers 20 ms frames, 50 per second. Sending each one as its own
+`input_audio_buffer.append` costs one websocket message, one base64 pass and
+one JSON envelope per frame. AudioUplink coalesces frames into larger batches
+(100 ms by default), encodes each batch once, and flushes early on a timer so
+no audio waits longer than `max_delay_ms`.
+"""
+
+import asyncio
+import base64
+from typing import AsyncIterator
+
+from langchain_openai_voice.resample import REALTIME_RATE
+
+_APPEND_PREFIX = '{"type": "input_audio_buffer.append", "audio": "'
+_APPEND_SUFFIX = '"}'
+
+
+class AudioUplink:
+    """
+    Coalesces PCM16 pushes into batched `input_audio_buffer.append` events.
+
+    push() is synchronous and cheap; batches are queued as ready-to-send JSON
+    strings and consumed by iterating the uplink (e.g. as aconnect's input
+    stream). push_event() queues other client events in order with the audio.
+    close() flushes the remainder and ends the iteration.
+    """
+
+    def __init__(
+        self,
+        *,
+        batch_ms: int = 100,
+        max_delay_ms: int | None = None,
+        sample_rate: int = REALTIME_RATE,
+    ):
+        self.batch_bytes = sample_rate * batch_ms // 1000 * 2
+        self.max_delay = (max_delay_ms if max_delay_ms is not None else batch_ms) / 1000
+        self._buf = bytearray(self.batch_bytes)
+        self._view = memoryview(self._buf)
+        self._fill = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._queue: asyncio.Queue[str | None] = asyncio.Queue()
+        self._closed = False
+
+        self.frames_in = 0
+        self.bytes_in = 0
+        self.messages_out = 0
+        self.timer_flushes = 0
+
+    def push(self, pcm) -> None:
+        if self._closed:
+            return
+        data = memoryview(pcm).cast("B")
+        self.frames_in += 1
+        self.bytes_in += data.nbytes
+
+        if self._fill == 0 and data.nbytes and self.max_delay > 0:
+            # oldest buffered sample starts the latency clock
+            self._timer = asyncio.get_running_loop().call_later(
+                self.max_delay, self._on_timer
+            )
+
+        offset = 0
+        while offset < data.nbytes:
+            n = min(self.batch_bytes - self._fill, data.nbytes - offset)
+            self._view[self._fill : self._fill + n] = data[offset : offset + n]
+            self._fill += n
+            offset += n
+            if self._fill == self.batch_bytes:
+                self._flush()
+                if offset < data.nbytes and self.max_delay > 0:
+                    self._timer = asyncio.get_running_loop().call_later(
+                        self.max_delay, self._on_timer
+                    )
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        if self._fill:
+            self.timer_flushes += 1
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._fill:
+            return
+        audio = base64.b64encode(self._view[: self._fill]).decode("ascii")
+        self._fill = 0
+        self.messages_out += 1
+        # base64 never needs JSON escaping, so build the envelope directly
+        self._queue.put_nowait(_APPEND_PREFIX + audio + _APPEND_SUFFIX)
+
+    def push_event(self, event: str) -> None:
+        """Queue a ready-made JSON event after the audio pushed so far."""
+        if self._closed:
+            return
+        self._flush()
+        self._queue.put_nowait(event)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._flush()
+        self._closed = True
+        self._queue.put_nowait(None)
+
+    @property
+    def queue_depth(self) -> int:
+        """Batched append events waiting to be sent to the model."""
+        return self._queue.qsize()
+
+    def stats(self) -> dict:
+        return {
+            "frames_in": self.frames_in,
+            "bytes_in": self.bytes_in,
+            "messages_out": self.messages_out,
+            "timer_flushes": self.timer_flushes,
+            "coalescing_ratio": self.frames_in / self.messages_out if self.messages_out else 0.0,
+        }
+
+    def __aiter__(self) -> AsyncIterator[str]:
+        return self._events()
+
+    async def _events(self) -> AsyncIterator[str]:
+        while True:
+            event = await self._queue.get()
+            if event is None:
+                return
+            yield event
+
+
+__all__ = ["AudioUplink"]
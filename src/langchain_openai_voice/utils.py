@@ -1,39 +1,141 @@
 import asyncio
 import os
-from typing import AsyncIterator, TypeVar
+import re
+import time
+from typing import AsyncIterator, Callable, TypeVar
 
 T = TypeVar("T")
 
+_TYPE_FIELD = re.compile(r'"type"\s*:\s*"([^"]*)"')
+
+
+# Read the top-level "type" of a JSON event without decoding it.
+# Only looks at the first `window` characters; returns None if the first
+# "type" key found there is nested (or missing), so callers fall back to json.loads.
+def sniff_event_type(raw: str, window: int = 256) -> str | None:
+    match = _TYPE_FIELD.search(raw, 0, window)
+    if match is None or raw.count("{", 0, match.start()) != 1:
+        return None
+    return match.group(1)
+
+_DONE = object()
+_FAILED = object()
+
+
 # Merge multiple streams into one stream.
 # Each yielded item is a tuple: (stream_key, value).
 async def amerge(**streams: AsyncIterator[T]) -> AsyncIterator[tuple[str, T]]:
-    nexts: dict[asyncio.Task, str] = {
-        asyncio.create_task(anext(stream)): key for key, stream in streams.items()
-    }
-    while nexts:
-        done, _ = await asyncio.wait(nexts, return_when=asyncio.FIRST_COMPLETED)
-        for task in done:
-            key = nexts.pop(task)
-            stream = streams[key]
-            try:
-                yield key, task.result()
-                nexts[asyncio.create_task(anext(stream))] = key
-            except StopAsyncIteration:  # Stops when all input streams are exhausted.
-                pass
-            except Exception as e:
-                for task in nexts:
-                    task.cancel()
-                raise e
+    async for item in merge_streams(streams):
+        yield item
+
+
+# Fan-in with one long-lived pump task per source feeding a shared queue.
+# Each source may have at most `maxsize` items waiting to be consumed; beyond
+# that its pump stops pulling, so a slow consumer pushes back on fast sources.
+# The first source error is re-raised to the consumer; closing the merged
+# iterator (or an error) cancels and awaits every pump before returning.
+async def merge_streams(
+    streams: dict[str, AsyncIterator[T]], *, maxsize: int = 32
+) -> AsyncIterator[tuple[str, T]]:
+    queue: asyncio.Queue = asyncio.Queue()
+    slots = {key: asyncio.Semaphore(maxsize) for key in streams}
+
+    async def pump(key: str, stream: AsyncIterator[T]) -> None:
+        slot = slots[key]
+        try:
+            while True:
+                try:
+                    item = await anext(stream)
+                except StopAsyncIteration:
+                    break
+                await slot.acquire()
+                queue.put_nowait((key, item))
+        except Exception as e:
+            queue.put_nowait((_FAILED, e))
+            return
+        queue.put_nowait((_DONE, key))
+
+    pumps = [
+        asyncio.create_task(pump(key, stream), name=f"merge:{key}")
+        for key, stream in streams.items()
+    ]
+    running = len(pumps)
+    try:
+        while running:  # Stops when all input streams are exhausted.
+            key, item = await queue.get()
+            if key is _DONE:
+                running -= 1
+                continue
+            if key is _FAILED:
+                raise item
+            slots[key].release()
+            yield key, item
+    finally:
+        for task in pumps:
+            task.cancel()
+        await asyncio.gather(*pumps, return_exceptions=True)
+
+
+# ASR (Automatic Speech Recognition) and TTS (Text-to-Speech) providers
+#
+# Providers are created once per process by get_asr_provider/get_tts_provider
+# and shared by every connection, so clients, sessions and connection pools
+# belong on the instance (released in aclose()).
+#
+# The streaming variants work on chunks: transcribe_stream takes audio chunks
+# and yields transcript segments as they are recognized; synthesize_stream
+# takes text (or a stream of text, e.g. LLM tokens) and yields audio chunks
+# as they are produced. Providers without a streaming API inherit fallbacks
+# that buffer and call the whole-buffer method once.
+
+
+async def _text_pieces(text: str | AsyncIterator[str]) -> AsyncIterator[str]:
+    if isinstance(text, str):
+        yield text
+    else:
+        async for piece in text:
+            yield piece
+
+
+# Call `on_first_chunk(seconds)` when `stream` yields its first chunk and
+# `on_done(seconds)` when it ends; time runs from the first iteration.
+async def first_chunk_timer(
+    stream: AsyncIterator[T],
+    on_first_chunk: Callable[[float], None],
+    on_done: Callable[[float], None] | None = None,
+) -> AsyncIterator[T]:
+    start = time.perf_counter()
+    first = True
+    async for chunk in stream:
+        if first:
+            first = False
+            on_first_chunk(time.perf_counter() - start)
+        yield chunk
+    if on_done is not None:
+        on_done(time.perf_counter() - start)
 
 
 # ASR (Automatic Speech Recognition)
 
 class BaseASR:
+    name = "base"
+
     async def transcribe(self, audio: bytes) -> str:
         raise NotImplementedError
 
+    async def transcribe_stream(self, audio: AsyncIterator[bytes]) -> AsyncIterator[str]:
+        buffered = bytearray()
+        async for chunk in audio:
+            buffered += chunk
+        yield await self.transcribe(bytes(buffered))
+
+    async def aclose(self) -> None:
+        pass
+
 
 class OpenAIASR(BaseASR):
+    name = "openai"
+
     async def transcribe(self, audio: bytes) -> str:
         text = "transcribed text from OpenAI"
         print(f"Transcribed: '{text}'   # openai")
@@ -41,50 +143,147 @@ class OpenAIASR(BaseASR):
 
 
 class DeepgramASR(BaseASR):
+    name = "deepgram"
+
     async def transcribe(self, audio: bytes) -> str:
         text = "transcribed text from Deepgram"
         print(f"Transcribed: '{text}'   # deepgram")
         return text
 
 
+# Offline ASR for benchmarks: partial words start `first_chunk_ms` after the
+# first audio chunk (one per incoming chunk), the rest `final_ms` after the
+# audio ends. transcribe() answers after first_chunk_ms + final_ms.
+class FakeASR(BaseASR):
+    name = "fake"
+
+    def __init__(self, *, first_chunk_ms: float = 150, final_ms: float = 250, transcript: str = "what is two plus three"):
+        self.first_chunk = first_chunk_ms / 1000
+        self.final = final_ms / 1000
+        self.transcript = transcript
+
+    async def transcribe(self, audio: bytes) -> str:
+        await asyncio.sleep(self.first_chunk + self.final)
+        return self.transcript
+
+    async def transcribe_stream(self, audio: AsyncIterator[bytes]) -> AsyncIterator[str]:
+        words = self.transcript.split()
+        emitted = 0
+        start = None
+        async for _ in audio:
+            now = time.perf_counter()
+            start = start or now
+            if emitted < len(words) and now - start >= self.first_chunk:
+                yield words[emitted] + " "
+                emitted += 1
+        await asyncio.sleep(self.final)
+        if emitted < len(words):
+            yield " ".join(words[emitted:])
+
+
 # TTS (Text-to-Speech)
 
 class BaseTTS:
+    name = "base"
+    voice = "default"
+    sample_rate = 24000  # PCM16 mono output
+
     async def synthesize(self, text: str) -> bytes:
         raise NotImplementedError
 
+    async def synthesize_stream(self, text: str | AsyncIterator[str]) -> AsyncIterator[bytes]:
+        full = "".join([piece async for piece in _text_pieces(text)])
+        yield await self.synthesize(full)
+
+    async def aclose(self) -> None:
+        pass
+
 class OpenAITTS(BaseTTS):
+    name = "openai"
+
     async def synthesize(self, text: str) -> bytes:
         print("Synthesized audio (openai)")
         return b"binary audio from OpenAI"
 
 class ElevenLabsTTS(BaseTTS):
+    name = "elevenlabs"
+
     async def synthesize(self, text: str) -> bytes:
         print("Synthesized audio (elevenlabs)")
         return b"binary audio from ElevenLabs"
 
 class AzureTTS(BaseTTS):
+    name = "azure"
+
     async def synthesize(self, text: str) -> bytes:
         print("Synthesized audio (azure)")
         return b"binary audio from Azure"
 
+# Offline TTS for benchmarks: 24 kHz PCM16 silence, `ms_per_word` of audio per
+# word, in `chunk_ms` chunks produced `realtime_factor` times faster than real
+# time after a `first_chunk_ms` startup delay.
+class FakeTTS(BaseTTS):
+    name = "fake"
+
+    def __init__(
+        self,
+        *,
+        first_chunk_ms: float = 200,
+        chunk_ms: int = 100,
+        ms_per_word: int = 300,
+        realtime_factor: float = 3.0,
+    ):
+        self.first_chunk = first_chunk_ms / 1000
+        self.chunk_ms = chunk_ms
+        self.ms_per_word = ms_per_word
+        self.realtime_factor = realtime_factor
+        self._chunk = bytes(self.sample_rate * chunk_ms // 1000 * 2)
+
+    async def synthesize(self, text: str) -> bytes:
+        return b"".join([chunk async for chunk in self.synthesize_stream(text)])
+
+    async def synthesize_stream(self, text: str | AsyncIterator[str]) -> AsyncIterator[bytes]:
+        started = False
+        pending_ms = 0.0
+        async for piece in _text_pieces(text):
+            if not started:
+                started = True
+                await asyncio.sleep(self.first_chunk)
+            pending_ms += len(piece.split()) * self.ms_per_word
+            while pending_ms >= self.chunk_ms:
+                pending_ms -= self.chunk_ms
+                yield self._chunk
+                await asyncio.sleep(self.chunk_ms / 1000 / self.realtime_factor)
+        if pending_ms > 0:
+            yield self._chunk[: int(self.sample_rate * pending_ms / 1000) * 2]
+
 
 # Provider Factories
 
-# Return an ASR provider instance by name.
+_ASR_PROVIDERS = {"openai": OpenAIASR, "deepgram": DeepgramASR, "fake": FakeASR}
+_TTS_PROVIDERS = {"openai": OpenAITTS, "elevenlabs": ElevenLabsTTS, "azure": AzureTTS, "fake": FakeTTS}
+_provider_instances: dict[tuple[str, str], BaseASR | BaseTTS] = {}
+
+
+# Return the shared ASR provider instance by name (unknown names: openai).
 def get_asr_provider(name: str = "openai") -> BaseASR:
-    name = name.lower()
-    if name == "deepgram":
-        return DeepgramASR()
-    return OpenAIASR()
+    key = ("asr", name.lower())
+    provider = _provider_instances.get(key)
+    if provider is None:
+        provider = _provider_instances[key] = _ASR_PROVIDERS.get(key[1], OpenAIASR)()
+    return provider
 
-# Return a TTS provider instance by name.
+# Return the shared TTS provider instance by name (unknown names: openai).
 def get_tts_provider(name: str = "openai") -> BaseTTS:
-    name = name.lower()
-    if name == "elevenlabs":
-        return ElevenLabsTTS()
-    if name == "azure":
-        return AzureTTS()
-    return OpenAITTS()
-
+    key = ("tts", name.lower())
+    provider = _provider_instances.get(key)
+    if provider is None:
+        provider = _provider_instances[key] = _TTS_PROVIDERS.get(key[1], OpenAITTS)()
+    return provider
 
+# Release every cached provider (call on shutdown).
+async def close_providers() -> None:
+    providers = list(_provider_instances.values())
+    _provider_instances.clear()
+    for provider in providers:
+        await provider.aclose()
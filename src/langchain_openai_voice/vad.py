@@ -0,0 +1,168 @@
+"""
+Voice-activity gate for externally sourced audio.
+
+Much of a phone call is silence or line noise, and every uplinked frame costs
+bandwidth, base64/JSON work and model input tokens. SpeechGate classifies
+fixed-size frames by energy and zero-crossing rate (vectorized over all
+frames of a chunk) and only lets speech through:
+
+- a frame is speech if its level is above the threshold, or slightly below
+  it with a high zero-crossing rate (unvoiced consonants such as "s", "f");
+  the threshold follows an estimate of the line's noise floor;
+- `preroll_ms` of audio before a speech onset is sent along with it, so
+  word beginnings are not clipped;
+- `hangover_ms` after the last speech frame keeps flowing, so pauses inside
+  an utterance pass and the model's own VAD still hears the trailing
+  silence it needs to end the turn;
+- while gated, one frame every `keepalive_ms` is forwarded (0 disables).
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from langchain_openai_voice.codec import TWILIO_FRAME_SAMPLES
+
+_FULL_SCALE_POWER = 32768.0**2
+
+
+@dataclass
+class SpeechGateConfig:
+    frame_samples: int = TWILIO_FRAME_SAMPLES  # 20 ms at 8 kHz
+    sample_rate: int = 8000
+    threshold_db: float = -45.0     # absolute speech level, dBFS
+    snr_db: float = 10.0            # ...or this far above the noise floor, if higher
+    zcr_threshold: float = 0.3      # crossings per sample for fricatives
+    fricative_margin_db: float = 8.0
+    hangover_ms: int = 600
+    preroll_ms: int = 200
+    keepalive_ms: int = 1000
+    noise_adapt: float = 0.05       # noise floor smoothing per non-speech frame
+
+
+class SpeechGate:
+    """
+    process() takes PCM16 (bytes or int16 array) and returns the int16
+    samples to forward, possibly empty. The result is a view into an internal
+    buffer, valid until the next call. Partial frames are carried over.
+    """
+
+    def __init__(self, config: SpeechGateConfig | None = None):
+        self.config = c = config or SpeechGateConfig()
+        frame_ms = c.frame_samples * 1000 / c.sample_rate
+        self.hangover_frames = round(c.hangover_ms / frame_ms)
+        self.keepalive_frames = round(c.keepalive_ms / frame_ms) if c.keepalive_ms else 0
+        self._preroll = np.zeros((max(1, round(c.preroll_ms / frame_ms)), c.frame_samples), dtype=np.int16)
+        self._preroll_len = 0 if c.preroll_ms else None
+        self._preroll_pos = 0
+        self._carry = np.empty(0, dtype=np.int16)
+        self._out = np.empty(0, dtype=np.int16)
+        self._hang = 0
+        self._since_keepalive = 0
+        self.noise_floor_db = c.threshold_db - c.snr_db
+        self.speaking = False
+
+        self.frames_in = 0
+        self.frames_out = 0
+        self.keepalive_out = 0
+        self.segments = 0
+
+    def classify(self, frames: np.ndarray) -> np.ndarray:
+        """Speech decision per row of an (n, frame_samples) int16 array."""
+        c = self.config
+        x = frames.astype(np.float32)
+        power = np.einsum("ij,ij->i", x, x) / frames.shape[1]
+        level_db = 10 * np.log10(power / _FULL_SCALE_POWER + 1e-12)
+        negative = np.signbit(frames)
+        zcr = np.count_nonzero(negative[:, 1:] != negative[:, :-1], axis=1) / (frames.shape[1] - 1)
+
+        threshold = max(c.threshold_db, self.noise_floor_db + c.snr_db)
+        speech = (level_db > threshold) | (
+            (level_db > threshold - c.fricative_margin_db) & (zcr > c.zcr_threshold)
+        )
+        quiet = level_db[~speech]
+        if quiet.size:
+            self.noise_floor_db += c.noise_adapt * (float(quiet.mean()) - self.noise_floor_db)
+        return speech
+
+    def process(self, pcm) -> np.ndarray:
+        x = pcm if isinstance(pcm, np.ndarray) else np.frombuffer(pcm, dtype=np.int16)
+        fs = self.config.frame_samples
+        if self._carry.size:
+            x = np.concatenate((self._carry, x))
+        n = x.size // fs
+        self._carry = x[n * fs :].copy()
+        if not n:
+            return self._out[:0]
+
+        frames = x[: n * fs].reshape(n, fs)
+        speech = self.classify(frames)
+        self.frames_in += n
+
+        capacity = (n + self._preroll.shape[0]) * fs
+        if self._out.size < capacity:
+            self._out = np.empty(capacity, dtype=np.int16)
+        out = self._out
+        filled = 0
+        for i in range(n):
+            frame = frames[i]
+            if speech[i]:
+                if not self.speaking:
+                    self.speaking = True
+                    self.segments += 1
+                    filled = self._flush_preroll(out, filled)
+                self._hang = self.hangover_frames
+            elif self._hang > 0:
+                self._hang -= 1
+            else:
+                self.speaking = False
+                self._since_keepalive += 1
+                if self.keepalive_frames and self._since_keepalive >= self.keepalive_frames:
+                    self._since_keepalive = 0
+                    self.keepalive_out += 1
+                elif self._preroll_len is not None:
+                    self._remember(frame)
+                    continue
+                else:
+                    continue
+            out[filled : filled + fs] = frame
+            filled += fs
+            self.frames_out += 1
+        return out[:filled]
+
+    def _remember(self, frame: np.ndarray) -> None:
+        self._preroll[self._preroll_pos] = frame
+        self._preroll_pos = (self._preroll_pos + 1) % self._preroll.shape[0]
+        self._preroll_len = min(self._preroll_len + 1, self._preroll.shape[0])
+
+    def _flush_preroll(self, out: np.ndarray, filled: int) -> int:
+        if not self._preroll_len:
+            return filled
+        fs = self.config.frame_samples
+        size = self._preroll.shape[0]
+        start = (self._preroll_pos - self._preroll_len) % size
+        for k in range(self._preroll_len):
+            out[filled : filled + fs] = self._preroll[(start + k) % size]
+            filled += fs
+        self.frames_out += self._preroll_len
+        self._preroll_len = 0
+        return filled
+
+    def stats(self) -> dict:
+        frames_in = self.frames_in
+        suppressed = frames_in - self.frames_out
+        bytes_per_frame = self.config.frame_samples * 2
+        return {
+            "frames_in": frames_in,
+            "frames_out": self.frames_out,
+            "bytes_in": frames_in * bytes_per_frame,
+            "bytes_out": self.frames_out * bytes_per_frame,
+            "suppressed_fraction": suppressed / frames_in if frames_in else 0.0,
+            "suppressed_bytes": suppressed * bytes_per_frame,
+            "speech_segments": self.segments,
+            "keepalive_frames": self.keepalive_out,
+            "noise_floor_db": round(self.noise_floor_db, 1),
+        }
+
+
+__all__ = ["SpeechGate", "SpeechGateConfig"]
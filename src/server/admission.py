@@ -0,0 +1,133 @@
+"""
+Per-worker admission control.
+
+A worker that takes on more calls than its CPU budget degrades every call at
+once. AdmissionController tracks the sessions a worker is serving and refuses
+new ones when any limit is crossed:
+
+    ADMISSION_MAX_SESSIONS      active twilio_stream + /ws sessions (default 50)
+    ADMISSION_MAX_LOOP_LAG_MS   smoothed event-loop lag (default 100)
+    ADMISSION_MAX_UPLINK_QUEUE  caller audio batches queued towards the model,
+                                summed over sessions (default 100)
+
+Twilio calls are admitted in two steps: twilio_voice reserves a slot before
+answering with the media-stream TwiML, and the stream claims it when it
+connects, so a burst of incoming calls cannot all pass the check before any
+of them is counted. Unclaimed reservations expire.
+"""
+
+import os
+import time
+from collections import deque
+from typing import Callable
+
+from server import metrics
+
+ADMISSION_MAX_SESSIONS = int(os.getenv("ADMISSION_MAX_SESSIONS", "50"))
+ADMISSION_MAX_LOOP_LAG_MS = float(os.getenv("ADMISSION_MAX_LOOP_LAG_MS", "100"))
+ADMISSION_MAX_UPLINK_QUEUE = int(os.getenv("ADMISSION_MAX_UPLINK_QUEUE", "100"))
+RESERVATION_TTL = 15.0  # seconds from TwiML answer to stream connect
+
+REJECTIONS = metrics.counter(
+    "voice_admission_rejections_total",
+    "Sessions refused by admission control, by transport and reason.",
+    ("transport", "reason"),
+)
+
+
+class Session:
+    def __init__(self, controller: "AdmissionController", transport: str):
+        self.controller = controller
+        self.transport = transport
+        self.queue_depth: Callable[[], int] = lambda: 0
+
+    def release(self) -> None:
+        self.controller._sessions.discard(self)
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        *,
+        max_sessions: int = ADMISSION_MAX_SESSIONS,
+        max_loop_lag_ms: float = ADMISSION_MAX_LOOP_LAG_MS,
+        max_uplink_queue: int = ADMISSION_MAX_UPLINK_QUEUE,
+    ):
+        self.max_sessions = max_sessions
+        self.max_loop_lag_ms = max_loop_lag_ms
+        self.max_uplink_queue = max_uplink_queue
+        self._sessions: set[Session] = set()
+        self._reservations: deque[float] = deque()  # expiry times
+
+    def _pending(self) -> int:
+        now = time.monotonic()
+        while self._reservations and self._reservations[0] <= now:
+            self._reservations.popleft()
+        return len(self._reservations)
+
+    def uplink_queue(self) -> int:
+        return sum(session.queue_depth() for session in self._sessions)
+
+    # Why a new session would be refused right now, or None if it fits.
+    def overload_reason(self) -> str | None:
+        if len(self._sessions) + self._pending() >= self.max_sessions:
+            return "sessions"
+        if metrics.loop_lag(smoothed=True) * 1000 > self.max_loop_lag_ms:
+            return "loop_lag"
+        if self.uplink_queue() > self.max_uplink_queue:
+            return "uplink_queue"
+        return None
+
+    def reserve(self, transport: str = "twilio") -> bool:
+        """Hold a slot for a call about to connect its media stream."""
+        reason = self.overload_reason()
+        if reason:
+            REJECTIONS.inc(transport=transport, reason=reason)
+            return False
+        self._reservations.append(time.monotonic() + RESERVATION_TTL)
+        return True
+
+    def admit(self, transport: str, claim_reservation: bool = False) -> Session | None:
+        """
+        Start a session. With claim_reservation, a slot held by reserve() is
+        used if there is one (always admitted: the call was already
+        answered); otherwise the limits are checked.
+        """
+        if claim_reservation and self._pending():
+            self._reservations.popleft()
+        else:
+            reason = self.overload_reason()
+            if reason:
+                REJECTIONS.inc(transport=transport, reason=reason)
+                return None
+        session = Session(self, transport)
+        self._sessions.add(session)
+        return session
+
+    def capacity(self) -> dict:
+        reason = self.overload_reason()
+        active = len(self._sessions)
+        pending = self._pending()
+        return {
+            "accepting": reason is None,
+            "reason": reason,
+            "active_sessions": active,
+            "reserved": pending,
+            "max_sessions": self.max_sessions,
+            "remaining": max(0, self.max_sessions - active - pending) if reason is None else 0,
+            "loop_lag_ms": round(metrics.loop_lag(smoothed=True) * 1000, 2),
+            "max_loop_lag_ms": self.max_loop_lag_ms,
+            "uplink_queue": self.uplink_queue(),
+            "max_uplink_queue": self.max_uplink_queue,
+        }
+
+
+_admission: AdmissionController | None = None
+
+
+# The worker's shared admission controller.
+def get_admission() -> AdmissionController:
+    global _admission
+    if _admission is None:
+        _admission = AdmissionController()
+    return _admission
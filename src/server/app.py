@@ -1,42 +1,76 @@
 import sys, os
 sys.path.append(os.path.join(os.path.dirname(__file__), "../.."))
 
-from dotenv import load_dotenv
-load_dotenv()
+# Read .env for local runs; hosts that inject the environment (Render) can
+# skip it with LOAD_DOTENV=0
+if os.getenv("LOAD_DOTENV", "1") != "0":
+    from dotenv import load_dotenv
+    load_dotenv()
 
 import os
 import time
-import uvicorn
+import asyncio
+import importlib
 import base64
-import wave
+import json
+import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime
-import numpy as np          # for PCM16 buffer handling
-import g711                 # g711: μ-law <-> PCM helpers
-import requests             # for downloading Twilio recordings
+from typing import TYPE_CHECKING
 
 from starlette.applications import Starlette
 from starlette.responses import HTMLResponse, PlainTextResponse
 from starlette.routing import Route, WebSocketRoute
 from starlette.staticfiles import StaticFiles
-from starlette.websockets import WebSocket
-from starlette.responses import FileResponse, JSONResponse
-
-from langchain_openai_voice import OpenAIVoiceReactAgent
-from server.utils import websocket_stream
+from starlette.websockets import WebSocket, WebSocketDisconnect
+from starlette.responses import JSONResponse, Response
+
+from langchain_openai_voice.pool import SessionPool
+from langchain_openai_voice.session import DEFAULT_URL
+from langchain_openai_voice.tool_cache import ToolResultCache
+from langchain_openai_voice.timeline import TurnTimeline
+from langchain_openai_voice.eventlog import EventLog
+from langchain_openai_voice.playback import delta_payload
+from langchain_openai_voice.profiling import DispatchStats
+from server.utils import (
+    BINARY_SUBPROTOCOL,
+    binary_audio_sender,
+    receive_binary_audio,
+    wants_binary_audio,
+    websocket_stream,
+)
+from server.recording import get_recording_writer
+from server.downloads import recording_response
+from server.catalog import RecordingCatalog, run_sweeper
+from server.admission import get_admission
+from server.dialer import OutboundDialer
+from server.loopmon import LoopWatchdog, SamplingProfiler
+from server import metrics
+from server.phrases import PHRASE_CACHE, cached_phrase, phrase_wav, prerender_phrases, say_phrase
 from server.prompt import INSTRUCTIONS
-from server.tools import TOOLS
+from server.tools import get_tools
 
 # Import provider factories from utils.py 
-from langchain_openai_voice.utils import get_asr_provider, get_tts_provider
+from langchain_openai_voice.utils import (
+    close_providers,
+    first_chunk_timer,
+    get_asr_provider,
+    get_tts_provider,
+    sniff_event_type,
+)
 
 # Import Twilio VoiceResponse to generate TwiML
 from twilio.twiml.voice_response import VoiceResponse, Dial, Number
-from twilio.rest import Client
 
 # For Twilio token endpoint
 from twilio.jwt.access_token import AccessToken
 from twilio.jwt.access_token.grants import VoiceGrant
 
+# Loaded on first use (see preload_modules)
+if TYPE_CHECKING:
+    from langchain_openai_voice.agent import OpenAIVoiceReactAgent
+    from langchain_openai_voice.downlink import PacedDownlink
+
 # PUBLIC_URL (must include https:// in .env)
 PUBLIC_URL = os.getenv("PUBLIC_URL")
 if not PUBLIC_URL:
@@ -46,11 +80,121 @@ if not PUBLIC_URL:
 TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
 TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
 
+# Outbound dialer: placement rate, cap on unfinished calls (default: the
+# worker's session limit), bearer token for the campaign API, and an
+# alternative API host (e.g. benchmarks/mock_twilio.py)
+DIALER_CALLS_PER_SECOND = float(os.getenv("DIALER_CALLS_PER_SECOND", "1"))
+DIALER_MAX_CONCURRENT = int(os.getenv("DIALER_MAX_CONCURRENT", "0")) or get_admission().max_sessions
+DIALER_API_TOKEN = os.getenv("DIALER_API_TOKEN")
+TWILIO_API_BASE = os.getenv("TWILIO_API_BASE")
+dialer: OutboundDialer | None = None
+
 # Directory for server-side recordings (ephemeral on Render; persists until redeploy)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 RECORDINGS_DIR = os.path.join(BASE_DIR, "recordings")
 os.makedirs(RECORDINGS_DIR, exist_ok=True) # Create if not exists
 
+# Index of recordings (SID, times, duration, size, DTMF) and its retention rules;
+# 0 disables a rule
+RECORDINGS_CATALOG = RecordingCatalog(
+    os.getenv("RECORDINGS_DB", os.path.join(RECORDINGS_DIR, "catalog.sqlite3")), RECORDINGS_DIR
+)
+RECORDINGS_RETENTION_DAYS = float(os.getenv("RECORDINGS_RETENTION_DAYS", "0"))
+RECORDINGS_MAX_MB = int(os.getenv("RECORDINGS_MAX_MB", "0"))
+RECORDINGS_SWEEP_INTERVAL = float(os.getenv("RECORDINGS_SWEEP_INTERVAL", "3600"))
+
+# Per-call records (transcripts, tool calls, errors, call status) written as
+# daily JSONL files by a background task. EVENT_LOG_SAMPLE keeps a fraction
+# of some event types, e.g. "unhandled_event=0.1,call_status=0.5".
+EVENT_LOG = EventLog(
+    os.getenv("EVENT_LOG_DIR", os.path.join(BASE_DIR, "logs")),
+    sample_rates={
+        name.strip(): float(rate)
+        for name, rate in (item.split("=") for item in os.getenv("EVENT_LOG_SAMPLE", "").split(",") if item)
+    },
+    max_records=int(os.getenv("EVENT_LOG_MAX_RECORDS", "10000")),
+    flush_interval=float(os.getenv("EVENT_LOG_FLUSH_INTERVAL", "1.0")),
+)
+
+# What blocks the event loop: stalls longer than SLOW_CALLBACK_MS are
+# attributed to the code that was running, each Realtime and Twilio event type
+# is timed, and /debug/* (off unless DEBUG_API_TOKEN is set) reports the top
+# offenders and runs a sampling profile on the live worker.
+SLOW_CALLBACK_MS = float(os.getenv("SLOW_CALLBACK_MS", "100"))
+DEBUG_API_TOKEN = os.getenv("DEBUG_API_TOKEN")
+LOOP_WATCHDOG = LoopWatchdog(threshold=SLOW_CALLBACK_MS / 1000)
+LOOP_PROFILER = SamplingProfiler()
+DISPATCH_STATS = DispatchStats()
+
+# Realtime endpoint (point at benchmarks/mock_realtime.py for load tests)
+REALTIME_URL = os.getenv("OPENAI_REALTIME_URL", DEFAULT_URL)
+
+# How long a call keeps redialing a dropped Realtime connection (0: hang up)
+REALTIME_RECONNECT_MAX_OUTAGE = float(os.getenv("REALTIME_RECONNECT_MAX_OUTAGE", "15"))
+
+# Pre-warmed Realtime sessions handed to Twilio calls (0 disables the pool)
+REALTIME_POOL_SIZE = int(os.getenv("REALTIME_POOL_SIZE", "0"))
+REALTIME_POOL_MAX_IDLE = float(os.getenv("REALTIME_POOL_MAX_IDLE", "300"))
+session_pool: SessionPool | None = None
+
+# Speech gate in front of the uplink: only speech (plus padding) and a thin
+# keepalive reach the model. VAD_GATE=0 forwards every frame.
+VAD_GATE = os.getenv("VAD_GATE", "1") != "0"
+VAD_SETTINGS = dict(  # SpeechGateConfig fields
+    threshold_db=float(os.getenv("VAD_THRESHOLD_DB", "-45")),
+    snr_db=float(os.getenv("VAD_SNR_DB", "10")),
+    zcr_threshold=float(os.getenv("VAD_ZCR_THRESHOLD", "0.3")),
+    hangover_ms=int(os.getenv("VAD_HANGOVER_MS", "600")),
+    preroll_ms=int(os.getenv("VAD_PREROLL_MS", "200")),
+    keepalive_ms=int(os.getenv("VAD_KEEPALIVE_MS", "1000")),
+)
+
+# Paced outbound audio of the calls in progress, by streamSid (exposed on /metrics)
+ACTIVE_DOWNLINKS: dict[str, "PacedDownlink"] = {}
+
+# Tool results shared across all calls on this worker (tools opt out via metadata)
+TOOL_CACHE = ToolResultCache()
+
+# Heavy modules (langchain_core, numpy, tool clients) are imported on first use
+# by the routes that need them. STARTUP_IMPORTS selects when that happens:
+#   warm   serve at once, then load them in the background (default)
+#   lazy   leave them to the first call
+#   eager  load them before serving (gunicorn --preload: workers share them)
+STARTUP_IMPORTS = os.getenv("STARTUP_IMPORTS", "warm")
+
+PRELOAD_MODULES = (
+    "langchain_openai_voice.agent",
+    "langchain_openai_voice.downlink",
+    "langchain_openai_voice.vad",
+    "twilio.http.async_http_client",
+    "twilio.rest",
+)
+
+def preload_modules() -> None:
+    for name in PRELOAD_MODULES:
+        importlib.import_module(name)  # imported for the side effect of loading it
+    get_tools()
+
+if STARTUP_IMPORTS == "eager":
+    preload_modules()
+
+# Reported by /health/capacity; in warm mode, set once the preload finishes
+MODULES_READY = STARTUP_IMPORTS != "warm"
+
+# Every call uses the same agent configuration (pooled sessions depend on it)
+def build_agent() -> "OpenAIVoiceReactAgent":
+    from langchain_openai_voice.agent import OpenAIVoiceReactAgent
+
+    return OpenAIVoiceReactAgent(
+        model="gpt-4o-realtime-preview",
+        url=REALTIME_URL,
+        tools=get_tools(),
+        instructions=INSTRUCTIONS,
+        tool_cache=TOOL_CACHE,
+        reconnect_max_outage=REALTIME_RECONNECT_MAX_OUTAGE,
+        dispatch_stats=DISPATCH_STATS,
+    )
+
 # Twilio Access Token endpoint 
 async def twilio_token(request):
     account_sid = os.getenv("TWILIO_ACCOUNT_SID")
@@ -68,53 +212,108 @@ async def twilio_token(request):
 # Browser WebSocket endpoint (ASR → LLM → TTS pipeline)
 # Receive audio from the browser, and stream the response back to the client.
 async def websocket_endpoint(websocket: WebSocket):
-    await websocket.accept() # Stream of audio input from browser
-    browser_receive_stream = websocket_stream(websocket)
+    # Refuse new sessions while this worker is over its limits (try again later)
+    admission = get_admission().admit("browser")
+    if admission is None:
+        print("🚦 /ws refused: worker at capacity")
+        await websocket.close(code=1013)
+        return
+    try:
+        await browser_session(websocket, admission)
+    finally:
+        admission.release()
+
+async def browser_session(websocket: WebSocket, admission):
+    # Clients offering the voice.pcm16 subprotocol exchange raw PCM16 in binary
+    # frames; others send and receive base64 audio inside JSON events.
+    binary = wants_binary_audio(websocket)
+    await websocket.accept(subprotocol=BINARY_SUBPROTOCOL if binary else None)
 
-    # Choose ASR and TTS providers from env vars (default = openai)
+    # Choose ASR and TTS providers from env vars (default = openai);
+    # instances are shared by all connections
     asr_provider = get_asr_provider(os.getenv("ASR_PROVIDER", "openai"))
     tts_provider = get_tts_provider(os.getenv("TTS_PROVIDER", "openai"))
 
     # Create the LLM Agent
-    agent = OpenAIVoiceReactAgent(
-        model="gpt-4o-realtime-preview",
-        tools=TOOLS,
-        instructions=INSTRUCTIONS,
+    agent = build_agent()
+    admission.queue_depth = agent.uplink_queue_depth
+
+    # Pre-rendered greeting (PHRASE_AUDIO=1), played without synthesis
+    greeting = cached_phrase("greeting", "pcm_24000")
+    if greeting and binary:
+        await websocket.send_bytes(greeting.data)
+    elif greeting:
+        delta = base64.b64encode(greeting.data).decode()
+        await websocket.send_text(json.dumps({"type": "response.audio.delta", "delta": delta}))
+
+    # Step 1: Automatic Speech Recognition (stub input, streamed)
+    # In a real pipeline, the browser's audio chunks feed transcribe_stream()
+    async def stub_audio():
+        yield b"fake audio input"
+
+    transcript = "".join([
+        text async for text in first_chunk_timer(
+            asr_provider.transcribe_stream(stub_audio()),
+            provider_timer("asr_first_chunk", asr_provider.name),
+            provider_timer("asr", asr_provider.name),
+        )
+    ])
+
+    # Step 2: Text-to-Speech synthesis (stub reply, streamed)
+    audio_bytes = 0
+    async for chunk in first_chunk_timer(
+        tts_provider.synthesize_stream("fake reply text"),
+        provider_timer("tts_first_chunk", tts_provider.name),
+        provider_timer("tts", tts_provider.name),
+    ):
+        audio_bytes += len(chunk)
+    print(f"ASR → {transcript!r}, TTS → {audio_bytes} bytes")
+
+    # Step 3: LLM session (agent.aconnect handles ASR + LLM + TTS over Realtime);
+    # per-turn latencies are recorded by the timeline
+    timeline = TurnTimeline(metrics.turn_observer("browser"))
+    call_log = EVENT_LOG.call(uuid.uuid4().hex, transport="browser")
+    if not binary:
+        await run_agent(
+            agent, websocket_stream(websocket), websocket.send_text, timeline=timeline, call_log=call_log
+        )
+        return
+
+    # Binary mode: mic audio is batched by the agent's uplink and base64-encoded
+    # once, on its way to the model; model audio is decoded once, here.
+    agent.external_sample_rate = 24000
+    agent_task = asyncio.create_task(
+        run_agent(
+            agent, agent.external_audio_stream(), binary_audio_sender(websocket),
+            timeline=timeline, call_log=call_log,
+        )
     )
+    try:
+        await receive_binary_audio(websocket, agent.handleExternalAudioChunk, agent.send_external_event)
+    finally:
+        agent.close_external_audio()
+        agent_task.cancel()
 
-    # Latency measurement starts
-    start = time.perf_counter()
-
-    # Step 1: Automatic Speech Recognition (stub call)
-    # In a real pipeline, we call asr_provider.transcribe(audio_bytes)
-    await asr_provider.transcribe(b"fake audio input")
-    after_asr = time.perf_counter()
-
-    # Step 2: LLM processing (agent.aconnect internally handles LLM + streaming)
-    # await agent.aconnect(browser_receive_stream, websocket.send_text)
-    # after_llm = time.perf_counter()
-    
-    # Skip LLM for now, just log a placeholder
-    print("LLM processing skipped (test mode)")
-    after_llm = time.perf_counter()
-
-    # Step 3: Text-to-Speech synthesis (stub call)
-    await tts_provider.synthesize("fake reply text")
-    after_tts = time.perf_counter()
-
-    # Print latency breakdown (to console for now, later Prometheus/Grafana)
-    print("ASR latency:", after_asr - start, "seconds")
-    print("LLM latency:", after_llm - after_asr, "seconds")
-    print("TTS latency:", after_tts - after_llm, "seconds")
-    # Latency measurement ends
+# Records a provider stage (time to first chunk, or whole call) for the browser
+# pipeline: printed and observed in voice_provider_stage_seconds.
+def provider_timer(stage: str, provider: str):
+    def observe(seconds: float) -> None:
+        print(f"{stage} latency ({provider}):", seconds, "seconds")
+        metrics.STAGE_LATENCY.observe(seconds, stage=stage, provider=provider, transport="browser")
+    return observe
 
 # Twilio inbound/outbound call (AI Stream)
 async def twilio_voice(request):
     print("✅ [/twilio/voice] Incoming request")
 
+    # Over capacity: answer with the fallback message instead of a media stream
+    if not get_admission().reserve("twilio"):
+        print("🚦 Worker at capacity, sending fallback TwiML")
+        return await twilio_fallback(request)
+
     resp = VoiceResponse()
-    resp.say("You are now connected to the AI Voice Agent.", voice="alice", language="en-US")
-    resp.say("Press 1 to continue talking, or 2 to hang up.", voice="alice", language="en-US")
+    say_phrase(resp, "greeting", PUBLIC_URL)
+    say_phrase(resp, "menu", PUBLIC_URL)
 
     # Media Stream
     wss_url = f"{PUBLIC_URL.replace('https://', 'wss://')}/twilio/stream"
@@ -125,82 +324,237 @@ async def twilio_voice(request):
     print("🔍 TwiML sent (AI Voice Agent):\n", twiml_str)
     return PlainTextResponse(twiml_str, media_type="application/xml")
 
+# Media Stream message types; anything else is timed as "other"
+TWILIO_EVENTS = {"connected", "start", "media", "mark", "dtmf", "stop"}
+
 # Twilio Media Stream WebSocket endpoint
 async def twilio_stream(websocket: WebSocket):
+    # Claims the slot reserved by /twilio/voice; unannounced streams are checked
+    admission = get_admission().admit("twilio", claim_reservation=True)
+    if admission is None:
+        print("🚦 Twilio Media Stream refused: worker at capacity")
+        await websocket.close(code=1013)
+        return
+    # released however the session ends, including a disconnect during accept()
+    try:
+        await twilio_session(websocket, admission)
+    finally:
+        admission.release()
+
+async def twilio_session(websocket: WebSocket, admission):
     await websocket.accept()
     print("🎧 Twilio Media Stream connected")
 
-    agent = OpenAIVoiceReactAgent(
-        model="gpt-4o-realtime-preview",
-        tools=TOOLS,
-        instructions=INSTRUCTIONS,
-    )
+    from langchain_openai_voice.codec import MuLawCodec  # μ-law <-> PCM16 lookup tables
+    from langchain_openai_voice.downlink import PacedDownlink
+    from langchain_openai_voice.vad import SpeechGate, SpeechGateConfig
 
-    wav_writer = None
+    agent = build_agent()
+    admission.queue_depth = agent.uplink_queue_depth
+
+    recording = None
     total_media_msgs = 0
+    codec = MuLawCodec()  # inbound μ-law -> PCM16 buffers
+    gate = SpeechGate(SpeechGateConfig(**VAD_SETTINGS)) if VAD_GATE else None
+    agent_task = None
+    downlink_task = None
+    sid = None
+    call_log = None
+
+    async def send_frame(ulaw: bytes) -> None:
+        payload = base64.b64encode(ulaw).decode()
+        await websocket.send_text(json.dumps({"event": "media", "streamSid": sid, "media": {"payload": payload}}))
+
+    # Model audio back to the caller as paced 20 ms 8 kHz μ-law media messages
+    downlink = PacedDownlink(
+        send_frame, on_underrun=lambda: metrics.DOWNLINK_UNDERRUNS.inc(transport="twilio")
+    )
+
+    # On barge-in, drop our buffer and `clear` whatever Twilio has not yet played.
+    async def send_to_caller(chunk: str) -> None:
+        if sid is None:
+            return
+        t = sniff_event_type(chunk)
+        if t == "response.audio.delta":
+            payload = delta_payload(chunk)  # sliced out, not JSON-decoded
+            if payload:
+                downlink.push(base64.b64decode(payload))
+        elif t == "response.audio.done":
+            downlink.end_of_response()
+        elif t == "input_audio_buffer.speech_started":
+            downlink.clear()
+            await websocket.send_text(json.dumps({"event": "clear", "streamSid": sid}))
+
+    # If the agent session fails, tell the caller instead of going silent
+    async def apologize() -> None:
+        phrase = cached_phrase("error")
+        if phrase:
+            downlink.push_frames(phrase.frames)
 
     try:
         while True:
             try:
                 message = await websocket.receive_json()
+            except WebSocketDisconnect:
+                print("🔌 Twilio Media Stream disconnected")
+                break
             except Exception as e:
                 print("⚠️ JSON parse error:", e)
                 continue
 
             event = message.get("event")
+            dispatched_at = time.perf_counter()
 
-            if event == "start":
-                sid = message["start"].get("streamSid")
-                ts = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
-                filename = f"call-{ts}-{sid}.wav"
-                wav_path = os.path.join(RECORDINGS_DIR, filename)
-
-                wav_writer = wave.open(wav_path, "wb")
-                wav_writer.setnchannels(1)
-                wav_writer.setsampwidth(2)
-                wav_writer.setframerate(8000)
-                print(f"📁 Recording started → {wav_path}")
-
-            elif event == "media":
-                if not wav_writer:
-                    continue
-                ulaw_bytes = base64.b64decode(message["media"]["payload"])
-                pcm_array = g711.decode_ulaw(ulaw_bytes)
-                pcm_bytes = np.asarray(pcm_array, dtype=np.int16).tobytes()
-                wav_writer.writeframes(pcm_bytes)
-
-                # Pass PCM bytes to the agent's audio handler 
-                if hasattr(agent, "handleExternalAudioChunk"):
-                    try:
-                        await agent.handleExternalAudioChunk(pcm_bytes)
-                    except Exception as e:
-                        print("⚠️ Agent audio handler error:", e)
-
-                total_media_msgs += 1
-                if total_media_msgs <= 5:
-                    print(f"🎤 Received media chunk #{total_media_msgs}")
-
-            elif event == "dtmf":
-                print(f"🎹 DTMF received: {message.get('dtmf')}")
-
-            elif event == "stop":
-                print("🛑 Stop event received")
-                break
+            try:
+                if event == "start":
+                    sid = message["start"].get("streamSid")
+                    ts = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+                    filename = f"call-{ts}-{sid}.wav"
+                    wav_path = os.path.join(RECORDINGS_DIR, filename)
+
+                    # Written by the shared recording thread, off the event loop
+                    recording = get_recording_writer().open(wav_path, sample_rate=8000, source="ulaw")
+                    print(f"📁 Recording started → {wav_path}")
+
+                    ACTIVE_DOWNLINKS[sid] = downlink
+                    downlink_task = asyncio.create_task(run_downlink(downlink))
+
+                    # Keyed by CallSid, like the call_status records of /twilio/status
+                    call_log = EVENT_LOG.call(message["start"].get("callSid"), transport="twilio", stream_sid=sid)
+                    call_log.event("call_start", recording=filename)
+
+                    # Caller audio reaches the model through the agent's batched uplink
+                    timeline = TurnTimeline(metrics.turn_observer("twilio"))
+                    agent_task = asyncio.create_task(
+                        run_agent(
+                            agent, agent.external_audio_stream(), send_to_caller,
+                            timeline=timeline, on_error=apologize, call_log=call_log,
+                        )
+                    )
+                    await catalog_safely("insert", RECORDINGS_CATALOG.recording_started(
+                        filename, stream_sid=sid, call_sid=message["start"].get("callSid"), format=recording.format
+                    ))
+
+                elif event == "media":
+                    if not recording:
+                        continue
+                    ulaw_bytes = base64.b64decode(message["media"]["payload"])
+                    # decoded in the writer thread; only RECORDING_BACKPRESSURE=block waits here
+                    if recording.policy == "block":
+                        await recording.awrite(ulaw_bytes)
+                    else:
+                        recording.write(ulaw_bytes)
+                    pcm_bytes = codec.decode(ulaw_bytes)  # int16 view, valid until next frame
+                    if gate:
+                        pcm_bytes = gate.process(pcm_bytes)  # speech only; often empty
+
+                    # Pass PCM bytes to the agent's audio handler 
+                    if len(pcm_bytes) and hasattr(agent, "handleExternalAudioChunk"):
+                        try:
+                            await agent.handleExternalAudioChunk(pcm_bytes)
+                        except Exception as e:
+                            print("⚠️ Agent audio handler error:", e)
+
+                    total_media_msgs += 1
+                    if total_media_msgs <= 5:
+                        print(f"🎤 Received media chunk #{total_media_msgs}")
+
+                elif event == "dtmf":
+                    print(f"🎹 DTMF received: {message.get('dtmf')}")
+                    digit = (message.get("dtmf") or {}).get("digit")
+                    if recording and digit:
+                        await catalog_safely("DTMF", RECORDINGS_CATALOG.add_dtmf(os.path.basename(recording.path), digit))
+
+                elif event == "stop":
+                    print("🛑 Stop event received")
+                    break
+            finally:
+                # "event" is client input: unknown values share one series
+                DISPATCH_STATS.timer("twilio", event if event in TWILIO_EVENTS else "other", dispatched_at)
 
     finally:
-        if wav_writer:
-            wav_writer.close()
-            print(f"✅ Recording saved.")
-        await websocket.close()
+        agent.close_external_audio()
+        downlink.close()
+        if downlink_task:
+            downlink_task.cancel()
+            ACTIVE_DOWNLINKS.pop(sid, None)
+            print("📊 Downlink stats:", downlink.stats())
+        if agent_task:
+            agent_task.cancel()
+            print("📊 Uplink stats:", agent.uplink_stats())
+            print("📊 Barge-in stats:", agent.playback_stats())
+        if call_log:
+            call_log.event("call_end", media_messages=total_media_msgs)
+        if gate:
+            vad = gate.stats()
+            print(f"📊 Speech gate: suppressed {vad['suppressed_fraction']:.0%} of frames", vad)
+            for result, frames, nbytes in (
+                ("forwarded", vad["frames_out"], vad["bytes_out"]),
+                ("suppressed", vad["frames_in"] - vad["frames_out"], vad["suppressed_bytes"]),
+            ):
+                metrics.VAD_FRAMES.inc(frames, transport="twilio", result=result)
+                metrics.VAD_BYTES.inc(nbytes, transport="twilio", result=result)
+        if recording:
+            await recording.aclose()  # header finalized before the catalog reads it
+            await catalog_safely("update", RECORDINGS_CATALOG.recording_finished(os.path.basename(recording.path)))
+            print("✅ Recording closed:", recording.stats())
+        try:
+            await websocket.close()
+        except (RuntimeError, WebSocketDisconnect):
+            pass  # already closed by the client
+
+# Catalog writes are bookkeeping: a SQLite error ("database is locked" with
+# several workers, disk full) is logged and the call carries on.
+async def catalog_safely(what: str, operation) -> None:
+    try:
+        await operation
+    except Exception as e:
+        print(f"⚠️ Recording catalog {what} failed:", e)
+
+# Run an agent session in the background, logging instead of raising.
+# Uses a pre-warmed session from the pool when one is configured.
+async def run_agent(agent, input_stream, send_output_chunk, timeline=None, on_error=None, call_log=None):
+    try:
+        session = await session_pool.acquire() if session_pool else None
+        if session:
+            print(f"♻️ Using pooled Realtime session (warmed in {session.ready_seconds * 1000:.0f} ms, idle {session.age:.0f}s)")
+        await agent.aconnect(
+            input_stream, send_output_chunk, session=session, timeline=timeline, call_log=call_log
+        )
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        print("⚠️ Agent session error:", e)
+        if call_log:
+            call_log.event("session_error", error=str(e))
+        if on_error:
+            await on_error()
+
+# Pace model audio to the caller until the call ends.
+async def run_downlink(downlink):
+    try:
+        await downlink.run()
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        print("⚠️ Downlink error:", e)
+
+# Twilio Call Status callback (recorded in the event log, fed to the dialer)
+STATUS_FIELDS = ("CallStatus", "CallDuration", "Direction", "From", "To", "SipResponseCode", "ErrorCode")
 
-# Twilio Call Status callback 
 async def twilio_status(request):
     try:
         form = await request.form()
         data = dict(form)
     except Exception as e:
         data = {"_parse_error": str(e)}
-    print("📞 [/twilio/status] Call status:", data)
+    EVENT_LOG.record(
+        "call_status",
+        call_id=data.get("CallSid"),
+        **{key: data[key] for key in STATUS_FIELDS if key in data},
+    )
+    if dialer:
+        dialer.on_status(data)
     return PlainTextResponse("ok")
 
 # Fallback handler (if the main webhook fails)
@@ -208,8 +562,7 @@ async def twilio_fallback(request):
     print("⚠️ [/twilio/fallback] Fallback handler triggered")  # Debug log
     print("   ↳ Method:", request.method)
     resp = VoiceResponse()
-    resp.say("Sorry, our agent is unavailable. Please try again later.",
-             voice="alice", language="en-US")
+    say_phrase(resp, "fallback", PUBLIC_URL)
     return PlainTextResponse(str(resp), media_type="application/xml")
 
 # Outbound call trigger API
@@ -217,30 +570,109 @@ async def twilio_fallback(request):
 async def callme(request):
     print("📞 [/callme] Triggering outbound call via Twilio")
 
-    client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
     my_number = os.getenv("MY_PHONE_NUMBER")
     twilio_number = os.getenv("TWILIO_PHONE_NUMBER")
 
     if not my_number or not twilio_number:
         return PlainTextResponse("Missing MY_PHONE_NUMBER or TWILIO_PHONE_NUMBER", status_code=500)
 
-    call = client.calls.create(
-        to=my_number,
-        from_=twilio_number,
-        url=f"{PUBLIC_URL}/twilio/voice"
-    )
-    print(f"   ↳ Outbound Call SID: {call.sid}")
+    call = await get_dialer().dial(my_number)
+    if call.sid is None:
+        return PlainTextResponse(f"❌ Call not placed: {call.error}", status_code=503 if call.status == "rejected" else 502)
     return PlainTextResponse(f"✅ Call triggered, SID: {call.sid}")
 
-# Download Local Recordings (debug only) 
+# Shared dialer (one pooled Twilio client per worker), created on first use
+def get_dialer() -> OutboundDialer:
+    global dialer
+    if dialer is None:
+        dialer = OutboundDialer(
+            account_sid=TWILIO_ACCOUNT_SID,
+            auth_token=TWILIO_AUTH_TOKEN,
+            from_number=os.getenv("TWILIO_PHONE_NUMBER"),
+            voice_url=f"{PUBLIC_URL}/twilio/voice",
+            status_url=f"{PUBLIC_URL}/twilio/status",
+            api_base=TWILIO_API_BASE,
+            calls_per_second=DIALER_CALLS_PER_SECOND,
+            max_concurrent=DIALER_MAX_CONCURRENT,
+            admission=get_admission(),
+        )
+    return dialer
+
+# Bulk outbound campaign: POST {"numbers": ["+1...", ...]} -> 202 with the campaign id.
+# Places real calls, so it requires `Authorization: Bearer $DIALER_API_TOKEN`.
+async def create_campaign(request):
+    if not DIALER_API_TOKEN:
+        return JSONResponse({"error": "campaigns are disabled (DIALER_API_TOKEN is not set)"}, status_code=403)
+    if request.headers.get("authorization") != f"Bearer {DIALER_API_TOKEN}":
+        return JSONResponse({"error": "unauthorized"}, status_code=401)
+    if not os.getenv("TWILIO_PHONE_NUMBER"):
+        return JSONResponse({"error": "TWILIO_PHONE_NUMBER is not set"}, status_code=500)
+    try:
+        body = await request.json()
+        numbers = body["numbers"]
+        if not isinstance(numbers, list) or not numbers:
+            raise ValueError("numbers must be a non-empty list")
+    except (ValueError, KeyError, TypeError) as e:
+        return JSONResponse({"error": f"bad request: {e}"}, status_code=400)
+
+    campaign = get_dialer().submit(numbers)
+    print(f"📞 Campaign {campaign.id}: {len(numbers)} numbers queued")
+    return JSONResponse(campaign.summary(), status_code=202)
+
+# Campaign progress with per-call status (from Twilio status callbacks)
+async def get_campaign(request):
+    if not DIALER_API_TOKEN or request.headers.get("authorization") != f"Bearer {DIALER_API_TOKEN}":
+        return JSONResponse({"error": "unauthorized"}, status_code=401)
+    campaign = dialer.campaign(request.path_params["campaign_id"]) if dialer else None
+    if campaign is None:
+        return JSONResponse({"error": "campaign not found"}, status_code=404)
+    return JSONResponse({**campaign.summary(), "calls": [call.to_dict() for call in campaign.calls]})
+
+# Recording listing, newest first, from the catalog:
+# ?limit=&cursor=&sid=&since=&until=&min_duration_ms= (times as epoch seconds or ISO 8601)
+async def list_recordings(request):
+    q = request.query_params
+    try:
+        limit = min(max(int(q.get("limit", 50)), 1), 500)
+        cursor = int(q["cursor"]) if q.get("cursor") else None
+        min_duration = int(q["min_duration_ms"]) if q.get("min_duration_ms") else None
+        since, until = (_parse_time(q.get(name)) for name in ("since", "until"))
+    except ValueError as e:
+        return JSONResponse({"error": f"bad query parameter: {e}"}, status_code=400)
+
+    page, next_cursor = await RECORDINGS_CATALOG.list(
+        limit=limit, cursor=cursor, stream_sid=q.get("sid"),
+        since=since, until=until, min_duration_ms=min_duration,
+    )
+    for row in page:
+        row["url"] = f"/recordings/{row['filename']}"
+    return JSONResponse({"recordings": page, "next_cursor": next_cursor})
+
+def _parse_time(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+# Download Local Recordings (debug only)
+# Supports Range requests; ?format=pcm16 transcodes μ-law recordings on the fly.
 async def get_recording(request):
     filename = request.path_params["filename"]
     file_path = os.path.join(RECORDINGS_DIR, filename)
-    if os.path.exists(file_path):
-        return FileResponse(file_path, media_type="audio/mpeg", filename=filename)
+    if os.path.basename(filename) == filename and os.path.isfile(file_path):
+        return await recording_response(request, file_path)
     else:
         return PlainTextResponse("Recording not found", status_code=404)
     
+# Pre-rendered phrase audio for TwiML <Play>
+async def get_phrase(request):
+    wav = phrase_wav(request.path_params["name"])
+    if wav is None:
+        return PlainTextResponse("Phrase not found", status_code=404)
+    return Response(wav, media_type="audio/wav")
+
 # Serve the homepage HTML file.
 async def homepage(request):
     with open("server/static/index.html") as f:
@@ -251,10 +683,143 @@ async def homepage(request):
 async def healthcheck(request):
     return HTMLResponse("OK - Voice Agent Server Running")
 
+# Capacity check for load balancers: 200 while accepting sessions, 503 when full
+# or still warming up (/health stays a plain liveness check)
+async def capacity_healthcheck(request):
+    capacity = get_admission().capacity()
+    capacity["modules_ready"] = MODULES_READY
+    ready = capacity["accepting"] and MODULES_READY
+    return JSONResponse(capacity, status_code=200 if ready else 503)
+
+# Loop diagnostics: lag, the code behind slow callbacks, the costliest event
+# types. Requires `Authorization: Bearer $DEBUG_API_TOKEN`, like the campaign API.
+def _debug_denied(request):
+    if not DEBUG_API_TOKEN:
+        return JSONResponse({"error": "debug endpoints are disabled (DEBUG_API_TOKEN is not set)"}, status_code=403)
+    if request.headers.get("authorization") != f"Bearer {DEBUG_API_TOKEN}":
+        return JSONResponse({"error": "unauthorized"}, status_code=401)
+    return None
+
+async def debug_loop(request):
+    denied = _debug_denied(request)
+    if denied:
+        return denied
+    try:
+        top = int(request.query_params.get("top", "10"))
+    except ValueError as e:
+        return JSONResponse({"error": f"bad query parameter: {e}"}, status_code=400)
+    return JSONResponse({
+        "loop_lag_ms": {
+            "last": 1000 * metrics.loop_lag(),
+            "avg": 1000 * metrics.loop_lag(smoothed=True),
+            "max": 1000 * metrics.loop_lag_max(),
+        },
+        "slow_callback_ms": SLOW_CALLBACK_MS,
+        "slow_callbacks": LOOP_WATCHDOG.offenders(top),
+        "recent_stalls": list(LOOP_WATCHDOG.stalls)[-top:],
+        "dispatch": DISPATCH_STATS.top(top),
+        "profile": {"running": LOOP_PROFILER.running},
+    })
+
+# Sample the loop's stack every interval_ms (default 5) for at most `seconds` (default 30)
+async def debug_profile_start(request):
+    denied = _debug_denied(request)
+    if denied:
+        return denied
+    try:
+        interval = float(request.query_params.get("interval_ms", "5")) / 1000
+        seconds = float(request.query_params.get("seconds", "30"))
+    except ValueError as e:
+        return JSONResponse({"error": f"bad query parameter: {e}"}, status_code=400)
+    if LOOP_PROFILER.running:
+        return JSONResponse({"error": "a profile is already running"}, status_code=409)
+    LOOP_PROFILER.start(interval=max(interval, 0.001), max_seconds=min(seconds, 600))
+    return JSONResponse({"running": True, "interval_ms": 1000 * LOOP_PROFILER.interval}, status_code=202)
+
+# Stop the profile (or collect one that timed out): JSON summary, or folded
+# stacks for flamegraph.pl / speedscope with ?format=collapsed
+async def debug_profile_stop(request):
+    denied = _debug_denied(request)
+    if denied:
+        return denied
+    await asyncio.to_thread(LOOP_PROFILER.stop)
+    if request.query_params.get("format") == "collapsed":
+        return PlainTextResponse(LOOP_PROFILER.collapsed())
+    return JSONResponse(LOOP_PROFILER.summary())
+
+# Prometheus scrape endpoint
+async def metrics_endpoint(request):
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+# Sampled at scrape time from the worker's shared components; running totals
+# are named *_total and exposed as counters
+def _collect_component_metrics() -> dict[str, float]:
+    cache = TOOL_CACHE.stats()
+    recording = get_recording_writer().stats()
+    samples = {
+        "voice_tool_cache_hits_total": cache["hits"],
+        "voice_tool_cache_misses_total": cache["misses"],
+        "voice_tool_cache_shared_inflight_total": cache["shared_inflight"],
+        "voice_tool_cache_evictions_total": cache["evictions"],
+        "voice_recordings_active": recording["active_recordings"],
+        "voice_recording_queue_bytes": recording["queue_depth_bytes"],
+        "voice_recording_write_latency_max_ms": recording["write_latency_max_ms"],
+    }
+    for stream_sid, downlink in ACTIVE_DOWNLINKS.items():
+        labels = metrics.format_labels(stream_sid=stream_sid)  # streamSid comes from the client
+        samples["voice_downlink_buffer_ms" + labels] = downlink.depth_ms
+        samples["voice_downlink_target_ms" + labels] = downlink.target_ms
+        samples["voice_downlink_call_underruns" + labels] = downlink.underruns
+    capacity = get_admission().capacity()
+    samples["voice_admission_active_sessions"] = capacity["active_sessions"]
+    samples["voice_admission_reserved"] = capacity["reserved"]
+    samples["voice_admission_remaining"] = capacity["remaining"]
+    samples["voice_admission_uplink_queue"] = capacity["uplink_queue"]
+    samples["voice_admission_accepting"] = int(capacity["accepting"])
+    phrases = PHRASE_CACHE.stats()
+    samples["voice_phrase_cache_entries"] = phrases["entries"]
+    samples["voice_phrase_cache_bytes"] = phrases["bytes"]
+    samples["voice_phrase_cache_hits_total"] = phrases["hits"]
+    events = EVENT_LOG.stats()
+    samples["voice_event_log_buffered"] = events["buffered"]
+    samples["voice_event_log_written_total"] = events["written"]
+    samples["voice_event_log_dropped_total"] = events["dropped"]
+    samples["voice_event_log_sampled_out_total"] = events["sampled_out"]
+    for site in LOOP_WATCHDOG.offenders():
+        labels = metrics.format_labels(site=site["site"])
+        samples["voice_slow_callbacks_total" + labels] = site["count"]
+        samples["voice_slow_callback_seconds_total" + labels] = site["total_ms"] / 1000
+    for source, event, count, total, max_seconds in DISPATCH_STATS.items():
+        labels = metrics.format_labels(source=source, event=event)
+        samples["voice_dispatch_events_total" + labels] = count
+        samples["voice_dispatch_seconds_total" + labels] = total
+        samples["voice_dispatch_max_seconds" + labels] = max_seconds
+    if dialer:
+        outbound = dialer.stats()
+        samples["voice_dialer_queued"] = outbound["queued"]
+        samples["voice_dialer_active_calls"] = outbound["active"]
+        samples["voice_dialer_placed_total"] = outbound["placed"]
+        samples["voice_dialer_failed_total"] = outbound["failed"]
+    if session_pool:
+        pool = session_pool.stats()
+        samples.update({
+            "voice_session_pool_idle": pool["idle"],
+            "voice_session_pool_hits_total": pool["hits"],
+            "voice_session_pool_misses_total": pool["misses"],
+        })
+    return samples
+
+metrics.register_collector(_collect_component_metrics)
+
 # Routes
 routes = [
     Route("/", homepage),
     Route("/health", healthcheck),
+    Route("/health/capacity", capacity_healthcheck, methods=["GET"]),
+    Route("/metrics", metrics_endpoint, methods=["GET"]),
+    Route("/debug/loop", debug_loop, methods=["GET"]),
+    Route("/debug/profile/start", debug_profile_start, methods=["POST"]),
+    Route("/debug/profile/stop", debug_profile_stop, methods=["POST"]),
     WebSocketRoute("/ws", websocket_endpoint),
     
     # Twilio flows
@@ -266,15 +831,85 @@ routes = [
     
     # Outbound trigger
     Route("/callme", callme, methods=["GET"]),
+    Route("/campaigns", create_campaign, methods=["POST"]),
+    Route("/campaigns/{campaign_id}", get_campaign, methods=["GET"]),
 
-    # Recording download
+    # Recording listing + download
+    Route("/recordings", list_recordings, methods=["GET"]),
     Route("/recordings/{filename}", get_recording, methods=["GET"]),
+
+    # Pre-rendered phrases
+    Route("/phrases/{name}.wav", get_phrase, methods=["GET"]),
 ]
 
-app = Starlette(debug=True, routes=routes)
+# Start/stop background services with the app
+# Load the heavy modules in a thread once the server is up (STARTUP_IMPORTS=warm).
+async def warm_imports():
+    global MODULES_READY
+    start = time.perf_counter()
+    try:
+        await asyncio.to_thread(preload_modules)
+        print(f"🔥 Modules preloaded in {time.perf_counter() - start:.2f}s")
+    except Exception as e:
+        print("⚠️ Module preload failed (loaded on first use instead):", e)
+    MODULES_READY = True
+
+# Catalog recordings written before the catalog existed, without delaying startup.
+async def backfill_recordings():
+    try:
+        added = await RECORDINGS_CATALOG.backfill()
+        if added:
+            print(f"📁 Catalogued {added} existing recordings")
+    except Exception as e:
+        print("⚠️ Recording backfill failed:", e)
+
+@asynccontextmanager
+async def lifespan(app):
+    global session_pool
+    LOOP_WATCHDOG.start()  # watches this (the loop's) thread
+    loop_lag_task = asyncio.create_task(metrics.watch_loop_lag(watchdog=LOOP_WATCHDOG))
+    event_log_task = asyncio.create_task(EVENT_LOG.run())
+    background = [asyncio.create_task(backfill_recordings())]
+    if STARTUP_IMPORTS == "warm":
+        background.append(asyncio.create_task(warm_imports()))
+    sweeper_task = None
+    if RECORDINGS_RETENTION_DAYS or RECORDINGS_MAX_MB:
+        sweeper_task = asyncio.create_task(run_sweeper(
+            RECORDINGS_CATALOG,
+            interval=RECORDINGS_SWEEP_INTERVAL,
+            max_age_seconds=RECORDINGS_RETENTION_DAYS * 86400,
+            max_total_bytes=RECORDINGS_MAX_MB * 1024 * 1024,
+        ))
+    await prerender_phrases()
+    if REALTIME_POOL_SIZE > 0:
+        session_pool = SessionPool.for_agent(
+            build_agent(), size=REALTIME_POOL_SIZE, max_idle_age=REALTIME_POOL_MAX_IDLE
+        )
+        await session_pool.start()
+        print(f"♻️ Realtime session pool started (size={REALTIME_POOL_SIZE})")
+    yield
+    if session_pool:
+        print("♻️ Session pool stats:", session_pool.stats())
+        await session_pool.close()
+    loop_lag_task.cancel()
+    LOOP_WATCHDOG.stop()
+    LOOP_PROFILER.stop()
+    for task in background:
+        task.cancel()
+    if sweeper_task:
+        sweeper_task.cancel()
+    RECORDINGS_CATALOG.close()
+    if dialer:
+        await dialer.aclose()
+    event_log_task.cancel()
+    await EVENT_LOG.aclose()
+    await close_providers()
+
+app = Starlette(debug=True, routes=routes, lifespan=lifespan)
 
 # Serve static files (JS worklets etc.)
 app.mount("/static", StaticFiles(directory="server/static"), name="static")
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,265 @@
+"""
+SQLite catalog of call recordings.
+
+twilio_stream adds a row when a recording starts, appends DTMF digits as they
+arrive and fills in duration and size when the file is closed, so recordings
+can be listed by stream SID, date or duration without scanning
+RECORDINGS_DIR. The same index drives retention: sweep() deletes finished
+recordings older than a maximum age, then the oldest ones until the total
+size fits a budget.
+
+sqlite3 calls block, so every method runs on a worker thread (one shared
+connection, serialized by a lock). Files without a row, e.g. recorded before
+the catalog existed, are picked up by backfill() at startup.
+"""
+
+import asyncio
+import os
+import sqlite3
+import struct
+import threading
+import time
+
+from server.recording import WavInfo, read_wav_info
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recordings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    filename TEXT NOT NULL UNIQUE,
+    stream_sid TEXT,
+    call_sid TEXT,
+    format TEXT,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    duration_ms INTEGER,
+    bytes INTEGER
+);
+CREATE INDEX IF NOT EXISTS recordings_stream_sid ON recordings (stream_sid);
+CREATE INDEX IF NOT EXISTS recordings_started_at ON recordings (started_at);
+CREATE TABLE IF NOT EXISTS dtmf (
+    recording_id INTEGER NOT NULL REFERENCES recordings (id) ON DELETE CASCADE,
+    at REAL NOT NULL,
+    digit TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS dtmf_recording ON dtmf (recording_id);
+"""
+
+_COLUMNS = "id, filename, stream_sid, call_sid, format, started_at, ended_at, duration_ms, bytes"
+
+
+def wav_duration_ms(info: WavInfo) -> int:
+    frame_bytes = info.channels * max(1, info.bits // 8)
+    return info.data_size // frame_bytes * 1000 // info.sample_rate
+
+
+class RecordingCatalog:
+    def __init__(self, db_path: str, recordings_dir: str):
+        self.db_path = db_path
+        self.recordings_dir = recordings_dir
+        self._db: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA foreign_keys=ON")
+            db.executescript(SCHEMA)
+            self._db = db
+        return self._db
+
+    async def _run(self, fn, *args):
+        def locked():
+            with self._lock:
+                return fn(self._conn(), *args)
+        return await asyncio.to_thread(locked)
+
+    # -- recording lifecycle (twilio_stream) -------------------------------
+
+    async def recording_started(self, filename: str, *, stream_sid: str | None, call_sid: str | None = None,
+                                format: str | None = None, started_at: float | None = None) -> None:
+        await self._run(
+            lambda db: db.execute(
+                "INSERT OR REPLACE INTO recordings (filename, stream_sid, call_sid, format, started_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (filename, stream_sid, call_sid, format, started_at or time.time()),
+            )
+        )
+
+    async def add_dtmf(self, filename: str, digit: str, at: float | None = None) -> None:
+        await self._run(
+            lambda db: db.execute(
+                "INSERT INTO dtmf (recording_id, at, digit)"
+                " SELECT id, ?, ? FROM recordings WHERE filename = ?",
+                (at or time.time(), digit, filename),
+            )
+        )
+
+    async def recording_finished(self, filename: str, ended_at: float | None = None) -> None:
+        """Record the end time, duration and size of a closed recording."""
+        ended_at = ended_at or time.time()
+
+        def finish(db):
+            path = os.path.join(self.recordings_dir, filename)
+            # ended_at is set regardless, so the sweeper can still reclaim the file
+            try:
+                nbytes = os.path.getsize(path)
+            except OSError:
+                nbytes = None
+            try:
+                duration_ms = wav_duration_ms(read_wav_info(path))
+            except (OSError, ValueError, struct.error) as e:
+                print(f"⚠️ Catalog could not read {filename}:", e)
+                duration_ms = None
+            db.execute(
+                "UPDATE recordings SET ended_at = ?, duration_ms = ?, bytes = ? WHERE filename = ?",
+                (ended_at, duration_ms, nbytes, filename),
+            )
+
+        await self._run(finish)
+
+    # -- queries -----------------------------------------------------------
+
+    async def list(
+        self,
+        *,
+        limit: int = 50,
+        cursor: int | None = None,
+        stream_sid: str | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        min_duration_ms: int | None = None,
+    ) -> tuple[list[dict], int | None]:
+        """
+        Newest first. Returns (page, next_cursor); pass next_cursor back to
+        get the following page (None when there is none).
+        """
+        where, params = [], []
+        for clause, value in (
+            ("id < ?", cursor),
+            ("stream_sid = ?", stream_sid),
+            ("started_at >= ?", since),
+            ("started_at < ?", until),
+            ("duration_ms >= ?", min_duration_ms),
+        ):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        sql = f"SELECT {_COLUMNS} FROM recordings"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id DESC LIMIT ?"
+
+        def query(db):
+            rows = [dict(row) for row in db.execute(sql, (*params, limit + 1))]
+            page = rows[:limit]
+            digits = {row["id"]: [] for row in page}
+            if digits:
+                marks = ",".join("?" * len(digits))
+                for d in db.execute(
+                    f"SELECT recording_id, at, digit FROM dtmf WHERE recording_id IN ({marks}) ORDER BY at",
+                    tuple(digits),
+                ):
+                    digits[d["recording_id"]].append({"at": d["at"], "digit": d["digit"]})
+            for row in page:
+                row["dtmf"] = digits[row["id"]]
+            return page, (page[-1]["id"] if len(rows) > limit else None)
+
+        return await self._run(query)
+
+    # -- maintenance -------------------------------------------------------
+
+    async def backfill(self) -> int:
+        """Catalog .wav files in the directory that have no row yet."""
+        def scan(db):
+            known = {row[0] for row in db.execute("SELECT filename FROM recordings")}
+            added = 0
+            for entry in os.scandir(self.recordings_dir):
+                if not entry.name.endswith(".wav") or entry.name in known:
+                    continue
+                try:
+                    info = read_wav_info(entry.path)
+                except (OSError, ValueError, struct.error):
+                    continue
+                stat = entry.stat()
+                # call-<ts>-<sid>.wav
+                parts = entry.name[: -len(".wav")].split("-", 3)
+                sid = parts[3] if len(parts) == 4 and parts[0] == "call" else None
+                duration_ms = wav_duration_ms(info)
+                # OR IGNORE: another worker may catalog the same file meanwhile
+                cursor = db.execute(
+                    "INSERT OR IGNORE INTO recordings (filename, stream_sid, format, started_at, ended_at, duration_ms, bytes)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (entry.name, sid, "ulaw" if info.is_ulaw else "pcm16",
+                     stat.st_mtime - duration_ms / 1000, stat.st_mtime, duration_ms, stat.st_size),
+                )
+                added += cursor.rowcount
+            return added
+        return await self._run(scan)
+
+    async def sweep(self, *, max_age_seconds: float = 0, max_total_bytes: int = 0) -> dict:
+        """
+        Delete finished recordings (file and row) older than max_age_seconds,
+        then the oldest until their total size is within max_total_bytes.
+        0 disables either rule. Recordings still being written are kept.
+        """
+        def select(db):
+            doomed = []
+            if max_age_seconds:
+                doomed += db.execute(
+                    "SELECT id, filename, bytes FROM recordings WHERE ended_at IS NOT NULL AND ended_at < ?",
+                    (time.time() - max_age_seconds,),
+                ).fetchall()
+            if max_total_bytes:
+                gone = {row["id"] for row in doomed}
+                total = 0
+                for row in db.execute(
+                    "SELECT id, filename, bytes FROM recordings WHERE ended_at IS NOT NULL ORDER BY id DESC"
+                ):
+                    if row["id"] in gone:
+                        continue
+                    total += row["bytes"] or 0
+                    if total > max_total_bytes:
+                        doomed.append(row)
+            return doomed
+
+        def delete(db, doomed):
+            deleted = freed = 0
+            for row in doomed:
+                try:
+                    os.remove(os.path.join(self.recordings_dir, row["filename"]))
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"⚠️ Could not delete recording {row['filename']}:", e)
+                    continue
+                db.execute("DELETE FROM recordings WHERE id = ?", (row["id"],))
+                deleted += 1
+                freed += row["bytes"] or 0
+            return {"deleted": deleted, "bytes_freed": freed}
+
+        doomed = await self._run(select)
+        if not doomed:
+            return {"deleted": 0, "bytes_freed": 0}
+        return await self._run(delete, doomed)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+# Periodically apply the retention rules until cancelled.
+async def run_sweeper(catalog: RecordingCatalog, *, interval: float, max_age_seconds: float, max_total_bytes: int) -> None:
+    while True:
+        try:
+            result = await catalog.sweep(max_age_seconds=max_age_seconds, max_total_bytes=max_total_bytes)
+            if result["deleted"]:
+                print("🧹 Recording retention sweep:", result)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print("⚠️ Recording sweep failed:", e)
+        await asyncio.sleep(interval)
@@ -0,0 +1,330 @@
+"""
+Outbound dialer.
+
+One Twilio client per worker, backed by a pooled aiohttp session
+(AsyncTwilioHttpClient), places calls with calls.create_async, so the Twilio
+API round trip no longer stalls the event loop and every media stream on it.
+
+Numbers submitted as a campaign are queued and placed by a dispatcher task:
+- no faster than `calls_per_second` (Twilio's default account limit is 1);
+- only while fewer than `max_concurrent` placed calls are unfinished, and
+  while the admission controller has room for the calls still ringing
+  (answered calls are counted by admission itself once their stream opens).
+
+Call progress comes from Twilio status callbacks: twilio_status hands each
+form to on_status(). Calls that never report back are expired, so a lost
+callback cannot hold a slot forever.
+
+`api_base` sends API requests elsewhere, e.g. to benchmarks/mock_twilio.py.
+"""
+
+import asyncio
+import re
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+
+E164 = re.compile(r"^\+[1-9]\d{6,14}$")
+
+TWILIO_API = "https://api.twilio.com"
+TERMINAL_STATUSES = {"completed", "busy", "failed", "no-answer", "canceled", "rejected", "unknown"}
+RINGING_STATUSES = {"dialing", "queued", "initiated", "ringing"}
+STATUS_CALLBACK_EVENTS = ["initiated", "ringing", "answered", "completed"]
+
+RING_TIMEOUT = 120.0        # seconds without being answered before a call is written off
+MAX_CALL_SECONDS = 4 * 3600  # Twilio's default time limit
+
+
+@dataclass
+class OutboundCall:
+    to: str
+    campaign_id: str | None = None
+    status: str = "pending"  # pending -> dialing -> Twilio statuses
+    sid: str | None = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    history: list[tuple[str, float]] = field(default_factory=list)
+
+    def set_status(self, status: str) -> None:
+        self.status = status
+        self.history.append((status, time.time()))
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def to_dict(self) -> dict:
+        return {
+            "to": self.to,
+            "sid": self.sid,
+            "status": self.status,
+            "error": self.error,
+            "history": [{"status": s, "at": t} for s, t in self.history],
+        }
+
+
+class Campaign:
+    def __init__(self, calls: list[OutboundCall]):
+        self.id = uuid.uuid4().hex[:12]
+        self.created_at = time.time()
+        self.calls = calls
+        for call in calls:
+            call.campaign_id = self.id
+
+    @property
+    def finished(self) -> bool:
+        return all(call.finished for call in self.calls)
+
+    def summary(self) -> dict:
+        counts: dict[str, int] = {}
+        for call in self.calls:
+            counts[call.status] = counts.get(call.status, 0) + 1
+        return {
+            "id": self.id,
+            "created_at": self.created_at,
+            "total": len(self.calls),
+            "finished": self.finished,
+            "statuses": counts,
+        }
+
+
+class RateLimiter:
+    """Token bucket: `rate` acquisitions per second, bursts up to `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        waited = False
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                # a late wake-up must not shorten the next interval
+                self._tokens = 0.0 if waited else self._tokens - 1
+                return
+            waited = True
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class OutboundDialer:
+    def __init__(
+        self,
+        *,
+        account_sid: str,
+        auth_token: str,
+        from_number: str,
+        voice_url: str,
+        status_url: str,
+        api_base: str | None = None,
+        calls_per_second: float = 1.0,
+        max_concurrent: int = 10,
+        admission=None,
+        max_campaigns: int = 100,
+    ):
+        self.account_sid = account_sid
+        self.auth_token = auth_token
+        self.from_number = from_number
+        self.voice_url = voice_url
+        self.status_url = status_url
+        self.api_base = api_base
+        self.max_concurrent = max_concurrent
+        self.max_campaigns = max_campaigns
+        self.admission = admission
+        self.limiter = RateLimiter(calls_per_second)
+
+        self._client = None
+        self._http = None
+        self._queue: deque[OutboundCall] = deque()
+        self._active: dict[int, OutboundCall] = {}  # placed, not finished (by id())
+        self._by_sid: dict[str, OutboundCall] = {}
+        self._unmatched: OrderedDict[str, str] = OrderedDict()  # callbacks that beat create()
+        self._placing: set[asyncio.Task] = set()
+        self._campaigns: OrderedDict[str, Campaign] = OrderedDict()
+        self._changed = asyncio.Event()
+        self._dispatcher: asyncio.Task | None = None
+
+        self.placed = 0
+        self.failed = 0
+        self.expired = 0
+
+    # The shared client, created on first use (twilio.rest and aiohttp are
+    # slow imports, and the aiohttp session must be created inside the loop).
+    def client(self):
+        if self._client is None:
+            from twilio.http.async_http_client import AsyncTwilioHttpClient
+            from twilio.rest import Client
+
+            api_base = self.api_base
+
+            class HttpClient(AsyncTwilioHttpClient):
+                async def request(self, method, url, *args, **kwargs):
+                    if api_base and url.startswith(TWILIO_API):
+                        url = api_base.rstrip("/") + url[len(TWILIO_API):]
+                    return await super().request(method, url, *args, **kwargs)
+
+            self._http = HttpClient(pool_connections=True, timeout=15)
+            self._client = Client(self.account_sid, self.auth_token, http_client=self._http)
+        return self._client
+
+    # -- placing calls -------------------------------------------------------
+
+    def _ringing(self) -> int:
+        return sum(1 for call in self._active.values() if call.status in RINGING_STATUSES)
+
+    def has_slot(self) -> bool:
+        self._expire()
+        if len(self._active) >= self.max_concurrent:
+            return False
+        if self.admission is not None:
+            capacity = self.admission.capacity()
+            if not capacity["accepting"] or self._ringing() >= capacity["remaining"]:
+                return False
+        return True
+
+    async def dial(self, to: str, campaign_id: str | None = None) -> OutboundCall:
+        """Place one call now (rate limited); rejected when at capacity."""
+        call = OutboundCall(to, campaign_id)
+        if not E164.match(to):
+            call.error = "not an E.164 number"
+            call.set_status("rejected")
+        elif not self.has_slot():
+            call.error = "dialer at capacity"
+            call.set_status("rejected")
+        else:
+            await self.limiter.acquire()
+            await self._place(call)
+        return call
+
+    async def _place(self, call: OutboundCall) -> None:
+        call.set_status("dialing")
+        self._active[id(call)] = call
+        try:
+            instance = await self.client().calls.create_async(
+                to=call.to,
+                from_=self.from_number,
+                url=self.voice_url,
+                status_callback=self.status_url,
+                status_callback_event=STATUS_CALLBACK_EVENTS,
+            )
+        except Exception as e:
+            self.failed += 1
+            call.error = str(e)
+            call.set_status("failed")
+            self._finish(call)
+            print(f"⚠️ Outbound call to {call.to} failed:", e)
+            return
+        self.placed += 1
+        call.sid = instance.sid
+        self._by_sid[instance.sid] = call
+        call.set_status(instance.status or "queued")
+        print(f"   ↳ Outbound Call SID: {call.sid} → {call.to}")
+        early = self._unmatched.pop(call.sid, None)
+        if early:
+            self.on_status({"CallSid": call.sid, "CallStatus": early})
+
+    def _finish(self, call: OutboundCall) -> None:
+        self._active.pop(id(call), None)
+        if call.sid:
+            self._by_sid.pop(call.sid, None)
+        self._changed.set()
+
+    def _expire(self) -> None:
+        now = time.time()
+        for call in list(self._active.values()):
+            limit = RING_TIMEOUT if call.status in RINGING_STATUSES else MAX_CALL_SECONDS
+            if call.status != "dialing" and now - call.history[-1][1] > limit:
+                self.expired += 1
+                call.error = f"no status callback after {call.status!r}"
+                call.set_status("unknown")
+                self._finish(call)
+
+    # -- campaigns -------------------------------------------------------------
+
+    def submit(self, numbers: list[str]) -> Campaign:
+        """Queue a bulk campaign; invalid numbers are rejected up front."""
+        campaign = Campaign([OutboundCall(str(n).strip()) for n in numbers])
+        for call in campaign.calls:
+            if E164.match(call.to):
+                call.set_status("pending")
+                self._queue.append(call)
+            else:
+                call.error = "not an E.164 number"
+                call.set_status("rejected")
+        self._campaigns[campaign.id] = campaign
+        self._trim_campaigns()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        self._changed.set()
+        return campaign
+
+    def campaign(self, campaign_id: str) -> Campaign | None:
+        return self._campaigns.get(campaign_id)
+
+    def _trim_campaigns(self) -> None:
+        # Forget the oldest finished campaigns beyond max_campaigns
+        for campaign_id in list(self._campaigns):
+            if len(self._campaigns) <= self.max_campaigns:
+                break
+            if self._campaigns[campaign_id].finished:
+                del self._campaigns[campaign_id]
+
+    async def _dispatch(self) -> None:
+        while self._queue:
+            while not self.has_slot():
+                self._changed.clear()
+                try:
+                    # woken by status callbacks; admission changes are polled
+                    await asyncio.wait_for(self._changed.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+            await self.limiter.acquire()
+            call = self._queue.popleft()
+            self._active[id(call)] = call  # counts against the cap while creating
+            task = asyncio.create_task(self._place(call))
+            self._placing.add(task)
+            task.add_done_callback(self._placing.discard)
+
+    # -- status callbacks ------------------------------------------------------
+
+    def on_status(self, form: dict) -> OutboundCall | None:
+        """Apply a Twilio status callback (CallSid, CallStatus) to a tracked call."""
+        sid = form.get("CallSid", "")
+        call = self._by_sid.get(sid)
+        status = form.get("CallStatus")
+        if not status:
+            return None
+        if call is None:
+            if sid.startswith("CA"):  # possibly ours, create_async not back yet
+                self._unmatched[sid] = status
+                while len(self._unmatched) > 1000:
+                    self._unmatched.popitem(last=False)
+            return None
+        call.set_status(status)
+        if call.finished:
+            self._finish(call)
+        else:
+            self._changed.set()
+        return call
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self._queue),
+            "active": len(self._active),
+            "ringing": self._ringing(),
+            "placed": self.placed,
+            "failed": self.failed,
+            "expired": self.expired,
+            "campaigns": len(self._campaigns),
+        }
+
+    async def aclose(self) -> None:
+        if self._dispatcher:
+            self._dispatcher.cancel()
+        if self._http is not None:
+            await self._http.close()
@@ -0,0 +1,125 @@
+"""
+Recording downloads with HTTP Range support.
+
+Stored files are served as they are (FileResponse answers Range requests
+itself). μ-law recordings can also be fetched as 16-bit PCM WAV with
+?format=pcm16 for players without μ-law support: the PCM file is never
+written, each requested byte range is mapped back onto the μ-law samples
+(one byte per sample becomes two) and decoded while streaming, so seeking
+in a long call only reads the part being played.
+"""
+
+import asyncio
+import os
+import struct
+
+from starlette.responses import FileResponse, Response, StreamingResponse
+
+from server.recording import WavInfo, read_wav_info
+
+PCM_HEADER_SIZE = 44
+CHUNK_SAMPLES = 64 * 1024
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """
+    First range of a `Range: bytes=...` header as inclusive (start, end), or
+    None to send the whole body (no header, another unit, malformed).
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+    spec = header[len("bytes="):].split(",")[0].strip()
+    first, sep, last = spec.partition("-")
+    if not sep:
+        return None
+    try:
+        if not first:  # suffix: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise RangeNotSatisfiable
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        raise RangeNotSatisfiable
+    return start, min(end, size - 1)
+
+
+def pcm_wav_header(sample_rate: int, data_size: int) -> bytes:
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b"data", data_size,
+    )
+
+
+def _read(path: str, offset: int, size: int) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(size)
+
+
+# Bytes [start, end] of the PCM16 WAV equivalent of a μ-law recording.
+# info.data_size is already bounded by the bytes on disk (read_wav_info).
+async def _transcoded_body(path: str, info: WavInfo, start: int, end: int):
+    from langchain_openai_voice.codec import ulaw_decode  # numpy, loaded on first use
+
+    header = pcm_wav_header(info.sample_rate, 2 * info.data_size)
+    if start < PCM_HEADER_SIZE:
+        yield header[start : end + 1]
+        start = PCM_HEADER_SIZE
+    # PCM data byte b is half of μ-law sample (b - 44) // 2
+    while start <= end:
+        first = (start - PCM_HEADER_SIZE) // 2
+        last = min((end - PCM_HEADER_SIZE) // 2, first + CHUNK_SAMPLES - 1)
+        ulaw = await asyncio.to_thread(_read, path, info.data_offset + first, last - first + 1)
+        if not ulaw:
+            # the file shrank since its header was read (e.g. swept): pad with
+            # silence so the body still matches the Content-Length sent
+            yield bytes(end - start + 1)
+            return
+        pcm = ulaw_decode(ulaw).tobytes()
+        skip = (start - PCM_HEADER_SIZE) % 2
+        yield pcm[skip : skip + end - start + 1]
+        start = PCM_HEADER_SIZE + 2 * (first + len(ulaw))
+
+
+# Response for a stored recording, honouring Range and ?format=pcm16.
+async def recording_response(request, path: str) -> Response:
+    filename = os.path.basename(path)
+    try:
+        info = await asyncio.to_thread(read_wav_info, path)
+    except (ValueError, struct.error) as e:
+        print(f"⚠️ Unreadable recording {filename}:", e)
+        info = None
+
+    if info is None or not info.is_ulaw or request.query_params.get("format") != "pcm16":
+        return FileResponse(path, media_type="audio/wav", filename=filename, content_disposition_type="inline")
+
+    size = PCM_HEADER_SIZE + 2 * info.data_size
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'inline; filename="{filename}"',
+    }
+    try:
+        byte_range = parse_range(request.headers.get("range"), size)
+    except RangeNotSatisfiable:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+
+    start, end = byte_range or (0, size - 1)
+    headers["Content-Length"] = str(end - start + 1)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return StreamingResponse(
+        _transcoded_body(path, info, start, end),
+        status_code=206 if byte_range else 200,
+        media_type="audio/wav",
+        headers=headers,
+    )
@@ -0,0 +1,198 @@
+"""
+Finding what blocks the event loop.
+
+Every call on a worker shares one asyncio loop, so a handler that blocks it
+stalls audio for all of them. metrics.watch_loop_lag measures how late the
+loop is; this module tells which code made it late.
+
+LoopWatchdog: a daemon thread checks that the lag sampler woke on time. When
+it is more than `threshold` late, the loop thread's stack is captured right
+then, while the blocking code is still on it. When the loop comes back, the
+stall is attributed to that stack's innermost frame in our own code. The
+worst sites are kept with their count, total and max stall, and a sample
+stack.
+
+SamplingProfiler: on demand, a thread samples the loop thread's stack every
+few milliseconds and counts collapsed stacks ("file:function;..."). Their
+text form feeds flamegraph.pl or speedscope. Samples where the loop sits in
+select() are counted as idle.
+
+Both only read sys._current_frames() from their own thread; the loop itself
+pays nothing beyond the lag sampler it already runs.
+"""
+
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+_SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_IDLE_FUNCTIONS = {"select", "poll"}
+
+
+def _own_code(filename: str) -> bool:
+    return filename.startswith(_SRC) and "site-packages" not in filename
+
+
+def _site(stack: traceback.StackSummary) -> str:
+    # innermost frame in this repo's code (else the innermost frame overall)
+    for frame in reversed(stack):
+        if _own_code(frame.filename):
+            return f"{os.path.relpath(frame.filename, _SRC)}:{frame.lineno} {frame.name}"
+    frame = stack[-1]
+    return f"{frame.filename}:{frame.lineno} {frame.name}"
+
+
+class LoopWatchdog:
+    def __init__(self, threshold: float = 0.1, *, keep_sites: int = 50, keep_stalls: int = 100):
+        self.threshold = threshold
+        self.keep_sites = keep_sites
+        self.stalls: deque[dict] = deque(maxlen=keep_stalls)
+        self._sites: dict[str, dict] = {}
+        self._loop_thread: int | None = None
+        self._deadline = 0.0  # when the lag sampler is due to wake (perf_counter)
+        self._captured: traceback.StackSummary | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """Start watching the loop of the calling thread."""
+        if self._thread is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread = None
+
+    # Called by the lag sampler on the loop: before sleeping, and on waking.
+    def expect(self, deadline: float) -> None:
+        self._deadline = deadline
+
+    def woke(self, lag: float) -> None:
+        self._deadline = 0.0
+        stack, self._captured = self._captured, None
+        if stack is None or lag < self.threshold:
+            return
+        site = _site(stack)
+        entry = self._sites.get(site)
+        if entry is None:
+            if len(self._sites) >= self.keep_sites:
+                # forget the least significant site
+                del self._sites[min(self._sites, key=lambda s: self._sites[s]["total_ms"])]
+            entry = self._sites[site] = {"site": site, "count": 0, "total_ms": 0.0, "max_ms": 0.0}
+        ms = 1000 * lag
+        entry["count"] += 1
+        entry["total_ms"] += ms
+        if ms >= entry["max_ms"]:
+            entry["max_ms"] = ms
+            entry["stack"] = stack.format()[-12:]
+        self.stalls.append({"at": time.time(), "ms": ms, "site": site})
+
+    def _watch(self) -> None:
+        interval = self.threshold / 4
+        while not self._stop.wait(interval):
+            deadline = self._deadline
+            if self._captured is None and deadline and time.perf_counter() - deadline > self.threshold:
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is not None:
+                    self._captured = traceback.extract_stack(frame)
+
+    def offenders(self, top: int = 10) -> list[dict]:
+        return sorted(self._sites.values(), key=lambda e: e["total_ms"], reverse=True)[:top]
+
+
+class SamplingProfiler:
+    def __init__(self, *, max_stacks: int = 5000):
+        self.max_stacks = max_stacks
+        self.stacks: dict[str, int] = {}
+        self.samples = 0
+        self.idle = 0
+        self.interval = 0.0
+        self.started_at = 0.0
+        self.stopped_at = 0.0
+        self._loop_thread: int | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, interval: float = 0.005, max_seconds: float = 60.0) -> None:
+        """Profile the calling thread (the loop) for up to `max_seconds`."""
+        if self._thread is not None:
+            return
+        self.stacks = {}
+        self.samples = self.idle = 0
+        self.interval = interval
+        self.started_at = time.time()
+        self.stopped_at = 0.0
+        self._loop_thread = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._sample, args=(interval, max_seconds), name="loop-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        thread = self._thread  # _sample clears it when max_seconds runs out
+        if thread is not None:
+            thread.join()
+
+    def _sample(self, interval: float, max_seconds: float) -> None:
+        end = time.monotonic() + max_seconds
+        try:
+            while not self._stop.wait(interval) and time.monotonic() < end:
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is None:
+                    break
+                self.samples += 1
+                if frame.f_code.co_name in _IDLE_FUNCTIONS:
+                    self.idle += 1
+                    continue
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                key = ";".join(reversed(names))
+                if key in self.stacks or len(self.stacks) < self.max_stacks:
+                    self.stacks[key] = self.stacks.get(key, 0) + 1
+        finally:
+            self.stopped_at = time.time()
+            self._thread = None
+
+    def collapsed(self) -> str:
+        """Folded stacks, one "frame;frame;... count" per line."""
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items(), key=lambda kv: -kv[1]))
+
+    def summary(self, top: int = 20) -> dict:
+        busy = self.samples - self.idle
+        # self time per innermost frame
+        leaves: dict[str, int] = {}
+        for stack, count in self.stacks.items():
+            leaf = stack.rsplit(";", 1)[-1]
+            leaves[leaf] = leaves.get(leaf, 0) + count
+        return {
+            "running": self.running,
+            "started_at": self.started_at,
+            "stopped_at": self.stopped_at or None,
+            "interval_ms": 1000 * self.interval,
+            "samples": self.samples,
+            "busy_fraction": busy / self.samples if self.samples else 0.0,
+            "top_functions": [
+                {"function": leaf, "samples": n, "busy_share": n / busy if busy else 0.0}
+                for leaf, n in sorted(leaves.items(), key=lambda kv: -kv[1])[:top]
+            ],
+            "top_stacks": [
+                {"stack": stack, "samples": n}
+                for stack, n in sorted(self.stacks.items(), key=lambda kv: -kv[1])[:top]
+            ],
+        }
@@ -1,22 +1,33 @@
+import argparse
 import os
-from twilio.rest import Client
+import time
+
+import requests
 from dotenv import load_dotenv
 
-load_dotenv()  # Load TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, etc.
+load_dotenv()  # Load PUBLIC_URL, DIALER_API_TOKEN, MY_PHONE_NUMBER, etc.
+
+# Calls are placed by the running server's dialer (POST /campaigns), which
+# keeps to the account's call rate and the server's capacity.
+parser = argparse.ArgumentParser(description="Ask the voice server to call one or more numbers.")
+parser.add_argument("numbers", nargs="*", help="E.164 numbers (default: MY_PHONE_NUMBER)")
+parser.add_argument("--server", default=os.getenv("PUBLIC_URL", "https://ai-voice-assistant-with-phone-call.onrender.com"))
+parser.add_argument("--wait", action="store_true", help="poll until every call has finished")
+args = parser.parse_args()
 
-# Your Twilio credentials from .env
-account_sid = os.getenv("TWILIO_ACCOUNT_SID")
-auth_token = os.getenv("TWILIO_AUTH_TOKEN")
-twilio_number = os.getenv("TWILIO_PHONE_NUMBER")  # e.g. +19566920691
-my_number = os.getenv("MY_PHONE_NUMBER")  
+numbers = args.numbers or [os.getenv("MY_PHONE_NUMBER")]
+headers = {"Authorization": f"Bearer {os.getenv('DIALER_API_TOKEN', '')}"}
 
-client = Client(account_sid, auth_token)
+resp = requests.post(f"{args.server}/campaigns", json={"numbers": numbers}, headers=headers, timeout=15)
+resp.raise_for_status()
+campaign = resp.json()
+print(f"✅ Campaign {campaign['id']} queued: {campaign['total']} number(s)")
 
-call = client.calls.create(
-    to=my_number,
-    from_=twilio_number,
-    # Twilio will request TwiML from your deployed server:
-    url="https://ai-voice-assistant-with-phone-call.onrender.com/twilio/voice"
-)
+while args.wait and not campaign["finished"]:
+    time.sleep(2)
+    campaign = requests.get(f"{args.server}/campaigns/{campaign['id']}", headers=headers, timeout=15).json()
+    print("   ↳", campaign["statuses"])
 
-print(f"✅ Call initiated. SID: {call.sid}")
+if args.wait:
+    for call in campaign.get("calls", []):
+        print(f"📞 {call['to']}: {call['status']} (SID: {call['sid']})")
@@ -0,0 +1,238 @@
+"""
+Minimal Prometheus metrics for the voice server.
+
+Histograms keep per-label-set bucket counts in plain lists, so recording a
+value is a bisect and two additions on the event loop. render() produces the
+Prometheus text exposition format served by the /metrics route. Collectors
+registered with register_collector() are sampled at scrape time for gauges
+and running totals that already live elsewhere (session pool, tool cache, recordings).
+"""
+
+import asyncio
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable
+
+# Seconds; tuned for voice latencies (tens of ms to a few seconds)
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+# Event-loop scheduling delay; a 20 ms media frame must not wait much longer than that
+LOOP_LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def escape_label_value(value) -> str:
+    """A label value with backslash, double quote and newline escaped, as the exposition format requires."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(**labels) -> str:
+    """'{name="value",...}' with escaped values, for collector sample names."""
+    return _format_labels(tuple(labels), tuple(labels.values()))
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{escape_label_value(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # label values -> [bucket counts..., +Inf count], sum
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = series
+        counts[bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {total[0]}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+_metrics: list = []
+_collectors: list[Callable[[], dict[str, float]]] = []
+
+
+def histogram(name: str, help: str, labelnames: Iterable[str] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+    metric = Histogram(name, help, labelnames, buckets)
+    _metrics.append(metric)
+    return metric
+
+
+def counter(name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+    metric = Counter(name, help, labelnames)
+    _metrics.append(metric)
+    return metric
+
+
+# `collect` returns {metric_name: value}; each is exposed as a gauge, or as a
+# counter when the name ends in _total (a running total, for rate()). Names may
+# carry labels built with format_labels(), e.g. 'voice_downlink_buffer_ms{stream_sid="MZ..."}'.
+def register_collector(collect: Callable[[], dict[str, float]]) -> None:
+    _collectors.append(collect)
+
+
+def render() -> str:
+    lines: list[str] = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    for collect in _collectors:
+        try:
+            samples = collect()
+        except Exception as e:
+            print("⚠️ Metrics collector error:", e)
+            continue
+        typed = set()
+        for name, value in samples.items():
+            base = name.partition("{")[0]
+            if base not in typed:
+                typed.add(base)
+                kind = "counter" if base.endswith("_total") else "gauge"
+                lines.append(f"# TYPE {base} {kind}")
+            lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+# Voice pipeline metrics
+
+TURN_LATENCY = histogram(
+    "voice_turn_latency_seconds",
+    "Per-turn latency from end of user speech to each stage (transcript, first_audio, response), and barge-in reaction time.",
+    ("stage", "transport", "provider"),
+)
+TOOL_LATENCY = histogram(
+    "voice_tool_call_seconds",
+    "Time from a model function call to its output being sent back.",
+    ("tool", "transport"),
+)
+STAGE_LATENCY = histogram(
+    "voice_provider_stage_seconds",
+    "Latency of individual ASR/LLM/TTS provider calls.",
+    ("stage", "provider", "transport"),
+)
+REALTIME_RECONNECT = histogram(
+    "voice_realtime_reconnect_seconds",
+    "Time from losing the Realtime connection to having it reopened with the conversation replayed.",
+    ("transport",),
+)
+DOWNLINK_UNDERRUNS = counter(
+    "voice_downlink_underruns_total",
+    "Paced outbound audio ran dry while a response was still streaming.",
+    ("transport",),
+)
+VAD_FRAMES = counter(
+    "voice_vad_frames_total",
+    "Caller audio frames seen by the speech gate, by result (forwarded/suppressed).",
+    ("transport", "result"),
+)
+VAD_BYTES = counter(
+    "voice_vad_bytes_total",
+    "Caller PCM16 bytes seen by the speech gate, by result (forwarded/suppressed).",
+    ("transport", "result"),
+)
+LOOP_LAG = histogram(
+    "voice_event_loop_lag_seconds",
+    "How late a periodic timer callback runs on the worker's event loop.",
+    buckets=LOOP_LAG_BUCKETS,
+)
+
+_loop_lag = {"last": 0.0, "max": 0.0, "avg": 0.0}
+
+
+# Sample event-loop lag every `interval` seconds until cancelled. A watchdog
+# (loopmon.LoopWatchdog) is told when each sample is due and how late it was.
+async def watch_loop_lag(interval: float = 0.05, watchdog=None) -> None:
+    while True:
+        start = time.perf_counter()
+        if watchdog is not None:
+            watchdog.expect(start + interval)
+        await asyncio.sleep(interval)
+        lag = max(0.0, time.perf_counter() - start - interval)
+        if watchdog is not None:
+            watchdog.woke(lag)
+        LOOP_LAG.observe(lag)
+        _loop_lag["last"] = lag
+        _loop_lag["max"] = max(_loop_lag["max"], lag)
+        _loop_lag["avg"] += 0.2 * (lag - _loop_lag["avg"])
+
+
+def loop_lag(smoothed: bool = False) -> float:
+    """
+    Event-loop lag in seconds: the most recent sample, or with smoothed=True
+    an exponential average over roughly the last quarter second.
+    """
+    return _loop_lag["avg"] if smoothed else _loop_lag["last"]
+
+
+def loop_lag_max() -> float:
+    return _loop_lag["max"]
+
+
+def _collect_process() -> dict[str, float]:
+    return {
+        "process_cpu_seconds_total": time.process_time(),
+        "voice_event_loop_lag_last_seconds": _loop_lag["last"],
+        "voice_event_loop_lag_max_seconds": _loop_lag["max"],
+    }
+
+
+register_collector(_collect_process)
+
+
+# Observer for langchain_openai_voice.timeline.TurnTimeline, bound to a call's labels.
+def turn_observer(transport: str, provider: str = "openai-realtime"):
+    stages = {
+        "turn_transcript": "transcript",
+        "turn_first_audio": "first_audio",
+        "turn_response": "response",
+        "barge_in": "barge_in",
+    }
+
+    def observe(metric: str, seconds: float, labels: dict) -> None:
+        if metric == "tool_call":
+            TOOL_LATENCY.observe(seconds, tool=labels.get("tool", ""), transport=transport)
+        elif metric == "reconnect":
+            REALTIME_RECONNECT.observe(seconds, transport=transport)
+        else:
+            TURN_LATENCY.observe(
+                seconds, stage=stages.get(metric, metric), transport=transport, provider=provider
+            )
+
+    return observe
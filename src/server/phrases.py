@@ -0,0 +1,79 @@
+"""
+Fixed phrases (greeting, menu, apologies) with pre-rendered audio.
+
+With PHRASE_AUDIO=1 every phrase is synthesized once at startup through the
+PHRASE_TTS_PROVIDER (default: TTS_PROVIDER) and kept in a PhraseCache, so it
+plays with no synthesis latency:
+
+- TwiML answers <Play> /phrases/<name>.wav instead of <Say>;
+- media streams and the browser get the frames directly.
+
+Without it (or while a phrase is not rendered) TwiML falls back to <Say>.
+PHRASE_CACHE_DIR persists rendered audio across restarts.
+"""
+
+import io
+import os
+import time
+import wave
+
+from langchain_openai_voice.phrases import PhraseAudio, PhraseCache
+from langchain_openai_voice.utils import get_tts_provider
+
+PHRASES = {
+    "greeting": "You are now connected to the AI Voice Agent.",
+    "menu": "Press 1 to continue talking, or 2 to hang up.",
+    "fallback": "Sorry, our agent is unavailable. Please try again later.",
+    "error": "Sorry, something went wrong on our side. Please call again in a moment.",
+}
+
+PHRASE_AUDIO = os.getenv("PHRASE_AUDIO", "0") == "1"
+PHRASE_TTS_PROVIDER = os.getenv("PHRASE_TTS_PROVIDER", os.getenv("TTS_PROVIDER", "openai"))
+PHRASE_CACHE = PhraseCache(
+    max_entries=int(os.getenv("PHRASE_CACHE_MAX_ENTRIES", "256")),
+    max_bytes=int(os.getenv("PHRASE_CACHE_MAX_MB", "32")) * 1024 * 1024,
+    cache_dir=os.getenv("PHRASE_CACHE_DIR") or None,
+)
+
+
+# Rendered audio for a named phrase, or None (disabled / not rendered yet).
+def cached_phrase(name: str, format: str = "ulaw_8000") -> PhraseAudio | None:
+    if not PHRASE_AUDIO or name not in PHRASES:
+        return None
+    return PHRASE_CACHE.lookup(get_tts_provider(PHRASE_TTS_PROVIDER), PHRASES[name], format)
+
+
+# Render all phrases in every format (called from the app lifespan).
+async def prerender_phrases() -> None:
+    if not PHRASE_AUDIO:
+        return
+    start = time.perf_counter()
+    try:
+        await PHRASE_CACHE.prerender(get_tts_provider(PHRASE_TTS_PROVIDER), PHRASES.values())
+        print(f"🗣️ Phrases ready in {time.perf_counter() - start:.2f}s:", PHRASE_CACHE.stats())
+    except Exception as e:
+        print("⚠️ Phrase pre-render failed, using <Say>:", e)
+
+
+# Add a phrase to TwiML: cached audio via <Play>, Twilio's <Say> otherwise.
+def say_phrase(resp, name: str, base_url: str) -> None:
+    if cached_phrase(name) is not None:
+        resp.play(f"{base_url}/phrases/{name}.wav")
+    else:
+        resp.say(PHRASES[name], voice="alice", language="en-US")
+
+
+# 8 kHz PCM16 WAV of a cached phrase, for Twilio <Play>.
+def phrase_wav(name: str) -> bytes | None:
+    phrase = cached_phrase(name)
+    if phrase is None:
+        return None
+    from langchain_openai_voice.codec import ulaw_decode
+
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(8000)
+        wf.writeframes(ulaw_decode(phrase.data).tobytes())
+    return buf.getvalue()
@@ -0,0 +1,472 @@
+"""
+Call recording off the event loop.
+
+Every media frame used to hit `wave.writeframes` on the asyncio loop, and that
+call also seeks back to patch the WAV header each time. Here the loop only
+appends the frame to a bounded per-call queue; one shared writer thread drains
+all queues in batches, writes them with `writeframesraw`, and patches the WAV
+header every `header_interval` seconds so a crash still leaves a playable file.
+
+When the disk falls behind a call's queue fills up and its backpressure policy
+decides what happens to new frames:
+    drop   discard the frame and count it
+    block  awrite() waits (asynchronously) until the writer has drained space;
+           for a Twilio call this stalls its receive loop, so caller audio
+           stops reaching the model until the disk catches up
+    spill  move overflow into a secondary buffer of up to `spill_bytes`,
+           drained after the queue; beyond that frames are dropped
+
+Recordings are stored as 16-bit PCM WAV by default. RECORDING_FORMAT=ulaw
+keeps Twilio's μ-law bytes as they arrived, in a WAV with format tag 7: half
+the size, and no decoding in the writer thread. Not every player handles
+μ-law WAV; the download endpoint can transcode it to PCM on the fly.
+"""
+
+import asyncio
+import os
+import struct
+import threading
+import time
+import wave
+from collections import deque
+
+BACKPRESSURE_POLICIES = ("drop", "block", "spill")
+RECORDING_FORMATS = ("pcm16", "ulaw")
+
+DEFAULT_QUEUE_BYTES = int(os.getenv("RECORDING_QUEUE_BYTES", 256 * 1024))
+DEFAULT_SPILL_BYTES = int(os.getenv("RECORDING_SPILL_BYTES", 4 * 1024 * 1024))
+DEFAULT_POLICY = os.getenv("RECORDING_BACKPRESSURE", "drop")
+DEFAULT_FORMAT = os.getenv("RECORDING_FORMAT", "pcm16")
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_MULAW = 7
+
+
+class MuLawWaveWriter:
+    """
+    Mono μ-law WAV (format tag 7) with the subset of the wave.Wave_write API
+    the writer thread uses. The stdlib wave module only writes PCM.
+
+    Layout: RIFF header, 18-byte fmt chunk, fact chunk (sample count, required
+    for non-PCM formats), data chunk; 58 bytes before the first sample.
+    """
+
+    HEADER_SIZE = 58
+
+    def __init__(self, path: str, sample_rate: int):
+        self._file = open(path, "wb")
+        self.sample_rate = sample_rate
+        self.nframes = 0
+        self._file.write(self._header())
+
+    def _header(self) -> bytes:
+        n = self.nframes
+        return b"".join((
+            struct.pack("<4sI4s", b"RIFF", self.HEADER_SIZE - 8 + n + (n & 1), b"WAVE"),
+            struct.pack("<4sIHHIIHHH", b"fmt ", 18, WAVE_FORMAT_MULAW, 1,
+                        self.sample_rate, self.sample_rate, 1, 8, 0),
+            struct.pack("<4sII", b"fact", 4, n),
+            struct.pack("<4sI", b"data", n),
+        ))
+
+    def writeframesraw(self, data) -> None:
+        self._file.write(data)
+        self.nframes += memoryview(data).nbytes
+
+    def writeframes(self, data) -> None:
+        """Append `data` and patch the header (b"" only patches the header)."""
+        if data:
+            self.writeframesraw(data)
+        self._file.seek(0)
+        self._file.write(self._header())
+        self._file.seek(0, os.SEEK_END)
+        self._file.flush()
+
+    def close(self) -> None:
+        if self.nframes & 1:
+            self._file.write(b"\x00")  # RIFF chunks are word aligned
+        self.writeframes(b"")
+        self._file.close()
+
+
+class WavInfo:
+    """Where the samples of a WAV file are, as read from its header."""
+
+    def __init__(self, format_tag: int, channels: int, sample_rate: int, bits: int, data_offset: int, data_size: int):
+        self.format_tag = format_tag
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.bits = bits
+        self.data_offset = data_offset
+        self.data_size = data_size
+
+    @property
+    def is_ulaw(self) -> bool:
+        return self.format_tag == WAVE_FORMAT_MULAW
+
+
+def read_wav_info(path: str) -> WavInfo:
+    """
+    Parse the chunk headers of a WAV file. The data size is bounded by the
+    file size; a recording still being written reports the samples up to its
+    last header fixup. A file too short to hold its headers (e.g. a call
+    that ended before any audio) raises ValueError.
+    """
+    def read(f, n: int) -> bytes:
+        data = f.read(n)
+        if len(data) < n:
+            raise ValueError(f"truncated WAV header in {path}")
+        return data
+
+    with open(path, "rb") as f:
+        riff, _, wave_id = struct.unpack("<4sI4s", read(f, 12))
+        if riff != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError(f"not a WAV file: {path}")
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"no data chunk in {path}")
+            chunk_id, size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                fmt = struct.unpack("<HHIIHH", read(f, 16))
+                f.seek(size - 16 + (size & 1), os.SEEK_CUR)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    raise ValueError(f"data before fmt chunk in {path}")
+                offset = f.tell()
+                available = os.fstat(f.fileno()).st_size - offset
+                size = available if size in (0, 0xFFFFFFFF) else min(size, available)
+                format_tag, channels, rate, _, _, bits = fmt
+                return WavInfo(format_tag, channels, rate, bits, offset, size)
+            else:
+                f.seek(size + (size & 1), os.SEEK_CUR)
+
+
+class CallRecording:
+    """
+    One call's recording. Created by RecordingWriter.open(); write() / awrite()
+    from the event loop, close() when the call ends.
+
+    source="ulaw" takes raw Twilio μ-law payloads, source="pcm16" PCM16 bytes.
+    format is what goes to disk ("pcm16" or "ulaw"); the writer thread
+    converts between the two when they differ.
+    """
+
+    def __init__(
+        self,
+        writer: "RecordingWriter",
+        path: str,
+        *,
+        sample_rate: int,
+        source: str,
+        format: str,
+        policy: str,
+        max_queue_bytes: int,
+        spill_bytes: int,
+    ):
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"policy must be one of {BACKPRESSURE_POLICIES}, got {policy!r}")
+        if source not in ("ulaw", "pcm16"):
+            raise ValueError(f"source must be 'ulaw' or 'pcm16', got {source!r}")
+        if format not in RECORDING_FORMATS:
+            raise ValueError(f"format must be one of {RECORDING_FORMATS}, got {format!r}")
+        self.path = path
+        self.sample_rate = sample_rate
+        self.source = source
+        self.format = format
+        self.policy = policy
+        self.max_queue_bytes = max_queue_bytes
+        self.spill_bytes = spill_bytes
+
+        self._writer = writer
+        self._queue: deque[bytes] = deque()
+        self._spill: deque[bytes] = deque()
+        self._queued = 0
+        self._spilled = 0
+        self._closing = False
+        self._space: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.finished = threading.Event()
+
+        # writer-thread side
+        self._wav: wave.Wave_write | MuLawWaveWriter | None = None
+        self._last_header = 0.0
+
+        # counters
+        self.frames_in = 0
+        self.bytes_in = 0
+        self.frames_dropped = 0
+        self.bytes_dropped = 0
+        self.bytes_written = 0
+        self.batches = 0
+        self.header_fixups = 0
+        self.max_queue_depth = 0
+        self.write_seconds_total = 0.0
+        self.write_seconds_max = 0.0
+
+    # -- event loop side --------------------------------------------------
+
+    def write(self, data) -> bool:
+        """Queue one frame without blocking. Returns False if it was dropped."""
+        if self._closing:
+            return False
+        chunk = data if isinstance(data, bytes) else bytes(data)
+        n = len(chunk)
+        self.frames_in += 1
+        self.bytes_in += n
+
+        with self._writer._cond:
+            if self._queued + n <= self.max_queue_bytes and not self._spill:
+                self._queue.append(chunk)
+                self._queued += n
+            elif self.policy == "spill" and self._spilled + n <= self.spill_bytes:
+                self._spill.append(chunk)
+                self._spilled += n
+            else:
+                self.frames_dropped += 1
+                self.bytes_dropped += n
+                return False
+            self.max_queue_depth = max(self.max_queue_depth, self._queued + self._spilled)
+            self._writer._mark_dirty(self)
+        return True
+
+    async def awrite(self, data) -> bool:
+        """Queue one frame; under the block policy wait for space instead of dropping."""
+        if self.policy != "block":
+            return self.write(data)
+        n = len(data)
+        while not self._closing and self._queued + n > self.max_queue_bytes:
+            if self._space is None:
+                self._loop = asyncio.get_running_loop()
+                self._space = asyncio.Event()
+            self._space.clear()
+            await self._space.wait()
+        return self.write(data)
+
+    def close(self) -> None:
+        """Flush what is queued, finalize the header and close the file (in the writer thread)."""
+        if self.finished.is_set():
+            return  # already closed, or given up after a write error
+        with self._writer._cond:
+            self._closing = True
+            self._writer._mark_dirty(self)
+
+    async def aclose(self) -> None:
+        self.close()
+        await asyncio.to_thread(self.finished.wait)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queued + self._spilled
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "format": self.format,
+            "policy": self.policy,
+            "frames_in": self.frames_in,
+            "bytes_in": self.bytes_in,
+            "frames_dropped": self.frames_dropped,
+            "bytes_dropped": self.bytes_dropped,
+            "bytes_written": self.bytes_written,
+            "batches": self.batches,
+            "header_fixups": self.header_fixups,
+            "queue_depth_bytes": self.queue_depth,
+            "max_queue_depth_bytes": self.max_queue_depth,
+            "write_latency_avg_ms": 1000 * self.write_seconds_total / self.batches if self.batches else 0.0,
+            "write_latency_max_ms": 1000 * self.write_seconds_max,
+        }
+
+    # -- writer thread side -----------------------------------------------
+
+    def _take(self) -> tuple[list[bytes], bool]:
+        # called with the writer lock held
+        chunks = list(self._queue)
+        self._queue.clear()
+        self._queued = 0
+        if self._spill:
+            chunks.extend(self._spill)
+            self._spill.clear()
+            self._spilled = 0
+        if self._space is not None and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._space.set)
+        return chunks, self._closing
+
+    def _drain(self, chunks: list[bytes], closing: bool, header_interval: float) -> None:
+        if self._wav is None:
+            if self.format == "ulaw":
+                self._wav = MuLawWaveWriter(self.path, self.sample_rate)
+            else:
+                self._wav = wave.open(self.path, "wb")
+                self._wav.setnchannels(1)
+                self._wav.setsampwidth(2)
+                self._wav.setframerate(self.sample_rate)
+            self._last_header = time.monotonic()
+
+        if chunks:
+            data = b"".join(chunks)
+            if self.source != self.format:
+                from langchain_openai_voice.codec import ulaw_decode, ulaw_encode  # numpy
+
+                data = ulaw_decode(data) if self.source == "ulaw" else ulaw_encode(data)
+            start = time.perf_counter()
+            self._wav.writeframesraw(data)
+            elapsed = time.perf_counter() - start
+            self.bytes_written += memoryview(data).nbytes
+            self.batches += 1
+            self.write_seconds_total += elapsed
+            self.write_seconds_max = max(self.write_seconds_max, elapsed)
+
+        now = time.monotonic()
+        if closing:
+            self._wav.close()  # patches the header one last time
+            self._wav = None
+            self.finished.set()
+        elif now - self._last_header >= header_interval:
+            self._wav.writeframes(b"")  # header fixup only
+            self._last_header = now
+            self.header_fixups += 1
+
+
+class RecordingWriter:
+    """
+    A single background thread that writes every call's recording.
+
+    The thread wakes when a call has queued data, or every `flush_interval`
+    seconds at most, and writes each dirty call's queue as one batch.
+    """
+
+    def __init__(self, *, flush_interval: float = 0.25, header_interval: float = 1.0):
+        self.flush_interval = flush_interval
+        self.header_interval = header_interval
+        self._cond = threading.Condition()
+        self._dirty: dict[CallRecording, None] = {}
+        self._active: set[CallRecording] = set()
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+
+    def open(
+        self,
+        path: str,
+        *,
+        sample_rate: int = 8000,
+        source: str = "ulaw",
+        format: str = DEFAULT_FORMAT,
+        policy: str = DEFAULT_POLICY,
+        max_queue_bytes: int = DEFAULT_QUEUE_BYTES,
+        spill_bytes: int = DEFAULT_SPILL_BYTES,
+    ) -> CallRecording:
+        self._ensure_started()
+        recording = CallRecording(
+            self,
+            path,
+            sample_rate=sample_rate,
+            source=source,
+            format=format,
+            policy=policy,
+            max_queue_bytes=max_queue_bytes,
+            spill_bytes=spill_bytes,
+        )
+        with self._cond:
+            self._active.add(recording)
+            self._mark_dirty(recording)  # creates the file promptly
+        return recording
+
+    def _mark_dirty(self, recording: CallRecording) -> None:
+        # called with the lock held; wake the thread only on a clean -> dirty edge
+        if recording not in self._dirty:
+            self._dirty[recording] = None
+            self._cond.notify()
+
+    def _ensure_started(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(
+                target=self._run, name="recording-writer", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._dirty and not self._stopping:
+                    # sleep until data arrives; wake periodically for header fixups
+                    self._cond.wait(self.flush_interval)
+                work = [(rec, *rec._take()) for rec in self._dirty]
+                self._dirty.clear()
+                idle = self._active.difference(rec for rec, _, _ in work)
+                stopping = self._stopping
+
+            for rec, chunks, closing in work:
+                try:
+                    rec._drain(chunks, closing, self.header_interval)
+                except Exception as e:
+                    self._fail(rec, e)
+                    continue
+                if closing:
+                    with self._cond:
+                        self._active.discard(rec)
+            for rec in idle:
+                if rec._wav is not None:
+                    try:
+                        rec._drain([], False, self.header_interval)
+                    except Exception as e:
+                        self._fail(rec, e)
+
+            if stopping:
+                with self._cond:
+                    if not self._dirty:
+                        return
+            else:
+                # let a burst of frames accumulate into the next batch
+                time.sleep(self.flush_interval)
+
+    def _fail(self, rec: CallRecording, error: Exception) -> None:
+        # give up on the recording: release the file and drop its later frames
+        print(f"⚠️ Recording write error ({rec.path}):", error)
+        if rec._wav is not None:
+            try:
+                rec._wav.close()
+            except Exception:
+                pass
+            rec._wav = None
+        with self._cond:
+            rec._closing = True
+            self._active.discard(rec)
+            self._dirty.pop(rec, None)
+        if rec._space is not None and rec._loop is not None:
+            rec._loop.call_soon_threadsafe(rec._space.set)  # release awrite() waiters
+        rec.finished.set()
+
+    def stop(self) -> None:
+        """Finish all open recordings and stop the thread."""
+        with self._cond:
+            for rec in self._active:
+                rec._closing = True
+                self._mark_dirty(rec)
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+    def stats(self) -> dict:
+        with self._cond:
+            active = list(self._active)
+        return {
+            "active_recordings": len(active),
+            "queue_depth_bytes": sum(r.queue_depth for r in active),
+            "frames_dropped": sum(r.frames_dropped for r in active),
+            "write_latency_max_ms": max((1000 * r.write_seconds_max for r in active), default=0.0),
+        }
+
+
+_writer: RecordingWriter | None = None
+
+
+# Process-wide writer shared by all calls on this worker.
+def get_recording_writer() -> RecordingWriter:
+    global _writer
+    if _writer is None:
+        _writer = RecordingWriter()
+    return _writer
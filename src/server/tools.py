@@ -1,30 +1,37 @@
 import os
-from langchain_core.tools import tool
-from langchain_community.tools import TavilySearchResults
+from functools import cache
 
 
-@tool
 def add(a: int, b: int):
     """Add two numbers. Please let the user know that you're adding the numbers BEFORE you call the tool"""
     return a + b
 
 
-# Read Tavily API key from environment
-tavily_api_key = os.getenv("TAVILY_API_KEY")
-
-# Initialize Tavily tool only if API key exists
-if tavily_api_key:
-    tavily_tool = TavilySearchResults(
-        tavily_api_key=tavily_api_key,  # pass key explicitly
-        max_results=5,
-        include_answer=True,
-        description=(
-            "This is a search tool for accessing the internet.\n\n"
-            "Let the user know you're asking your friend Tavily for help before you call the tool."
-        ),
-    )
-    TOOLS = [add, tavily_tool]
-else:
-    # Fallback: Tavily disabled if no API key
-    TOOLS = [add]
+# Tools are built on first use: langchain_core and the Tavily client
+# (langchain_community + aiohttp) are slow to import and only agents need them.
+@cache
+def get_tools() -> list:
+    from langchain_core.tools import tool
 
+    tools = [tool(add)]
+
+    # Read Tavily API key from environment
+    tavily_api_key = os.getenv("TAVILY_API_KEY")
+
+    # Initialize Tavily tool only if API key exists (disabled otherwise)
+    if tavily_api_key:
+        from langchain_community.tools import TavilySearchResults
+
+        tavily_tool = TavilySearchResults(
+            tavily_api_key=tavily_api_key,  # pass key explicitly
+            max_results=5,
+            include_answer=True,
+            description=(
+                "This is a search tool for accessing the internet.\n\n"
+                "Let the user know you're asking your friend Tavily for help before you call the tool."
+            ),
+            # Repeated questions are answered from the tool result cache for 10 minutes
+            metadata={"cache": {"ttl": 600, "max_entries": 512}},
+        )
+        tools.append(tavily_tool)
+    return tools
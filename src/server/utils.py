@@ -1,8 +1,54 @@
-from typing import AsyncIterator
+import base64
+from typing import AsyncIterator, Awaitable, Callable
+
 from starlette.websockets import WebSocket
 
+from langchain_openai_voice.playback import delta_payload
+from langchain_openai_voice.utils import sniff_event_type
+
+# Offered by clients that send and receive audio as raw PCM16 (24 kHz mono,
+# little-endian) in binary frames; control events stay JSON text frames.
+BINARY_SUBPROTOCOL = "voice.pcm16"
+
 
 async def websocket_stream(websocket: WebSocket) -> AsyncIterator[str]:
     while True:
         data = await websocket.receive_text()
         yield data
+
+
+def wants_binary_audio(websocket: WebSocket) -> bool:
+    return BINARY_SUBPROTOCOL in websocket.scope.get("subprotocols", [])
+
+
+# Receive loop of a binary-mode socket until the client disconnects:
+# binary frames go to on_audio, text frames (JSON events) to on_event.
+async def receive_binary_audio(
+    websocket: WebSocket,
+    on_audio: Callable[[bytes], Awaitable[None]],
+    on_event: Callable[[str], None],
+) -> None:
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+        data = message.get("bytes")
+        if data is not None:
+            if len(data) % 2 == 0:  # an odd byte would misalign every later sample
+                await on_audio(data)
+        elif message.get("text") is not None:
+            on_event(message["text"])
+
+
+# send_output_chunk for a binary-mode socket: the audio of response.audio.delta
+# events is sent as a binary frame, everything else as the JSON text it is.
+def binary_audio_sender(websocket: WebSocket) -> Callable[[str], Awaitable[None]]:
+    async def send(chunk: str) -> None:
+        if sniff_event_type(chunk) == "response.audio.delta":
+            payload = delta_payload(chunk)
+            if payload:
+                await websocket.send_bytes(base64.b64decode(payload))
+            return
+        await websocket.send_text(chunk)
+
+    return send